@@ -2,9 +2,9 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
 from .models import (
-    Building, Unit, Tenant, Payment, SystemSettings,
+    Building, Unit, Tenant, Payment, TenantBalance, TenantAging, SystemSettings,
     Expense, MaintenanceRequest, Document, Lease, ActivityLog, UserProfile,
-    Utility, PropertyPhoto
+    Utility, PropertyPhoto, Notification, ReconciliationRun, ReconciliationItem
 )
 
 
@@ -48,6 +48,9 @@ class BuildingAdmin(admin.ModelAdmin):
     search_fields = ['name', 'address']
     list_filter = ['created_at']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_stats()
+
     def occupied_units_count(self, obj):
         return obj.occupied_units_count
     occupied_units_count.short_description = 'Occupied Units'
@@ -64,6 +67,10 @@ class UnitAdmin(admin.ModelAdmin):
     list_filter = ['status', 'building', 'bedrooms']
     search_fields = ['unit_number', 'building__name']
     ordering = ['building', 'unit_number']
+    list_select_related = ['building']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_current_tenant()
 
     def current_tenant(self, obj):
         tenant = obj.current_tenant
@@ -78,6 +85,7 @@ class TenantAdmin(admin.ModelAdmin):
     list_filter = ['move_in_date', 'unit__building']
     search_fields = ['first_name', 'last_name', 'email', 'phone', 'id_number']
     date_hierarchy = 'move_in_date'
+    list_select_related = ['unit__building', 'ledger']
 
     def total_balance(self, obj):
         balance = obj.total_balance
@@ -99,6 +107,39 @@ class PaymentAdmin(admin.ModelAdmin):
     amount.short_description = 'Amount'
 
 
+@admin.register(TenantBalance)
+class TenantBalanceAdmin(admin.ModelAdmin):
+    list_display = ['tenant', 'total_charges', 'total_payments', 'balance',
+                    'last_charge_date', 'last_payment_date', 'updated_at']
+    search_fields = ['tenant__first_name', 'tenant__last_name']
+    list_select_related = ['tenant__unit__building']
+    readonly_fields = ['tenant', 'total_charges', 'total_payments',
+                       'last_charge_date', 'last_payment_date', 'updated_at']
+
+    def balance(self, obj):
+        return f"KES {obj.balance:,.2f}"
+    balance.short_description = 'Balance'
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(TenantAging)
+class TenantAgingAdmin(admin.ModelAdmin):
+    list_display = ['tenant', 'current', 'days_1_30', 'days_31_60',
+                    'days_61_90', 'days_over_90', 'total_due',
+                    'oldest_unpaid_date', 'as_of']
+    list_filter = ['as_of']
+    search_fields = ['tenant__first_name', 'tenant__last_name']
+    list_select_related = ['tenant__unit__building']
+    readonly_fields = ['tenant', 'as_of', 'current', 'days_1_30',
+                       'days_31_60', 'days_61_90', 'days_over_90',
+                       'total_due', 'oldest_unpaid_date', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(SystemSettings)
 class SystemSettingsAdmin(admin.ModelAdmin):
     fieldsets = (
@@ -188,3 +229,44 @@ class PropertyPhotoAdmin(admin.ModelAdmin):
     list_filter = ['photo_type', 'is_primary']
     search_fields = ['building__name', 'unit__unit_number', 'caption']
     date_hierarchy = 'uploaded_at'
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'channel', 'recipient', 'subject',
+                    'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'channel', 'created_at']
+    search_fields = ['recipient', 'subject', 'last_error']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['tenant', 'created_at', 'updated_at', 'sent_at']
+    actions = ['requeue']
+
+    def requeue(self, request, queryset):
+        from django.utils import timezone
+        updated = queryset.exclude(status='SENT').update(
+            status='PENDING', attempts=0, next_attempt_at=timezone.now())
+        self.message_user(request, f'{updated} notification(s) requeued.')
+    requeue.short_description = 'Requeue selected notifications'
+
+
+class ReconciliationItemInline(admin.TabularInline):
+    model = ReconciliationItem
+    fields = ['status', 'line', 'reference', 'amount', 'transaction_date',
+              'payment', 'expected_amount', 'note']
+    readonly_fields = fields
+    raw_id_fields = ['payment']
+    can_delete = False
+    extra = 0
+    max_num = 0
+
+
+@admin.register(ReconciliationRun)
+class ReconciliationRunAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'source_name', 'payment_method', 'date_from',
+                    'date_to', 'total_records', 'matched_count', 'mismatch_count',
+                    'duplicate_count', 'unknown_count', 'missing_count']
+    list_filter = ['payment_method', 'created_at']
+    search_fields = ['source_name', 'created_by']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['created_at']
+    inlines = [ReconciliationItemInline]
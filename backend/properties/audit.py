@@ -0,0 +1,140 @@
+"""
+Buffered writing of activity log entries
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class AuditBuffer:
+    """
+    Collect ActivityLog entries in memory and write them with one
+    bulk_create() once `max_entries` are waiting or `flush_interval`
+    seconds have passed since the last write, at the end of every request
+    (see signals.flush_activity_log) and when the process exits. Entries
+    keep the time they were logged, not the time they were written.
+
+    An entry logged inside a transaction is queued only once it commits,
+    so a rollback discards the entry along with the change it described.
+    Entries that cannot be written are kept for the next flush, up to
+    `max_pending`; beyond that the oldest are dropped with a warning
+    rather than growing without bound while the database is unavailable.
+    """
+
+    def __init__(self, max_entries=100, flush_interval=5, max_pending=10000):
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+        self.pending = []
+        self.last_flush = time.monotonic()
+        self.pid = os.getpid()
+
+    def add(self, entry):
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self.enqueue(entry))
+        else:
+            self.enqueue(entry)
+
+    def enqueue(self, entry):
+        with self.lock:
+            self.pending.append(entry)
+            self.trim()
+            due = (len(self.pending) >= self.max_entries or
+                   time.monotonic() - self.last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def trim(self):
+        """Drop the oldest entries beyond max_pending; call with the lock held."""
+        excess = len(self.pending) - self.max_pending
+        if excess > 0:
+            del self.pending[:excess]
+            logger.warning('Activity log buffer full, dropped the %d oldest entries', excess)
+
+    def flush(self):
+        """Write everything logged since the last flush; return the count."""
+        from .models import ActivityLog
+
+        if os.getpid() != self.pid:
+            # Forked after logging: the parent writes its own entries
+            with self.lock:
+                self.pending = []
+                self.pid = os.getpid()
+        with self.lock:
+            pending, self.pending = self.pending, []
+            self.last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        try:
+            ActivityLog.objects.bulk_create(pending)
+        except DatabaseError:
+            logger.exception('Failed to write %d activity log entries', len(pending))
+            # Keep the entries for the next flush rather than lose them
+            with self.lock:
+                self.pending[:0] = pending
+                self.trim()
+            return 0
+        return len(pending)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """The process-wide AuditBuffer."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = AuditBuffer(settings.AUDIT_BUFFER_SIZE,
+                                      settings.AUDIT_FLUSH_INTERVAL,
+                                      settings.AUDIT_BUFFER_LIMIT)
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def log_activity(action, model_name, description, object_id=None, request=None,
+                 user=None):
+    """
+    Queue an activity log entry, once the current transaction (if any)
+    commits. The user and IP address come from
+    `request` when given; `user` overrides the username, which is 'System'
+    otherwise. Raises ValueError for an action not in
+    ActivityLog.ACTION_CHOICES. Returns the unsaved entry.
+    """
+    from .models import ActivityLog
+
+    if action not in dict(ActivityLog.ACTION_CHOICES):
+        raise ValueError(f'Unknown activity log action "{action}"')
+
+    ip_address = None
+    if request is not None:
+        user = user or getattr(request.user, 'username', '')
+        ip_address = request.META.get('REMOTE_ADDR')
+
+    entry = ActivityLog(
+        user=user or 'System',
+        action=action,
+        model_name=model_name,
+        object_id=object_id,
+        description=description,
+        ip_address=ip_address,
+        timestamp=timezone.now(),
+    )
+    get_buffer().add(entry)
+    return entry
+
+
+def flush_activity_log():
+    """Write any queued entries now; return how many were written."""
+    return get_buffer().flush()
@@ -74,7 +74,8 @@ def login_view(request):
     tenant_info = None
     if role == 'TENANT':
         try:
-            tenant = Tenant.objects.filter(email=user.email).first()
+            tenant = Tenant.objects.select_related(
+                'unit__building', 'ledger').filter(email=user.email).first()
             if tenant:
                 tenant_info = {
                     'id': tenant.id,
@@ -193,7 +194,8 @@ def current_user(request):
     tenant_info = None
     if role == 'TENANT':
         try:
-            tenant = Tenant.objects.filter(email=user.email).first()
+            tenant = Tenant.objects.select_related(
+                'unit__building', 'ledger').filter(email=user.email).first()
             if tenant:
                 tenant_info = {
                     'id': tenant.id,
@@ -0,0 +1,285 @@
+"""
+Benchmarks of the hot API endpoints and management commands
+"""
+import io
+import platform
+import statistics
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import timedelta
+import django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+from .metrics import QueryTimer
+
+RESULTS_VERSION = 1
+# Changes smaller than this are noise however large they are relatively
+MIN_DELTA_SECONDS = 0.002
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: object
+    description: str = ''
+    setup: object = None
+    # Run each round in a transaction that is rolled back, for benchmarks
+    # that write, so every round sees the same data
+    rollback: bool = False
+
+
+BENCHMARKS = {}
+
+
+def benchmark(name, setup=None, rollback=False):
+    """Register a function taking a BenchmarkContext as a benchmark."""
+    def register(func):
+        BENCHMARKS[name] = Benchmark(
+            name=name, run=func, description=(func.__doc__ or '').strip(),
+            setup=setup, rollback=rollback)
+        return func
+    return register
+
+
+class BenchmarkContext:
+    """
+    What the benchmarks run against: an API client logged in as a staff
+    user, plus a building and a tenant picked deterministically from the
+    dataset (the tenant with the median primary key, and their building).
+    """
+
+    def __init__(self, next_month):
+        from django.contrib.auth.models import User
+        from rest_framework.test import APIClient
+        from .models import Tenant
+
+        user, _ = User.objects.get_or_create(
+            username='benchmark', defaults={'is_staff': True, 'is_superuser': True})
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+        tenants = Tenant.objects.order_by('pk')
+        count = tenants.count()
+        if not count:
+            raise BenchmarkError('The benchmark database has no tenants')
+        self.tenant = tenants.select_related('unit__building')[count // 2]
+        self.building = self.tenant.unit.building
+        self.next_month = next_month
+
+    def get(self, url, expected=200, **params):
+        return self.check(self.client.get(url, params), expected)
+
+    def post(self, url, data=None, expected=200):
+        return self.check(self.client.post(url, data or {}, format='json'), expected)
+
+    @staticmethod
+    def check(response, expected):
+        """Fail loudly rather than time an error page."""
+        if response.status_code != expected:
+            raise BenchmarkError(
+                f'{response.request["PATH_INFO"]} returned {response.status_code}, '
+                f'expected {expected}')
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+
+def clear_statement_cache(context):
+    from .statement_cache import StatementCache
+
+    for path in StatementCache.directory().glob('*.pdf'):
+        path.unlink()
+
+
+def clear_cache(context):
+    cache.clear()
+
+
+@benchmark('TenantViewSet.list')
+def tenant_list(context):
+    """First page of the tenant list"""
+    context.get('/api/tenants/')
+
+
+@benchmark('TenantViewSet.list (filtered)')
+def tenant_list_filtered(context):
+    """Active tenants of one building"""
+    context.get('/api/tenants/', active='true', building=context.building.pk)
+
+
+@benchmark('TenantViewSet.statement')
+def tenant_statement(context):
+    """One tenant's statement with running balances"""
+    context.get(f'/api/tenants/{context.tenant.pk}/statement/')
+
+
+@benchmark('TenantViewSet.statement_pdf', setup=clear_statement_cache)
+def statement_pdf(context):
+    """Render one tenant's PDF statement (cache cleared each round)"""
+    context.get(f'/api/tenants/{context.tenant.pk}/statement_pdf/')
+
+
+@benchmark('TenantViewSet.statement_pdf (cached)')
+def statement_pdf_cached(context):
+    """Serve one tenant's PDF statement from the statement cache"""
+    context.get(f'/api/tenants/{context.tenant.pk}/statement_pdf/')
+
+
+@benchmark('BuildingViewSet.list')
+def building_list(context):
+    """Buildings with occupancy and income stats"""
+    context.get('/api/buildings/')
+
+
+@benchmark('BuildingViewSet.report')
+def building_report(context):
+    """Financial report for one building"""
+    context.get(f'/api/buildings/{context.building.pk}/report/')
+
+
+@benchmark('PaymentViewSet.list')
+def payment_list(context):
+    """First page of all payments"""
+    context.get('/api/payments/')
+
+
+@benchmark('DashboardViewSet.summary', setup=clear_cache)
+def dashboard_summary(context):
+    """Dashboard summary (cache cleared each round)"""
+    context.get('/api/dashboard/summary/')
+
+
+@benchmark('PaymentViewSet.charge_all_rent', rollback=True)
+def charge_all_rent(context):
+    """Charge the next month's rent to every tenant and queue notifications"""
+    context.post('/api/payments/charge_all_rent/',
+                 {'month': context.next_month, 'send_notifications': True},
+                 expected=201)
+
+
+@benchmark('charge_rent command', rollback=True)
+def charge_rent_command(context):
+    """The charge_rent management command for the next month"""
+    call_command('charge_rent', month=context.next_month, stdout=io.StringIO())
+
+
+@benchmark('LateFees.assess')
+def late_fee_assessment(context):
+    """Assess late fees for every active tenant, 20 days into the month"""
+    from .billing import parse_billing_period
+    from .late_fees import LateFees
+
+    today = parse_billing_period(context.next_month) + timedelta(days=20)
+    LateFees.assess(today=today, grace_days=5, percentage=5, minimum=500)
+
+
+@benchmark('apply_late_fees command', rollback=True)
+def apply_late_fees_command(context):
+    """The apply_late_fees management command, charging the fees"""
+    call_command('apply_late_fees', stdout=io.StringIO())
+
+
+class BenchmarkRunner:
+    """
+    Time each benchmark over a number of rounds after untimed warm-up
+    rounds, counting the database queries of every round.
+    """
+
+    def __init__(self, rounds=5, warmup=1):
+        self.rounds = rounds
+        self.warmup = warmup
+
+    def run_round(self, bench, context):
+        """Return (seconds, queries) for one round; setup is not timed."""
+        if bench.setup:
+            bench.setup(context)
+        timer = QueryTimer()
+        with transaction.atomic() if bench.rollback else nullcontext():
+            with connection.execute_wrapper(timer):
+                started = time.perf_counter()
+                bench.run(context)
+                elapsed = time.perf_counter() - started
+            if bench.rollback:
+                transaction.set_rollback(True)
+        return elapsed, timer.count
+
+    def run(self, bench, context):
+        for _ in range(self.warmup):
+            self.run_round(bench, context)
+
+        timings = []
+        queries = []
+        for _ in range(self.rounds):
+            elapsed, count = self.run_round(bench, context)
+            timings.append(elapsed)
+            queries.append(count)
+
+        return {
+            'rounds': len(timings),
+            'min': min(timings),
+            'max': max(timings),
+            'mean': statistics.fmean(timings),
+            'median': statistics.median(timings),
+            'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            'queries': int(statistics.median(queries)),
+        }
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+        'system': platform.system(),
+    }
+
+
+def results_document(dataset, runner, results):
+    """The JSON-serializable record of a run, for comparing with later runs."""
+    return {
+        'version': RESULTS_VERSION,
+        'created_at': timezone.now().isoformat(),
+        'environment': environment(),
+        'dataset': dataset,
+        'settings': {'rounds': runner.rounds, 'warmup': runner.warmup},
+        'benchmarks': results,
+    }
+
+
+def compare_results(baseline, current, threshold):
+    """
+    Compare the median of every benchmark against a baseline document.
+    A benchmark regressed when it got more than `threshold` percent (and
+    MIN_DELTA_SECONDS) slower, and improved when it got that much faster.
+    Returns a list of dicts sorted by name.
+    """
+    before = baseline.get('benchmarks', {})
+    after = current.get('benchmarks', {})
+    rows = []
+    for name in sorted(set(before) | set(after)):
+        row = {'name': name, 'baseline': None, 'current': None, 'change': None}
+        if name not in before:
+            row.update(status='new', current=after[name]['median'])
+        elif name not in after:
+            row.update(status='missing', baseline=before[name]['median'])
+        else:
+            old = before[name]['median']
+            new = after[name]['median']
+            change = (new - old) / old * 100 if old else 0.0
+            if abs(new - old) < MIN_DELTA_SECONDS or abs(change) <= threshold:
+                status = 'unchanged'
+            else:
+                status = 'regressed' if change > 0 else 'improved'
+            row.update(status=status, baseline=old, current=new, change=change,
+                       queries=(before[name].get('queries'), after[name].get('queries')))
+        rows.append(row)
+    return rows
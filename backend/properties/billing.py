@@ -0,0 +1,137 @@
+"""
+Set-based rent billing shared by the API and the charge_rent command
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from django.db import transaction
+from django.utils import timezone
+from .models import Tenant, TenantBalance, Payment
+from .dashboard import invalidate_dashboard_cache
+
+MONTH_FORMAT = '%B %Y'
+
+
+def parse_billing_period(month_str):
+    """
+    Convert a month label such as "January 2026" into the billing period
+    date (first day of that month). Raises ValueError if unparsable.
+    """
+    return datetime.strptime(month_str.strip(), MONTH_FORMAT).date()
+
+
+@dataclass
+class RentChargeRun:
+    """Outcome of a rent billing run."""
+    period: object
+    month: str
+    charges: list = field(default_factory=list)
+    skipped: list = field(default_factory=list)
+    dry_run: bool = False
+
+    @property
+    def total_amount(self):
+        return sum((charge.amount for charge in self.charges), Decimal('0.00'))
+
+
+class RentBilling:
+    """Charge monthly rent to active tenants in bulk."""
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def charged_tenant_ids(period):
+        """Tenants that already have a rent charge for the period (one query)."""
+        return set(
+            Payment.objects.filter(
+                payment_type='CHARGE',
+                billing_period=period,
+            ).values_list('tenant_id', flat=True)
+        )
+
+    @classmethod
+    def charge_month(cls, month_str, tenants=None, transaction_date=None,
+                     dry_run=False):
+        """
+        Charge rent for `month_str` to every active tenant (or the given
+        tenant queryset) that hasn't been charged for that period yet.
+        The check and all new charges run in a single transaction.
+        """
+        period = parse_billing_period(month_str)
+        month_str = period.strftime(MONTH_FORMAT)
+        transaction_date = transaction_date or timezone.now().date()
+
+        if tenants is None:
+            tenants = Tenant.objects.filter(move_out_date__isnull=True)
+
+        run = RentChargeRun(period=period, month=month_str, dry_run=dry_run)
+
+        with transaction.atomic():
+            if not dry_run:
+                # Lock the tenants before checking for existing charges: a
+                # concurrent run for the same month waits here until this
+                # one commits and then skips the tenants it charged, rather
+                # than failing on the one-charge-per-period constraint.
+                # SQLite ignores the lock but allows only one writer anyway.
+                list(tenants.select_for_update(of=('self',)).order_by('pk')
+                     .values_list('pk', flat=True))
+            already_charged = cls.charged_tenant_ids(period)
+
+            for tenant in tenants.select_related('unit__building').iterator(
+                    chunk_size=cls.BATCH_SIZE):
+                if tenant.pk in already_charged:
+                    run.skipped.append(tenant)
+                    continue
+
+                run.charges.append(Payment(
+                    tenant=tenant,
+                    payment_type='CHARGE',
+                    amount=tenant.unit.monthly_rent,
+                    transaction_date=transaction_date,
+                    billing_period=period,
+                    description=f'Rent for {month_str}',
+                    notes=f'Auto-generated rent charge for {month_str}'
+                ))
+
+            if dry_run or not run.charges:
+                return run
+
+            Payment.objects.bulk_create(run.charges, batch_size=cls.BATCH_SIZE)
+            ledgers = TenantBalance.refresh_for(
+                charge.tenant_id for charge in run.charges)
+            transaction.on_commit(invalidate_dashboard_cache)
+
+        # Hand the fresh balances to the in-memory tenants for notifications
+        ledgers = {ledger.tenant_id: ledger for ledger in ledgers}
+        for charge in run.charges:
+            charge.tenant.ledger = ledgers[charge.tenant_id]
+
+        return run
+
+    @classmethod
+    def charge_tenant(cls, tenant, month_str, amount=None, description=None,
+                      transaction_date=None):
+        """
+        Charge one tenant's rent for `month_str`, by default the unit's
+        monthly rent. Returns the new Payment, or None if the tenant was
+        already charged for that period.
+        """
+        period = parse_billing_period(month_str)
+        month_str = period.strftime(MONTH_FORMAT)
+
+        with transaction.atomic():
+            # Same lock as charge_month(), so the two never both charge
+            list(Tenant.objects.select_for_update().filter(pk=tenant.pk)
+                 .values_list('pk', flat=True))
+            if tenant.payments.filter(payment_type='CHARGE',
+                                      billing_period=period).exists():
+                return None
+
+            return Payment.objects.create(
+                tenant=tenant,
+                payment_type='CHARGE',
+                amount=tenant.unit.monthly_rent if amount is None else amount,
+                transaction_date=transaction_date or timezone.now().date(),
+                billing_period=period,
+                description=description or f'Rent for {month_str}',
+            )
@@ -0,0 +1,66 @@
+"""
+Dashboard summary aggregates with a short-lived cache
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from .models import Building, Unit, Tenant, TenantBalance, Payment
+from .serializers import BuildingSerializer, PaymentSerializer
+
+DASHBOARD_CACHE_KEY = 'properties:dashboard:summary'
+
+
+def build_dashboard_summary(recent_limit=5):
+    """
+    Compute the dashboard figures with a handful of aggregate queries.
+    """
+    units = Unit.objects.aggregate(
+        total=Count('id'),
+        occupied=Count('id', filter=Q(status='OCCUPIED')),
+        vacant=Count('id', filter=Q(status='VACANT')),
+    )
+    total_tenants = Tenant.objects.filter(move_out_date__isnull=True).count()
+    ledger = TenantBalance.objects.aggregate(
+        total_charges=Sum('total_charges'),
+        total_payments=Sum('total_payments'),
+    )
+    buildings = Building.objects.with_stats().order_by('name')
+    recent_transactions = Payment.objects.select_related(
+        'tenant__unit__building')[:recent_limit]
+
+    total_income = ledger['total_payments'] or 0
+    pending_payments = (ledger['total_charges'] or 0) - total_income
+    occupancy_rate = 0
+    if units['total']:
+        occupancy_rate = round(units['occupied'] / units['total'] * 100, 1)
+
+    building_data = BuildingSerializer(buildings, many=True).data
+
+    return {
+        'total_buildings': len(building_data),
+        'total_units': units['total'],
+        'occupied_units': units['occupied'],
+        'vacant_units': units['vacant'],
+        'total_tenants': total_tenants,
+        'occupancy_rate': occupancy_rate,
+        'total_income': float(total_income),
+        'pending_payments': float(max(pending_payments, 0)),
+        'buildings': building_data,
+        'recent_transactions': PaymentSerializer(
+            recent_transactions, many=True).data,
+    }
+
+
+def get_dashboard_summary():
+    """Return the cached dashboard summary, rebuilding it when expired."""
+    summary = cache.get(DASHBOARD_CACHE_KEY)
+    if summary is None:
+        summary = build_dashboard_summary()
+        cache.set(DASHBOARD_CACHE_KEY, summary,
+                  settings.DASHBOARD_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_dashboard_cache():
+    """Drop the cached summary so the next request recomputes it."""
+    cache.delete(DASHBOARD_CACHE_KEY)
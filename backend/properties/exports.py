@@ -0,0 +1,117 @@
+"""
+Streaming CSV / XLSX exports of list querysets
+"""
+import csv
+import tempfile
+import zlib
+
+CHUNK_SIZE = 2000
+# Flush CSV text to the client in blocks of roughly this many characters
+BLOCK_SIZE = 64 * 1024
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class ExportError(Exception):
+    pass
+
+
+class Echo:
+    """File-like object whose write() hands the text back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def resolve(obj, path):
+    """
+    Follow a dotted attribute path such as 'tenant.unit.building.name',
+    calling methods like get_status_display along the way. A missing
+    relation yields None rather than an error.
+    """
+    for part in path.split('.'):
+        if obj is None:
+            return None
+        obj = getattr(obj, part)
+        if callable(obj):
+            obj = obj()
+    return obj
+
+
+def export_rows(queryset, columns):
+    """
+    Yield one list of values per object, reading the queryset in chunks so
+    only CHUNK_SIZE model instances are held at a time.
+    """
+    paths = [path for _, path in columns]
+    for obj in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield [resolve(obj, path) for path in paths]
+
+
+def csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    return value
+
+
+def csv_stream(header, rows):
+    """Yield the CSV text in blocks of about BLOCK_SIZE characters."""
+    writer = csv.writer(Echo())
+    # Byte order mark so Excel opens the file as UTF-8
+    block = ['\ufeff', writer.writerow(header)]
+    size = 0
+    for row in rows:
+        line = writer.writerow([csv_cell(value) for value in row])
+        block.append(line)
+        size += len(line)
+        if size >= BLOCK_SIZE:
+            yield ''.join(block)
+            block = []
+            size = 0
+    if block:
+        yield ''.join(block)
+
+
+def gzip_stream(chunks):
+    """Compress text chunks into a gzip stream as they are produced."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def xlsx_stream(header, rows, title):
+    """
+    Build the workbook with openpyxl's write-only mode, which spools rows
+    to disk instead of holding them in memory, then stream the saved file.
+    Raises ExportError when openpyxl is not installed.
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ExportError('XLSX export requires openpyxl to be installed')
+
+    def generate():
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(title[:31])
+        sheet.append(header)
+        for row in rows:
+            sheet.append(row)
+
+        with tempfile.TemporaryFile() as tmp:
+            workbook.save(tmp)
+            tmp.seek(0)
+            while True:
+                data = tmp.read(BLOCK_SIZE)
+                if not data:
+                    break
+                yield data
+
+    return generate()
@@ -0,0 +1,190 @@
+"""
+Set-based late fee assessment shared by the apply_late_fees command
+"""
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Tenant, TenantBalance, Payment, SystemSettings
+from .dashboard import invalidate_dashboard_cache
+from .notifications import NotificationService
+
+CENTS = Decimal('0.01')
+
+
+@dataclass
+class LateFeeAssessment:
+    """Late fee position of one overdue tenant."""
+    tenant: Tenant
+    balance: Decimal
+    oldest_unpaid_date: object
+    days_overdue: int
+    fee: Decimal
+    already_charged: bool = False
+
+    @property
+    def amount_due(self):
+        return self.balance + self.fee
+
+
+class LateFees:
+    """
+    Compute and apply late fees for all active tenants in a few queries.
+
+    Payments are allocated against charges first-in first-out, so a
+    tenant's oldest unpaid charge is the first charge whose running total
+    exceeds everything the tenant has paid.
+    """
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def oldest_unpaid_charges(tenants):
+        """
+        Return {tenant_id: transaction_date} of each tenant's oldest unpaid
+        charge, using a running-total window over their charges.
+        """
+        unpaid = (
+            Payment.objects.filter(tenant__in=tenants)
+            .unpaid_charges()
+            .order_by('tenant_id', 'transaction_date', 'id')
+            .values_list('tenant_id', 'transaction_date')
+        )
+
+        oldest = {}
+        for tenant_id, transaction_date in unpaid.iterator():
+            oldest.setdefault(tenant_id, transaction_date)
+        return oldest
+
+    @staticmethod
+    def fee_charged_tenant_ids(period):
+        """Tenants that already received a late fee for the month (one query)."""
+        return set(
+            Payment.objects.filter(
+                payment_type='CHARGE',
+                late_fee_period=period,
+            ).values_list('tenant_id', flat=True)
+        )
+
+    @classmethod
+    def assess(cls, today=None, grace_days=None, percentage=None,
+               minimum=None, tenants=None):
+        """
+        Return a LateFeeAssessment for every active tenant whose oldest
+        unpaid charge is past the grace period. Unset parameters default to
+        SystemSettings.
+
+        Nothing is written: tenants without a ledger row yet are totalled
+        straight from their payments, so a dry run has no side effects.
+        """
+        settings = SystemSettings.get_settings()
+        today = today or timezone.now().date()
+        grace_days = settings.late_fee_grace_days if grace_days is None else grace_days
+        percentage = Decimal(str(
+            settings.late_fee_percentage if percentage is None else percentage))
+        minimum = Decimal(str(
+            settings.late_fee_minimum if minimum is None else minimum))
+
+        if tenants is None:
+            tenants = Tenant.objects.filter(move_out_date__isnull=True)
+
+        unledgered = TenantBalance.compute_totals(
+            tenants.filter(ledger__isnull=True).values('id'))
+
+        owing = tenants.filter(
+            Q(ledger__total_charges__gt=F('ledger__total_payments'))
+            | Q(pk__in=[pk for pk, totals in unledgered.items()
+                        if totals.balance > 0])
+        ).select_related('unit__building', 'ledger')
+
+        oldest = cls.oldest_unpaid_charges(owing)
+        charged = cls.fee_charged_tenant_ids(today.replace(day=1))
+
+        assessments = []
+        for tenant in owing.iterator(chunk_size=cls.BATCH_SIZE):
+            oldest_date = oldest.get(tenant.pk)
+            if oldest_date is None:
+                continue
+
+            days_overdue = (today - oldest_date).days
+            if days_overdue <= grace_days:
+                continue
+
+            fee = max(tenant.unit.monthly_rent * percentage / 100, minimum)
+            totals = unledgered.get(tenant.pk) or tenant.ledger
+            assessments.append(LateFeeAssessment(
+                tenant=tenant,
+                balance=totals.balance,
+                oldest_unpaid_date=oldest_date,
+                days_overdue=days_overdue,
+                fee=fee.quantize(CENTS, rounding=ROUND_HALF_UP),
+                already_charged=tenant.pk in charged,
+            ))
+
+        return assessments
+
+    @classmethod
+    def apply(cls, assessments, today=None, notify=True):
+        """
+        Insert the late fee charges for the assessments not yet charged this
+        month, refresh their ledgers and queue reminders, all in a single
+        transaction. Returns the created Payment rows.
+
+        Tenants charged by another run since assess() are re-checked under
+        a lock and marked `already_charged` instead of charged twice.
+        """
+        today = today or timezone.now().date()
+        period = today.replace(day=1)
+        month = today.strftime('%B %Y')
+
+        with transaction.atomic():
+            pending = [a for a in assessments if not a.already_charged]
+            # Lock the tenants before re-checking for fees, as
+            # RentBilling.charge_month() does for rent: a concurrent run
+            # waits here and then skips the tenants this one charged.
+            tenant_ids = sorted(a.tenant.pk for a in pending)
+            for start in range(0, len(tenant_ids), cls.BATCH_SIZE):
+                list(Tenant.objects.select_for_update()
+                     .filter(pk__in=tenant_ids[start:start + cls.BATCH_SIZE])
+                     .order_by('pk').values_list('pk', flat=True))
+            charged = cls.fee_charged_tenant_ids(period)
+            for a in pending:
+                a.already_charged = a.tenant.pk in charged
+            pending = [a for a in pending if not a.already_charged]
+
+            fees = [
+                Payment(
+                    tenant=a.tenant,
+                    payment_type='CHARGE',
+                    amount=a.fee,
+                    transaction_date=today,
+                    late_fee_period=period,
+                    description=f'Late Fee for {month} ({a.days_overdue} days overdue)',
+                    notes=f'Auto-generated late fee: {a.days_overdue} days overdue'
+                )
+                for a in pending
+            ]
+            if not fees:
+                return fees
+
+            Payment.objects.bulk_create(fees, batch_size=cls.BATCH_SIZE)
+            ledgers = {
+                ledger.tenant_id: ledger
+                for ledger in TenantBalance.refresh_for(
+                    fee.tenant_id for fee in fees)
+            }
+            for a in pending:
+                a.tenant.ledger = ledgers[a.tenant.pk]
+
+            if notify:
+                NotificationService.enqueue(NotificationService.build_bulk(
+                    'late_payment',
+                    ((a.tenant, {
+                        'days_late': a.days_overdue,
+                        'amount_due': f'{a.amount_due:,.2f}',
+                    }) for a in pending)
+                ))
+            transaction.on_commit(invalidate_dashboard_cache)
+
+        return fees
@@ -1,11 +1,11 @@
 """
 Late fee calculation and application system
 """
+import time
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from datetime import timedelta
-from properties.models import Tenant, Payment
-from properties.notifications import NotificationService
+from properties.models import Tenant, SystemSettings
+from properties.late_fees import LateFees
 
 
 class Command(BaseCommand):
@@ -15,20 +15,19 @@ class Command(BaseCommand):
         parser.add_argument(
             '--grace-days',
             type=int,
-            default=5,
-            help='Number of grace days after rent is due before late fees apply'
+            help='Number of grace days after rent is due before late fees apply '
+                 '(defaults to System Settings)'
         )
         parser.add_argument(
             '--late-fee-percent',
             type=float,
-            default=5.0,
-            help='Percentage of rent to charge as late fee (e.g., 5 for 5%%)'
+            help='Percentage of rent to charge as late fee, e.g. 5 for 5%% '
+                 '(defaults to System Settings)'
         )
         parser.add_argument(
             '--min-late-fee',
             type=float,
-            default=500.0,
-            help='Minimum late fee amount in KES'
+            help='Minimum late fee amount in KES (defaults to System Settings)'
         )
         parser.add_argument(
             '--dry-run',
@@ -37,15 +36,27 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        settings = SystemSettings.get_settings()
         grace_days = options['grace_days']
+        if grace_days is None:
+            grace_days = settings.late_fee_grace_days
         late_fee_percent = options['late_fee_percent']
+        if late_fee_percent is None:
+            late_fee_percent = settings.late_fee_percentage
         min_late_fee = options['min_late_fee']
+        if min_late_fee is None:
+            min_late_fee = settings.late_fee_minimum
         dry_run = options['dry_run']
 
         self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
         self.stdout.write(self.style.SUCCESS(f'LATE FEE CALCULATION SYSTEM'))
         self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
 
+        if not settings.late_fee_enabled:
+            self.stdout.write(self.style.WARNING(
+                'Late fees are disabled in System Settings'))
+            return
+
         if dry_run:
             self.stdout.write(self.style.WARNING(
                 '🔍 DRY RUN MODE - No fees will be applied\n'))
@@ -63,97 +74,49 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('No active tenants found'))
             return
 
-        fees_applied = 0
-        total_fees = 0
-        tenants_with_late_fees = []
-
-        for tenant in active_tenants:
-            # Get outstanding balance
-            balance = tenant.total_balance
-
-            # Only process tenants with positive balance
-            if balance <= 0:
-                continue
-
-            # Get the oldest unpaid charge
-            oldest_charge = Payment.objects.filter(
-                tenant=tenant,
-                payment_type='CHARGE'
-            ).order_by('transaction_date').first()
-
-            if not oldest_charge:
-                continue
-
-            # Calculate days overdue
-            days_overdue = (timezone.now().date() -
-                            oldest_charge.transaction_date).days
-
-            # Only apply late fee if past grace period
-            if days_overdue <= grace_days:
-                continue
+        today = timezone.now().date()
+        current_month = today.strftime('%B %Y')
 
-            # Check if late fee already applied this month
-            current_month = timezone.now().strftime('%B %Y')
-            existing_late_fee = Payment.objects.filter(
-                tenant=tenant,
-                payment_type='CHARGE',
-                description__icontains='Late Fee',
-                description__icontains=current_month
-            ).exists()
+        started = time.perf_counter()
+        assessments = LateFees.assess(
+            today=today,
+            grace_days=grace_days,
+            percentage=late_fee_percent,
+            minimum=min_late_fee,
+            tenants=active_tenants
+        )
+        elapsed = time.perf_counter() - started
 
-            if existing_late_fee:
+        for assessment in assessments:
+            if assessment.already_charged:
                 self.stdout.write(
                     self.style.WARNING(
-                        f'⏭ {tenant.full_name} - Late fee already applied for {current_month}'
+                        f'⏭ {assessment.tenant.full_name} - Late fee already applied for {current_month}'
                     )
                 )
                 continue
 
-            # Calculate late fee
-            rent_amount = tenant.unit.monthly_rent
-            late_fee = max(
-                (rent_amount * late_fee_percent / 100),
-                min_late_fee
-            )
-
             self.stdout.write(
-                f'⚠ {tenant.full_name} - {days_overdue} days overdue | '
-                f'Balance: KES {balance:,.2f} | '
-                f'Late Fee: KES {late_fee:,.2f}'
+                f'⚠ {assessment.tenant.full_name} - {assessment.days_overdue} days overdue | '
+                f'Balance: KES {assessment.balance:,.2f} | '
+                f'Late Fee: KES {assessment.fee:,.2f}'
             )
-
-            if not dry_run:
-                # Apply late fee
-                Payment.objects.create(
-                    tenant=tenant,
-                    payment_type='CHARGE',
-                    amount=late_fee,
-                    transaction_date=timezone.now().date(),
-                    description=f'Late Fee for {current_month} ({days_overdue} days overdue)',
-                    notes=f'Auto-generated late fee: {late_fee_percent}% of rent'
-                )
-
-                # Send notification
-                NotificationService.notify_late_payment(
-                    tenant=tenant,
-                    days_late=days_overdue,
-                    amount_due=balance + late_fee
-                )
-
-                fees_applied += 1
-                total_fees += late_fee
-                tenants_with_late_fees.append({
-                    'name': tenant.full_name,
-                    'days': days_overdue,
-                    'fee': late_fee
-                })
-            else:
+            if dry_run:
                 self.stdout.write(
                     self.style.WARNING(f'   [DRY RUN] Would apply late fee')
                 )
 
+        if not dry_run:
+            # Marks tenants another run charged meanwhile as already charged
+            LateFees.apply(assessments, today=today)
+
+        to_charge = [a for a in assessments if not a.already_charged]
+        fees_applied = len(to_charge)
+        total_fees = sum((a.fee for a in to_charge), 0)
+
         self.stdout.write('\n' + '='*60)
         self.stdout.write(self.style.SUCCESS(f'Summary:'))
+        self.stdout.write(f'  Assessed in {elapsed:.2f}s')
         if dry_run:
             self.stdout.write(self.style.WARNING(
                 f'  Would Apply: {fees_applied} late fees'))
@@ -165,11 +128,11 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(
                 f'  Total Amount: KES {total_fees:,.2f}'))
 
-            if tenants_with_late_fees:
+            if to_charge:
                 self.stdout.write('\n  Tenants Charged:')
-                for item in tenants_with_late_fees:
+                for item in to_charge:
                     self.stdout.write(
-                        f'    • {item["name"]}: KES {item["fee"]:,.2f} ({item["days"]} days)'
+                        f'    • {item.tenant.full_name}: KES {item.fee:,.2f} ({item.days_overdue} days)'
                     )
 
         self.stdout.write('='*60 + '\n')
@@ -177,6 +140,6 @@ class Command(BaseCommand):
         if not dry_run and fees_applied > 0:
             self.stdout.write(
                 self.style.SUCCESS(
-                    '✓ Late fees applied successfully and notifications sent!'
+                    '✓ Late fees applied successfully and notifications queued!'
                 )
             )
@@ -0,0 +1,248 @@
+"""
+Time the hot API endpoints and commands against a seeded dataset
+"""
+import json
+import tempfile
+from datetime import date
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings, setup_test_environment, teardown_test_environment
+)
+from properties.benchmarks import (
+    BENCHMARKS, BenchmarkContext, BenchmarkError, BenchmarkRunner,
+    compare_results, results_document
+)
+from properties.models import Building, Tenant, Payment
+from properties.search import SearchIndex
+from properties.seeding import DatasetBuilder, SCALES
+
+# Fixed so the dataset does not drift with the calendar
+AS_OF = date(2026, 1, 1)
+HISTORY_MONTHS = 6
+
+
+class Command(BaseCommand):
+    help = ('Seed a deterministic dataset in a separate benchmark database, time '
+            'the key endpoints and commands, and compare against a baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            choices=SCALES,
+            default='1k',
+            help='Number of tenants to seed (default: 1k)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the dataset (default: 42)'
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=5,
+            help='Timed rounds per benchmark (default: 5)'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=1,
+            help='Untimed rounds before timing (default: 1)'
+        )
+        parser.add_argument(
+            '--only',
+            action='append',
+            help='Run benchmarks whose name starts with this (repeatable)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Write the results as JSON to this file'
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            help='Baseline JSON from an earlier run to compare against'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=10.0,
+            help='Percent slowdown of the median that counts as a regression (default: 10)'
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the benchmark database and reuse it on the next run'
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List the benchmarks and exit'
+        )
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for bench in BENCHMARKS.values():
+                self.stdout.write(f'{bench.name:<40} {bench.description}')
+            return
+
+        benchmarks = self.select(options['only'])
+        baseline = self.load_baseline(options['compare']) if options['compare'] else None
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('PERFORMANCE BENCHMARK'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+
+        runner = BenchmarkRunner(rounds=max(options['rounds'], 1),
+                                 warmup=max(options['warmup'], 0))
+        old_name = connection.settings_dict['NAME']
+        self.create_database(options['scale'], options['seed'], options['keepdb'])
+        setup_test_environment()
+        try:
+            with tempfile.TemporaryDirectory() as statement_dir, override_settings(
+                    STATEMENT_CACHE_DIR=statement_dir, METRICS_ENABLED=False):
+                dataset = self.seed(options['scale'], options['seed'])
+                results = self.run_benchmarks(benchmarks, runner)
+        finally:
+            teardown_test_environment()
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb'])
+
+        document = results_document(dataset, runner, results)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(document, output, indent=2)
+
+        regressions = []
+        if baseline is not None:
+            regressions = self.report_comparison(
+                baseline, document, options['threshold'], partial=bool(options['only']))
+
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS('Summary:'))
+        self.stdout.write(
+            f'  Dataset: {dataset["tenants"]:,} tenants, {dataset["payments"]:,} payments '
+            f'(scale {dataset["scale"]}, seed {dataset["seed"]})')
+        self.stdout.write(f'  Benchmarks: {len(results)} x {runner.rounds} rounds')
+        if options['output']:
+            self.stdout.write(f'  Results: {options["output"]}')
+        self.stdout.write('='*60 + '\n')
+
+        if regressions:
+            raise CommandError(
+                f'{len(regressions)} benchmark(s) regressed by more than '
+                f'{options["threshold"]:g}%: {", ".join(regressions)}')
+
+    def select(self, prefixes):
+        if not prefixes:
+            return list(BENCHMARKS.values())
+        selected = [
+            bench for bench in BENCHMARKS.values()
+            if any(bench.name.startswith(prefix) for prefix in prefixes)
+        ]
+        if not selected:
+            raise CommandError(
+                f'No benchmark matches {", ".join(prefixes)}. Use --list to see them.')
+        return selected
+
+    def load_baseline(self, path):
+        try:
+            with open(path) as baseline:
+                return json.load(baseline)
+        except FileNotFoundError:
+            raise CommandError(f'File not found: {path}')
+        except ValueError as e:
+            raise CommandError(f'{path} is not a benchmark results file: {e}')
+
+    def create_database(self, scale, seed, keepdb):
+        """
+        Point the connection at a database of its own per scale and seed,
+        like the test runner does, so the dataset never touches real data.
+        """
+        if connection.vendor == 'sqlite':
+            directory = Path(settings.BASE_DIR) / 'cache'
+            directory.mkdir(parents=True, exist_ok=True)
+            name = str(directory / f'benchmark_{scale}_{seed}.sqlite3')
+        else:
+            name = f'{connection.settings_dict["NAME"]}_benchmark_{scale}_{seed}'
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = name
+
+        self.stdout.write(f'Database: {name}')
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=keepdb, serialize=False)
+
+    def seed(self, scale, seed):
+        if Tenant.objects.exists():
+            self.stdout.write('Reusing the seeded dataset (--keepdb)')
+        else:
+            self.stdout.write(f'Seeding {SCALES[scale]:,} tenants (seed {seed})...')
+            SearchIndex.uninstall(connection)
+            DatasetBuilder(
+                SCALES[scale], seed=seed, months=HISTORY_MONTHS, as_of=AS_OF,
+                log=lambda message: self.stdout.write(f'  {message}'),
+            ).build()
+            SearchIndex.install(connection)
+
+        return {
+            'scale': scale,
+            'seed': seed,
+            'as_of': AS_OF.isoformat(),
+            'months': HISTORY_MONTHS,
+            'buildings': Building.objects.count(),
+            'tenants': Tenant.objects.count(),
+            'payments': Payment.objects.count(),
+        }
+
+    def run_benchmarks(self, benchmarks, runner):
+        context = BenchmarkContext(next_month=AS_OF.strftime('%B %Y'))
+        self.stdout.write(
+            f'\nTenant #{context.tenant.pk}, building #{context.building.pk}; '
+            f'{runner.warmup} warm-up + {runner.rounds} timed rounds each\n')
+
+        results = {}
+        for bench in benchmarks:
+            try:
+                stats = runner.run(bench, context)
+            except BenchmarkError as e:
+                raise CommandError(f'{bench.name}: {e}')
+            results[bench.name] = stats
+            self.stdout.write(
+                f'✓ {bench.name:<40} {stats["median"] * 1000:>9.1f} ms  '
+                f'(min {stats["min"] * 1000:.1f}, max {stats["max"] * 1000:.1f})  '
+                f'{stats["queries"]} queries')
+        return results
+
+    def report_comparison(self, baseline, document, threshold, partial=False):
+        """
+        Print the comparison and return the names of regressed benchmarks.
+        With `partial` (--only), benchmarks that were not run are left out.
+        """
+        if baseline.get('dataset', {}).get('scale') != document['dataset']['scale'] or \
+                baseline.get('dataset', {}).get('seed') != document['dataset']['seed']:
+            self.stdout.write(self.style.WARNING(
+                '⚠ The baseline was run on a different scale or seed'))
+
+        self.stdout.write(f'\nCompared with the baseline (threshold {threshold:g}%):')
+        regressions = []
+        for row in compare_results(baseline, document, threshold):
+            if row['status'] == 'missing' and partial:
+                continue
+            if row['status'] in ('new', 'missing'):
+                self.stdout.write(f'  - {row["name"]}: {row["status"]}')
+                continue
+
+            line = (f'{row["name"]:<40} {row["baseline"] * 1000:>9.1f} -> '
+                    f'{row["current"] * 1000:>9.1f} ms ({row["change"]:+.1f}%)')
+            if row['status'] == 'regressed':
+                regressions.append(row['name'])
+                self.stdout.write(self.style.ERROR(f'  ✗ {line}'))
+            elif row['status'] == 'improved':
+                self.stdout.write(self.style.SUCCESS(f'  ✓ {line}'))
+            else:
+                self.stdout.write(f'    {line}')
+        return regressions
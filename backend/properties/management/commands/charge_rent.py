@@ -1,6 +1,6 @@
-from django.core.management.base import BaseCommand
-from django.utils import timezone
-from properties.models import Tenant, Payment
+from django.core.management.base import BaseCommand, CommandError
+from properties.models import Tenant
+from properties.billing import RentBilling
 from datetime import datetime
 
 
@@ -40,63 +40,41 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING(
                 f'No charges will be created\n'))
 
-        self.stdout.write(self.style.SUCCESS(
-            f'Charging rent for: {month_str}'))
-        self.stdout.write(f'Found {active_tenants.count()} active tenant(s)\n')
-
-        total_charged = 0
-        successful_charges = 0
-        skipped_charges = 0
-
-        for tenant in active_tenants:
-            rent_amount = tenant.unit.monthly_rent
-            description = f'Rent for {month_str}'
+        try:
+            run = RentBilling.charge_month(
+                month_str, tenants=active_tenants, dry_run=dry_run)
+        except ValueError:
+            raise CommandError(
+                f'Invalid month "{month_str}". Use e.g. "January 2026".')
 
-            # Check if already charged for this month
-            existing_charge = Payment.objects.filter(
-                tenant=tenant,
-                payment_type='CHARGE',
-                description__icontains=month_str
-            ).exists()
-
-            if existing_charge:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f'⚠ Skipped: {tenant.full_name} ({tenant.unit}) - Already charged for {month_str}'
-                    )
-                )
-                skipped_charges += 1
-                continue
+        self.stdout.write(self.style.SUCCESS(
+            f'Charging rent for: {run.month}'))
+        self.stdout.write(
+            f'Found {len(run.charges) + len(run.skipped)} active tenant(s)\n')
 
-            if not dry_run:
-                # Create the charge
-                Payment.objects.create(
-                    tenant=tenant,
-                    payment_type='CHARGE',
-                    amount=rent_amount,
-                    transaction_date=timezone.now().date(),
-                    description=description,
-                    notes=f'Auto-generated rent charge for {month_str}'
+        for tenant in run.skipped:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'⚠ Skipped: {tenant.full_name} ({tenant.unit}) - Already charged for {run.month}'
                 )
+            )
 
+        for charge in run.charges:
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'✓ Charged: {tenant.full_name} ({tenant.unit}) - KES {rent_amount:,.2f}'
+                    f'✓ Charged: {charge.tenant.full_name} ({charge.tenant.unit}) - KES {charge.amount:,.2f}'
                 )
             )
 
-            total_charged += rent_amount
-            successful_charges += 1
-
         # Summary
         self.stdout.write('\n' + '='*60)
-        self.stdout.write(self.style.SUCCESS(f'\nSummary for {month_str}:'))
+        self.stdout.write(self.style.SUCCESS(f'\nSummary for {run.month}:'))
         self.stdout.write(
-            f'  ✓ Successfully charged: {successful_charges} tenant(s)')
+            f'  ✓ Successfully charged: {len(run.charges)} tenant(s)')
         self.stdout.write(
-            f'  ⚠ Skipped (already charged): {skipped_charges} tenant(s)')
+            f'  ⚠ Skipped (already charged): {len(run.skipped)} tenant(s)')
         self.stdout.write(
-            f'  💰 Total amount charged: KES {total_charged:,.2f}')
+            f'  💰 Total amount charged: KES {run.total_amount:,.2f}')
 
         if dry_run:
             self.stdout.write(self.style.WARNING(
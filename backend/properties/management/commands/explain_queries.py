@@ -0,0 +1,133 @@
+"""
+Capture EXPLAIN plans for the hot queries and check they use their indexes
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from properties.models import (
+    Tenant, Unit, Payment, Lease, ActivityLog, Expense, Utility
+)
+
+
+def hot_queries():
+    """
+    (label, queryset, acceptable index names) for the queries the API and
+    management commands run most. Keep in sync with the Meta.indexes.
+    """
+    today = timezone.now().date()
+    tenant = Tenant.objects.order_by('pk').first()
+    tenant_id = tenant.pk if tenant else 0
+    email = tenant.email if tenant else 'tenant@example.com'
+
+    return [
+        ('Payment list page',
+         Payment.objects.order_by('-transaction_date', '-created_at', '-id')[:20],
+         ['payment_list_order_idx']),
+        ('Statement page for one tenant',
+         Payment.objects.filter(tenant_id=tenant_id)
+         .order_by('transaction_date', 'id')[:50],
+         ['payment_tenant_date_idx']),
+        ("One tenant's charges (ledger / unpaid window)",
+         Payment.objects.filter(tenant_id=tenant_id, payment_type='CHARGE')
+         .order_by('transaction_date'),
+         ['payment_tenant_type_date_idx']),
+        ('Rent already billed for a period',
+         Payment.objects.filter(payment_type='CHARGE',
+                                billing_period=today.replace(day=1))
+         .values('tenant_id'),
+         ['payment_charge_period_idx', 'unique_rent_charge_per_period']),
+        ('Statement import duplicate check',
+         Payment.objects.filter(reference_number__in=['QA1', 'QA2']).order_by()
+         .values_list('reference_number', flat=True),
+         ['payment_reference_idx']),
+        ('Active tenant count',
+         Tenant.objects.filter(move_out_date__isnull=True).values('id'),
+         ['tenant_active_unit_idx']),
+        ('Tenant by login email',
+         Tenant.objects.filter(email=email),
+         ['tenant_email_idx']),
+        ('Units by status',
+         Unit.objects.filter(status='VACANT').order_by(),
+         ['unit_status_building_idx']),
+        ('Leases expiring soon',
+         Lease.objects.filter(status='ACTIVE', end_date__gte=today,
+                              end_date__lte=today + timedelta(days=60)).order_by(),
+         ['lease_status_end_idx']),
+        ('Activity log page',
+         ActivityLog.objects.order_by('-timestamp', '-id')[:20],
+         ['activity_timestamp_idx']),
+        ('Activity log by action',
+         ActivityLog.objects.filter(action='CREATE').order_by('-timestamp')[:20],
+         ['activity_action_time_idx']),
+        ('Expenses by building and category',
+         Expense.objects.filter(building_id=1, category='REPAIRS',
+                                expense_date__gte=today - timedelta(days=365))
+         .order_by(),
+         ['expense_bldg_cat_date_idx']),
+        ('Unpaid utilities past due',
+         Utility.objects.filter(paid=False, due_date__lt=today).order_by(),
+         ['utility_unpaid_due_idx']),
+        ('Utility list page',
+         Utility.objects.order_by('-billing_period_start', '-id')[:20],
+         ['utility_period_idx']),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Print EXPLAIN plans for the hot queries and fail if an expected index is unused'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the full plan for every query'
+        )
+        parser.add_argument(
+            '--report-only',
+            action='store_true',
+            help='Report missing indexes without failing'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('QUERY PLAN CHECK'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+        self.stdout.write(f'Database: {connection.vendor}\n')
+
+        queries = hot_queries()
+        regressions = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Small dev databases make sequential scans cheapest; we
+                # want to know the index *can* serve the query
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for label, queryset, indexes in queries:
+                plan = queryset.explain()
+                used = next((name for name in indexes if name in plan), None)
+
+                if used:
+                    self.stdout.write(self.style.SUCCESS(f'✓ {label}: {used}'))
+                else:
+                    regressions.append(label)
+                    self.stdout.write(self.style.ERROR(
+                        f'✗ {label}: expected {" or ".join(indexes)}'))
+
+                if options['verbose_plans'] or not used:
+                    for line in plan.splitlines():
+                        self.stdout.write(f'    {line}')
+
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(f'  Queries Checked: {len(queries)}')
+        if regressions:
+            self.stdout.write(self.style.ERROR(
+                f'  Missing Index Usage: {len(regressions)}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('  All queries use their indexes'))
+        self.stdout.write('='*60 + '\n')
+
+        if regressions and not options['report_only']:
+            raise CommandError(
+                f'{len(regressions)} hot queries no longer use their index')
@@ -0,0 +1,280 @@
+"""
+Render month-end statements (and rent invoices) for all active tenants
+across a pool of processes
+"""
+import os
+import time
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import groupby
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from properties.billing import MONTH_FORMAT, parse_billing_period
+from properties.models import Tenant, Payment, Document
+from properties.pdf_generator import PDFGenerator
+
+CHUNK_SIZE = 500
+
+
+def init_worker():
+    """Load the app registry in spawned workers so model instances unpickle."""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def render_job(job):
+    """
+    Render one PDF in a worker process. Workers never touch the database:
+    the job carries the tenant and its transactions. The PDF is written to
+    `job['path']` when given, otherwise its bytes are returned.
+    """
+    if job['kind'] == 'statement':
+        pdf = PDFGenerator.generate_tenant_statement(
+            job['tenant'], job['transactions'],
+            start_date=job['start_date'], end_date=job['end_date'],
+            opening_balance=job['opening_balance'])
+    else:
+        pdf = PDFGenerator.generate_rent_invoice(
+            job['tenant'], job['payment'], job['month'])
+
+    path = job.get('path')
+    if path is None:
+        return job, pdf
+
+    Path(path).write_bytes(pdf)
+    return job, None
+
+
+class Command(BaseCommand):
+    help = 'Generate statement and invoice PDFs for every active tenant in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--month',
+            type=str,
+            help='Statement month (e.g., "January 2026"). Defaults to current month.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of rendering processes (default: one per core)'
+        )
+        parser.add_argument(
+            '--output-dir',
+            type=str,
+            help='Directory for the PDFs (default: MEDIA_ROOT/statements/<YYYY-MM>)'
+        )
+        parser.add_argument(
+            '--zip',
+            type=str,
+            help='Write all PDFs into this ZIP file instead of a directory'
+        )
+        parser.add_argument(
+            '--full-history',
+            action='store_true',
+            help='Include every transaction instead of only the statement month'
+        )
+        parser.add_argument(
+            '--invoices',
+            action='store_true',
+            help="Also render an invoice for each tenant's rent charge for the month"
+        )
+        parser.add_argument(
+            '--attach',
+            action='store_true',
+            help='Record each PDF as a Document on the tenant'
+        )
+
+    def handle(self, *args, **options):
+        month_str = options['month'] or timezone.now().strftime(MONTH_FORMAT)
+        try:
+            period = parse_billing_period(month_str)
+        except ValueError:
+            raise CommandError(
+                f'Invalid month "{month_str}". Use e.g. "January 2026".')
+        month_str = period.strftime(MONTH_FORMAT)
+
+        workers = max(options['workers'], 1)
+        zip_path = options['zip']
+        attach = options['attach']
+
+        output_dir = Path(options['output_dir'] or Path(
+            settings.MEDIA_ROOT) / 'statements' / period.strftime('%Y-%m'))
+        if attach:
+            if zip_path:
+                raise CommandError('--attach cannot be combined with --zip')
+            try:
+                output_dir.resolve().relative_to(
+                    Path(settings.MEDIA_ROOT).resolve())
+            except ValueError:
+                raise CommandError('--attach needs an --output-dir inside MEDIA_ROOT')
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('MONTH-END STATEMENT GENERATION'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+        self.stdout.write(f'Month: {month_str}')
+        self.stdout.write(f'Workers: {workers}')
+        self.stdout.write(f'Output: {zip_path or output_dir}\n')
+
+        if not zip_path:
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+        jobs = self.build_jobs(period, month_str, output_dir,
+                               invoices=options['invoices'],
+                               full_history=options['full_history'],
+                               in_memory=bool(zip_path))
+
+        archive = zipfile.ZipFile(zip_path, 'w') if zip_path else None
+        documents = []
+        rendered = 0
+        failed = 0
+        started = time.monotonic()
+
+        def collect(futures):
+            nonlocal rendered, failed
+            for future in futures:
+                try:
+                    job, pdf = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'✗ Render failed: {e}'))
+                    continue
+
+                rendered += 1
+                if archive is not None:
+                    # PDF streams are already compressed; store as-is
+                    archive.writestr(job['filename'], pdf)
+                if attach:
+                    documents.append(self.document_for(job, month_str))
+
+        # Keep at most two jobs per worker in flight so the pickled
+        # tenants and ledgers never pile up in memory
+        max_pending = workers * 2
+        try:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=init_worker) as executor:
+                pending = set()
+                for job in jobs:
+                    if len(pending) >= max_pending:
+                        done, pending = wait(
+                            pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    pending.add(executor.submit(render_job, job))
+                collect(wait(pending)[0])
+        finally:
+            if archive is not None:
+                archive.close()
+
+        if documents:
+            with transaction.atomic():
+                Document.objects.bulk_create(documents, batch_size=1000)
+
+        elapsed = time.monotonic() - started
+
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS('Summary:'))
+        self.stdout.write(f'  PDFs Rendered: {rendered}')
+        if failed:
+            self.stdout.write(self.style.ERROR(f'  Failed: {failed}'))
+        if attach:
+            self.stdout.write(f'  Documents Attached: {len(documents)}')
+        self.stdout.write(
+            f'  Time: {elapsed:.1f}s ({rendered / elapsed if elapsed else 0:.1f} PDFs/s)')
+        self.stdout.write('='*60 + '\n')
+
+    def build_jobs(self, period, month_str, output_dir, invoices=False,
+                   full_history=False, in_memory=False):
+        """
+        Yield render jobs for active tenants, loading each chunk of tenants
+        with their transactions, opening balances and rent charges in one
+        query apiece.
+        """
+        if full_history:
+            start_date = end_date = None
+        else:
+            start_date = period
+            end_date = (period + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+        tenants = Tenant.objects.filter(
+            move_out_date__isnull=True
+        ).select_related('unit__building').order_by('id')
+        suffix = period.strftime('%Y%m')
+
+        def job(kind, tenant, **data):
+            name = tenant.full_name.replace(' ', '_')
+            filename = f'{kind}_{tenant.pk}_{name}_{suffix}.pdf'
+            return {
+                'kind': kind,
+                'tenant': tenant,
+                'filename': filename,
+                'path': None if in_memory else str(output_dir / filename),
+                **data,
+            }
+
+        chunk = []
+        for tenant in tenants.iterator(chunk_size=CHUNK_SIZE):
+            chunk.append(tenant)
+            if len(chunk) == CHUNK_SIZE:
+                yield from self.chunk_jobs(chunk, period, month_str, invoices,
+                                           start_date, end_date, job)
+                chunk = []
+        if chunk:
+            yield from self.chunk_jobs(chunk, period, month_str, invoices,
+                                       start_date, end_date, job)
+
+    @staticmethod
+    def chunk_jobs(tenants, period, month_str, invoices, start_date, end_date,
+                   job):
+        ids = [tenant.pk for tenant in tenants]
+        payments = Payment.objects.filter(tenant_id__in=ids)
+        transactions = payments.in_period(start_date, end_date).only(
+            'tenant_id', 'payment_type', 'amount', 'transaction_date',
+            'description', 'created_at'
+        ).order_by('tenant_id', 'transaction_date', 'created_at')
+        ledgers = {
+            tenant_id: list(rows)
+            for tenant_id, rows in groupby(transactions, key=lambda p: p.tenant_id)
+        }
+        opening = payments.opening_balances(start_date) if start_date else {}
+
+        charges = {}
+        if invoices:
+            charges = {
+                charge.tenant_id: charge
+                for charge in Payment.objects.filter(
+                    tenant_id__in=ids,
+                    payment_type='CHARGE',
+                    billing_period=period,
+                )
+            }
+
+        for tenant in tenants:
+            yield job('statement', tenant,
+                      transactions=ledgers.get(tenant.pk, []),
+                      start_date=start_date,
+                      end_date=end_date,
+                      opening_balance=opening.get(tenant.pk, Decimal('0.00')))
+            charge = charges.get(tenant.pk)
+            if charge is not None:
+                yield job('invoice', tenant, payment=charge, month=month_str)
+
+    @staticmethod
+    def document_for(job, month_str):
+        tenant = job['tenant']
+        is_statement = job['kind'] == 'statement'
+        return Document(
+            tenant=tenant,
+            building=tenant.unit.building,
+            document_type='STATEMENT' if is_statement else 'INVOICE',
+            title=f'{"Statement" if is_statement else "Rent Invoice"} - {month_str}',
+            file=os.path.relpath(job['path'], settings.MEDIA_ROOT),
+            uploaded_by='system',
+        )
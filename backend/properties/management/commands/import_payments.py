@@ -0,0 +1,102 @@
+"""
+Import tenant payments from an M-Pesa or bank statement CSV
+"""
+import csv
+import time
+from django.core.management.base import BaseCommand, CommandError
+from properties.models import Payment
+from properties.payment_import import PaymentImporter, ImportFormatError
+
+
+class Command(BaseCommand):
+    help = 'Import payments from an M-Pesa or bank statement CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', type=str, help='Path to the statement CSV')
+        parser.add_argument(
+            '--method',
+            type=str,
+            choices=[code for code, _ in Payment.PAYMENT_METHOD_CHOICES],
+            help='Payment method for every row (default: detected from the header)'
+        )
+        parser.add_argument(
+            '--report',
+            type=str,
+            help='Write the per-row outcome to this CSV file'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=PaymentImporter.BATCH_SIZE,
+            help=f'Rows validated and inserted per transaction (default: {PaymentImporter.BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--notify',
+            action='store_true',
+            help='Queue a payment receipt for every imported payment'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Match and validate every row without saving payments'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('PAYMENT STATEMENT IMPORT'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+        self.stdout.write(f'File: {options["file"]}')
+        if dry_run:
+            self.stdout.write(self.style.WARNING('--- DRY RUN MODE: no payments will be saved ---'))
+
+        started = time.monotonic()
+        importer = PaymentImporter(
+            payment_method=options['method'],
+            dry_run=dry_run,
+            send_notifications=options['notify'],
+            batch_size=max(options['batch_size'], 1),
+        )
+        try:
+            with open(options['file'], 'rb') as statement:
+                run = importer.import_file(statement, filename=options['file'])
+        except FileNotFoundError:
+            raise CommandError(f'File not found: {options["file"]}')
+        except ImportFormatError as e:
+            raise CommandError(str(e))
+        elapsed = time.monotonic() - started
+
+        if options['report']:
+            with open(options['report'], 'w', newline='') as report:
+                writer = csv.writer(report)
+                writer.writerow(['line', 'status', 'reference', 'amount',
+                                 'transaction_date', 'tenant', 'message'])
+                for row in run.rows:
+                    writer.writerow(row.as_dict().values())
+
+        problems = [row for row in run.rows if row.status in ('unmatched', 'invalid')]
+        for row in problems[:20]:
+            self.stdout.write(self.style.WARNING(
+                f'⚠ Line {row.line} ({row.status}): {row.reference or "-"} {row.message}'))
+        if len(problems) > 20:
+            self.stdout.write(self.style.WARNING(
+                f'  ... and {len(problems) - 20} more (see --report)'))
+
+        counts = run.counts
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS('Summary:'))
+        self.stdout.write(f'  Payment Method: {run.payment_method}')
+        self.stdout.write(f'  Rows Read: {len(run.rows)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'  {"Would Import" if dry_run else "Imported"}: {counts["imported"]} '
+            f'(KES {run.total_amount:,.2f})'))
+        self.stdout.write(f'  Duplicates: {counts["duplicate"]}')
+        self.stdout.write(f'  Unmatched: {counts["unmatched"]}')
+        self.stdout.write(f'  Invalid: {counts["invalid"]}')
+        self.stdout.write(f'  Skipped (not credits): {counts["skipped"]}')
+        self.stdout.write(
+            f'  Time: {elapsed:.1f}s ({len(run.rows) / elapsed if elapsed else 0:,.0f} rows/s)')
+        if options['report']:
+            self.stdout.write(f'  Report: {options["report"]}')
+        self.stdout.write('='*60 + '\n')
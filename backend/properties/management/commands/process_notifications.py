@@ -0,0 +1,69 @@
+"""
+Drain the notification outbox with a pool of sender threads
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from properties.notifications import NotificationService
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued SMS and email notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.NOTIFICATION_WORKERS,
+            help='Number of sender threads'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Messages claimed from the outbox per batch'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the outbox instead of exiting when it is empty'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to wait between polls when the outbox is empty (with --loop)'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        batch_size = options['batch_size']
+
+        self.stdout.write(
+            f'Processing notifications with {workers} worker(s)...')
+
+        totals = {'SENT': 0, 'PENDING': 0, 'SKIPPED': 0, 'DEAD': 0}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                counts = NotificationService.process_batch(
+                    executor, workers=workers, batch_size=batch_size)
+                for key, value in counts.items():
+                    totals[key] += value
+
+                if any(counts.values()):
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS('Summary:'))
+        self.stdout.write(self.style.SUCCESS(f'  ✓ Sent: {totals["SENT"]}'))
+        self.stdout.write(f'  ↻ Retrying later: {totals["PENDING"]}')
+        self.stdout.write(self.style.WARNING(
+            f'  ⏭ Skipped (channel not configured): {totals["SKIPPED"]}'))
+        self.stdout.write(self.style.ERROR(
+            f'  ✗ Dead-lettered: {totals["DEAD"]}'))
+        self.stdout.write('='*60 + '\n')
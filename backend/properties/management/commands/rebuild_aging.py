@@ -0,0 +1,48 @@
+"""
+Rebuild the accounts-receivable aging buckets for every tenant
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from properties.models import Tenant, TenantAging
+
+
+class Command(BaseCommand):
+    help = 'Rebuild tenant aging buckets (run nightly so balances age with the calendar)'
+
+    def handle(self, *args, **options):
+        as_of = timezone.now().date()
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('RECEIVABLES AGING REBUILD'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+        self.stdout.write(f'As of: {as_of:%B %d, %Y}\n')
+
+        aging = TenantAging.compute(as_of=as_of)
+        rows = [
+            aging.get(pk) or TenantAging(tenant_id=pk, as_of=as_of)
+            for pk in Tenant.objects.values_list('id', flat=True).iterator(
+                chunk_size=2000)
+        ]
+
+        with transaction.atomic():
+            TenantAging.save_rows(rows)
+
+        totals = TenantAging.objects.aggregate(
+            **{bucket: Sum(bucket) for bucket in TenantAging.BUCKETS},
+            total_due=Sum('total_due')
+        )
+
+        self.stdout.write('='*60)
+        self.stdout.write(self.style.SUCCESS('Summary:'))
+        self.stdout.write(f'  Tenants Aged: {len(rows)}')
+        self.stdout.write(f'  Tenants Owing: {len(aging)}')
+        self.stdout.write(f'  Current:   KES {totals["current"] or 0:,.2f}')
+        self.stdout.write(f'  1-30:      KES {totals["days_1_30"] or 0:,.2f}')
+        self.stdout.write(f'  31-60:     KES {totals["days_31_60"] or 0:,.2f}')
+        self.stdout.write(f'  61-90:     KES {totals["days_61_90"] or 0:,.2f}')
+        self.stdout.write(f'  90+:       KES {totals["days_over_90"] or 0:,.2f}')
+        self.stdout.write(self.style.SUCCESS(
+            f'  Total Due: KES {totals["total_due"] or 0:,.2f}'))
+        self.stdout.write('='*60 + '\n')
@@ -0,0 +1,27 @@
+"""
+Recreate the full-text search index and reindex every row
+"""
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from properties.search import SearchIndex
+
+
+class Command(BaseCommand):
+    help = 'Drop and rebuild the search index used by /api/search/'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('SEARCH INDEX REBUILD'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+        self.stdout.write(f'Database: {connection.vendor}\n')
+
+        started = time.monotonic()
+        with transaction.atomic():
+            SearchIndex.uninstall(connection)
+            SearchIndex.install(connection)
+
+        self.stdout.write('='*60)
+        self.stdout.write(self.style.SUCCESS(
+            f'  Search index rebuilt in {time.monotonic() - started:.1f}s'))
+        self.stdout.write('='*60 + '\n')
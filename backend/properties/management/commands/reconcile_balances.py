@@ -0,0 +1,91 @@
+"""
+Rebuild the materialized tenant balance ledger from the Payment table,
+and the aging buckets of every tenant whose ledger was wrong
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from properties.models import Tenant, TenantAging, TenantBalance
+
+
+class Command(BaseCommand):
+    help = ('Rebuild tenant balance ledgers from payments, report any drift and '
+            're-age the repaired tenants (rebuild_aging re-ages everyone)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without rewriting the ledger'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('TENANT BALANCE RECONCILIATION'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(
+                '🔍 DRY RUN MODE - Ledger will not be modified\n'))
+
+        expected = TenantBalance.compute_totals()
+        existing = {
+            ledger.tenant_id: ledger
+            for ledger in TenantBalance.objects.all()
+        }
+        tenants = Tenant.objects.only('id', 'first_name', 'last_name')
+
+        ledgers = []
+        repaired = []
+        missing = 0
+        drifted = 0
+
+        for tenant in tenants.iterator(chunk_size=2000):
+            ledger = expected.get(tenant.pk) or TenantBalance(
+                tenant_id=tenant.pk)
+            ledgers.append(ledger)
+
+            current = existing.get(tenant.pk)
+            if current is None:
+                missing += 1
+                repaired.append(tenant.pk)
+                continue
+
+            if (current.total_charges != ledger.total_charges or
+                    current.total_payments != ledger.total_payments or
+                    current.last_charge_date != ledger.last_charge_date or
+                    current.last_payment_date != ledger.last_payment_date):
+                drifted += 1
+                repaired.append(tenant.pk)
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'⚠ {tenant.full_name} - Ledger: KES {current.balance:,.2f} | '
+                        f'Actual: KES {ledger.balance:,.2f} | '
+                        f'Drift: KES {current.balance - ledger.balance:,.2f}'
+                    )
+                )
+
+        if not dry_run:
+            with transaction.atomic():
+                TenantBalance.save_ledgers(ledgers)
+                # Aging allocates payments using the ledger, so buckets
+                # computed from a wrong ledger are wrong too
+                chunk_size = TenantBalance.REFRESH_CHUNK_SIZE
+                for start in range(0, len(repaired), chunk_size):
+                    TenantAging.refresh_for(repaired[start:start + chunk_size])
+
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS('Summary:'))
+        self.stdout.write(f'  Tenants Checked: {len(ledgers)}')
+        self.stdout.write(f'  Missing Ledgers: {missing}')
+        self.stdout.write(f'  Drifted Ledgers: {drifted}')
+        if dry_run:
+            self.stdout.write(self.style.WARNING(
+                f'  Would Rebuild: {len(ledgers)} ledgers'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'  Ledgers Rebuilt: {len(ledgers)}'))
+            self.stdout.write(self.style.SUCCESS(
+                f'  Aging Refreshed: {len(repaired)} tenants'))
+        self.stdout.write('='*60 + '\n')
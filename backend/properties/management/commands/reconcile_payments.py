@@ -0,0 +1,89 @@
+"""
+Reconcile an M-Pesa or bank statement CSV against recorded payments
+"""
+import time
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from properties.models import Payment
+from properties.payment_import import ImportFormatError
+from properties.reconciliation import Reconciler, read_records
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Invalid date "{value}". Use YYYY-MM-DD.')
+
+
+class Command(BaseCommand):
+    help = 'Reconcile a statement CSV against recorded payments and save the run'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', type=str, help='Path to the statement CSV')
+        parser.add_argument(
+            '--method',
+            type=str,
+            choices=[code for code, _ in Payment.PAYMENT_METHOD_CHOICES],
+            help='Only compare payments recorded with this method'
+        )
+        parser.add_argument(
+            '--from',
+            dest='date_from',
+            type=str,
+            help='First day of the window (YYYY-MM-DD, default: earliest statement date)'
+        )
+        parser.add_argument(
+            '--to',
+            dest='date_to',
+            type=str,
+            help='Last day of the window (YYYY-MM-DD, default: latest statement date)'
+        )
+        parser.add_argument(
+            '--date-tolerance',
+            type=int,
+            default=0,
+            help='Days a statement date may differ from the recorded date'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('PAYMENT RECONCILIATION'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+        self.stdout.write(f'File: {options["file"]}')
+
+        reconciler = Reconciler(
+            date_from=parse_date(options['date_from']) if options['date_from'] else None,
+            date_to=parse_date(options['date_to']) if options['date_to'] else None,
+            payment_method=options['method'],
+            date_tolerance=max(options['date_tolerance'], 0),
+        )
+
+        started = time.monotonic()
+        try:
+            with open(options['file'], 'rb') as statement:
+                records, errors = read_records(statement)
+            run = reconciler.reconcile(records, source_name=options['file'])
+        except FileNotFoundError:
+            raise CommandError(f'File not found: {options["file"]}')
+        except (ImportFormatError, ValueError) as e:
+            raise CommandError(str(e))
+        elapsed = time.monotonic() - started
+
+        for line, message in errors[:20]:
+            self.stdout.write(self.style.WARNING(f'⚠ Line {line}: {message}'))
+
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS(f'Summary (run #{run.pk}):'))
+        self.stdout.write(f'  Window: {run.date_from} to {run.date_to}')
+        self.stdout.write(f'  Statement Records: {run.total_records}')
+        self.stdout.write(self.style.SUCCESS(
+            f'  Matched: {run.matched_count} (KES {run.matched_amount:,.2f})'))
+        self.stdout.write(f'  Amount Mismatches: {run.mismatch_count}')
+        self.stdout.write(f'  Duplicates: {run.duplicate_count}')
+        self.stdout.write(f'  Unknown: {run.unknown_count}')
+        self.stdout.write(f'  Recorded but Missing: {run.missing_count}')
+        if errors:
+            self.stdout.write(self.style.WARNING(f'  Unreadable Lines: {len(errors)}'))
+        self.stdout.write(f'  Time: {elapsed:.1f}s')
+        self.stdout.write('='*60 + '\n')
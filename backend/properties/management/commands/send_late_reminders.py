@@ -3,8 +3,8 @@ Management command to send late payment reminders to tenants
 """
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from datetime import datetime, timedelta
-from properties.models import Tenant, Payment
+from datetime import timedelta
+from properties.models import TenantAging
 from properties.notifications import NotificationService
 
 
@@ -27,6 +27,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         days_late = options['days']
         dry_run = options['dry_run']
+        today = timezone.now().date()
 
         self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
         self.stdout.write(self.style.SUCCESS(f'LATE PAYMENT REMINDER SYSTEM'))
@@ -36,68 +37,47 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING(
                 '🔍 DRY RUN MODE - No notifications will be sent\n'))
 
-        # Get all active tenants
-        active_tenants = Tenant.objects.filter(move_out_date__isnull=True)
-
-        if not active_tenants.exists():
-            self.stdout.write(self.style.WARNING('No active tenants found'))
-            return
-
-        self.stdout.write(
-            f'Checking {active_tenants.count()} active tenants...\n')
-
-        reminders_sent = 0
-        tenants_checked = 0
-
-        for tenant in active_tenants:
-            tenants_checked += 1
-
-            # Calculate tenant balance
+        # Active tenants whose oldest unpaid charge is past the threshold,
+        # read straight from the aging index
+        overdue = TenantAging.objects.filter(
+            tenant__move_out_date__isnull=True,
+            total_due__gt=0,
+            oldest_unpaid_date__lte=today - timedelta(days=days_late)
+        ).select_related(
+            'tenant__unit__building', 'tenant__ledger'
+        ).order_by('oldest_unpaid_date')
+
+        reminders = []
+        for aging in overdue.iterator(chunk_size=1000):
+            tenant = aging.tenant
+            days_overdue = (today - aging.oldest_unpaid_date).days
             balance = tenant.total_balance
 
-            # Only send reminders to tenants with positive balance (owing money)
-            if balance <= 0:
-                continue
-
-            # Check for the most recent charge
-            latest_charge = Payment.objects.filter(
-                tenant=tenant,
-                payment_type='CHARGE'
-            ).order_by('-transaction_date').first()
-
-            if not latest_charge:
-                continue
-
-            # Calculate days since last charge
-            days_since_charge = (timezone.now().date() -
-                                 latest_charge.transaction_date).days
-
-            # Send reminder if overdue by specified days
-            if days_since_charge >= days_late:
+            self.stdout.write(
+                f'📧 {tenant.full_name} - Overdue: {days_overdue} days | '
+                f'Balance: KES {balance:,.2f}'
+            )
+            if dry_run:
                 self.stdout.write(
-                    f'📧 {tenant.full_name} - Overdue: {days_since_charge} days | '
-                    f'Balance: KES {balance:,.2f}'
+                    self.style.WARNING(f'   [DRY RUN] Would send reminder')
                 )
 
-                if not dry_run:
-                    NotificationService.notify_late_payment(
-                        tenant=tenant,
-                        days_late=days_since_charge,
-                        amount_due=balance
-                    )
-                    reminders_sent += 1
-                else:
-                    self.stdout.write(
-                        self.style.WARNING(f'   [DRY RUN] Would send reminder')
-                    )
+            reminders.append((tenant, {
+                'days_late': days_overdue,
+                'amount_due': f'{balance:,.2f}',
+            }))
+
+        if reminders and not dry_run:
+            NotificationService.enqueue(
+                NotificationService.build_bulk('late_payment', reminders))
 
         self.stdout.write('\n' + '='*60)
         self.stdout.write(self.style.SUCCESS(f'Summary:'))
-        self.stdout.write(f'  Tenants Checked: {tenants_checked}')
+        self.stdout.write(f'  Tenants Overdue: {len(reminders)}')
         if dry_run:
             self.stdout.write(self.style.WARNING(
-                f'  Would Send: {reminders_sent} reminders'))
+                f'  Would Send: {len(reminders)} reminders'))
         else:
             self.stdout.write(self.style.SUCCESS(
-                f'  Reminders Sent: {reminders_sent}'))
+                f'  Reminders Queued: {len(reminders)}'))
         self.stdout.write('='*60 + '\n')
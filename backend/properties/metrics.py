@@ -0,0 +1,244 @@
+"""
+Request and notification metrics in Prometheus text format
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# name -> (type, help, buckets); histograms observe, counters increment
+METRICS = {
+    'http_requests_total': (
+        'counter', 'Requests handled, by view, method and status code', None),
+    'http_request_duration_seconds': (
+        'histogram', 'Time spent handling a request', LATENCY_BUCKETS),
+    'http_request_db_queries': (
+        'histogram', 'Database queries run by a request', QUERY_COUNT_BUCKETS),
+    'http_request_db_duration_seconds': (
+        'histogram', 'Time a request spent in database queries', LATENCY_BUCKETS),
+    'http_response_size_bytes': (
+        'histogram', 'Size of non-streaming response bodies', SIZE_BUCKETS),
+    'notification_send_duration_seconds': (
+        'histogram', 'Time taken to deliver one notification', LATENCY_BUCKETS),
+}
+
+
+def label_key(labels):
+    """Labels as a stable string usable in the exposition format."""
+    return ','.join(
+        f'{name}="{escape(value)}"' for name, value in sorted(labels.items()))
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsStore:
+    """
+    Collect metrics in memory and periodically add them to a SQLite file
+    shared by every process on the host (gunicorn workers, the
+    notification sender), so a scrape of any worker sees the totals of
+    all of them. Each flush is one transaction of upserts that add this
+    process's increments to the stored values.
+    """
+
+    def __init__(self, path, flush_interval=5):
+        self.path = str(path)
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.last_flush = time.monotonic()
+        self.pid = os.getpid()
+        self.schema_ready = False
+
+    def connect(self):
+        if not self.schema_ready:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=OFF')
+        if not self.schema_ready:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS samples ('
+                'metric TEXT NOT NULL, labels TEXT NOT NULL, '
+                'suffix TEXT NOT NULL, le TEXT NOT NULL, value REAL NOT NULL, '
+                'PRIMARY KEY (metric, labels, suffix, le))')
+            self.schema_ready = True
+        return conn
+
+    def add(self, key, amount):
+        self.pending[key] = self.pending.get(key, 0) + amount
+
+    def inc(self, metric, amount=1, **labels):
+        with self.lock:
+            self.add((metric, label_key(labels), '', ''), amount)
+        self.maybe_flush()
+
+    def observe(self, metric, value, **labels):
+        """Record one observation in a histogram."""
+        buckets = METRICS[metric][2]
+        labels = label_key(labels)
+        bound = next((le for le in buckets if value <= le), '+Inf')
+        with self.lock:
+            self.add((metric, labels, '_bucket', str(bound)), 1)
+            self.add((metric, labels, '_sum', ''), value)
+            self.add((metric, labels, '_count', ''), 1)
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Add everything collected since the last flush to the shared file."""
+        if os.getpid() != self.pid:
+            # Forked after collecting: the parent's samples are not ours
+            with self.lock:
+                self.pending = {}
+                self.pid = os.getpid()
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+        if not pending:
+            return
+
+        try:
+            conn = self.connect()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany(
+                    'INSERT INTO samples (metric, labels, suffix, le, value) '
+                    'VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT (metric, labels, suffix, le) '
+                    'DO UPDATE SET value = value + excluded.value',
+                    [(*key, value) for key, value in pending.items()])
+                conn.execute('COMMIT')
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            # Keep the samples for the next flush rather than lose them
+            with self.lock:
+                for key, value in pending.items():
+                    self.add(key, value)
+
+    def samples(self):
+        """Return {(metric, labels, suffix, le): value} from the shared file."""
+        self.flush()
+        conn = self.connect()
+        try:
+            return {
+                (metric, labels, suffix, le): value
+                for metric, labels, suffix, le, value in conn.execute(
+                    'SELECT metric, labels, suffix, le, value FROM samples')
+            }
+        finally:
+            conn.close()
+
+    def render(self):
+        """The stored metrics in the Prometheus text exposition format."""
+        samples = self.samples()
+        lines = []
+        for metric, (kind, help_text, buckets) in METRICS.items():
+            series = sorted({labels for name, labels, _, _ in samples if name == metric})
+            if not series:
+                continue
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} {kind}')
+            for labels in series:
+                if kind == 'counter':
+                    lines.append(self.sample_line(
+                        metric, labels, samples[(metric, labels, '', '')]))
+                    continue
+
+                # Stored per bucket; the exposition format is cumulative
+                cumulative = 0
+                for le in (*buckets, '+Inf'):
+                    cumulative += samples.get((metric, labels, '_bucket', str(le)), 0)
+                    bound = le if le == '+Inf' else format_value(le)
+                    bucket_labels = f'{labels},le="{bound}"' if labels else f'le="{bound}"'
+                    lines.append(self.sample_line(f'{metric}_bucket', bucket_labels, cumulative))
+                for suffix in ('_sum', '_count'):
+                    lines.append(self.sample_line(
+                        f'{metric}{suffix}', labels,
+                        samples.get((metric, labels, suffix, ''), 0)))
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def sample_line(name, labels, value):
+        if labels:
+            return f'{name}{{{labels}}} {format_value(value)}'
+        return f'{name} {format_value(value)}'
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The process-wide MetricsStore, or None when metrics are disabled."""
+    global _store
+    if not settings.METRICS_ENABLED:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MetricsStore(settings.METRICS_DB,
+                                      settings.METRICS_FLUSH_INTERVAL)
+                atexit.register(_store.flush)
+    return _store
+
+
+def observe(metric, value, **labels):
+    store = get_store()
+    if store is not None:
+        store.observe(metric, value, **labels)
+
+
+def inc(metric, amount=1, **labels):
+    store = get_store()
+    if store is not None:
+        store.inc(metric, amount, **labels)
+
+
+def view_name(request):
+    """
+    Name the view that handled a request as ViewSet.action, e.g.
+    'TenantViewSet.statement_pdf'; other views by their URL name.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is not None:
+        actions = getattr(match.func, 'actions', None) or {}
+        action = actions.get(request.method.lower())
+        return f'{view_class.__name__}.{action}' if action else view_class.__name__
+    return match.view_name or match.func.__name__
+
+
+class QueryTimer:
+    """execute_wrapper that counts and times a connection's queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
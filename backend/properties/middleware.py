@@ -0,0 +1,46 @@
+"""
+Request middleware
+"""
+import time
+from contextlib import ExitStack
+from django.db import connections
+from . import metrics
+
+
+class MetricsMiddleware:
+    """
+    Record each request's latency, database query count and time, and
+    response size, labelled with the view that handled it (see
+    metrics.view_name). Place it first so the timing covers the other
+    middleware too. Streamed bodies are measured only when their length
+    is known up front, and queries run while a stream is being consumed
+    happen after the view returns and are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if metrics.get_store() is None:
+            return self.get_response(request)
+
+        timer = metrics.QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        view = metrics.view_name(request)
+        method = request.method
+        metrics.inc('http_requests_total', view=view, method=method,
+                    status=response.status_code)
+        metrics.observe('http_request_duration_seconds', elapsed,
+                        view=view, method=method)
+        metrics.observe('http_request_db_queries', timer.count, view=view)
+        metrics.observe('http_request_db_duration_seconds', timer.duration, view=view)
+        size = response.get('Content-Length') if response.streaming else len(response.content)
+        if size is not None:
+            metrics.observe('http_response_size_bytes', int(size), view=view)
+        return response
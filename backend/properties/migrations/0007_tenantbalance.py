@@ -0,0 +1,62 @@
+# Generated by Django 5.0 on 2026-10-17 00:22
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Max, Q, Sum
+
+
+def build_balances(apps, schema_editor):
+    Tenant = apps.get_model('properties', 'Tenant')
+    Payment = apps.get_model('properties', 'Payment')
+    TenantBalance = apps.get_model('properties', 'TenantBalance')
+
+    totals = {
+        row['tenant_id']: row
+        for row in Payment.objects.order_by().values('tenant_id').annotate(
+            total_charges=Sum('amount', filter=Q(payment_type='CHARGE')),
+            total_payments=Sum('amount', filter=Q(payment_type='PAYMENT')),
+            last_charge_date=Max(
+                'transaction_date', filter=Q(payment_type='CHARGE')),
+            last_payment_date=Max(
+                'transaction_date', filter=Q(payment_type='PAYMENT')),
+        )
+    }
+
+    ledgers = []
+    for tenant_id in Tenant.objects.values_list('id', flat=True):
+        row = totals.get(tenant_id, {})
+        ledgers.append(TenantBalance(
+            tenant_id=tenant_id,
+            total_charges=row.get('total_charges') or Decimal('0.00'),
+            total_payments=row.get('total_payments') or Decimal('0.00'),
+            last_charge_date=row.get('last_charge_date'),
+            last_payment_date=row.get('last_payment_date'),
+        ))
+    TenantBalance.objects.bulk_create(ledgers, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0006_propertyphoto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_charges', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('total_payments', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('last_charge_date', models.DateField(blank=True, null=True)),
+                ('last_payment_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ledger', to='properties.tenant')),
+            ],
+            options={
+                'verbose_name_plural': 'Tenant Balances',
+            },
+        ),
+        migrations.RunPython(build_balances, migrations.RunPython.noop),
+    ]
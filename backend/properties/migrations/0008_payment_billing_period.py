@@ -0,0 +1,57 @@
+# Generated by Django 5.0 on 2026-10-17 00:25
+
+import re
+from datetime import datetime
+from django.db import migrations, models
+
+RENT_DESCRIPTION = re.compile(r'Rent for ([A-Za-z]+ \d{4})')
+
+
+def backfill_billing_period(apps, schema_editor):
+    """Key existing 'Rent for <Month YYYY>' charges on their billing period."""
+    Payment = apps.get_model('properties', 'Payment')
+
+    seen = set()
+    updates = []
+    charges = Payment.objects.filter(
+        payment_type='CHARGE',
+        description__icontains='Rent for',
+    ).exclude(description__icontains='Late Fee').order_by('created_at', 'id')
+
+    for payment in charges.only('id', 'tenant_id', 'description').iterator():
+        match = RENT_DESCRIPTION.search(payment.description)
+        if not match:
+            continue
+        try:
+            period = datetime.strptime(match.group(1), '%B %Y').date()
+        except ValueError:
+            continue
+        # Keep the first charge per period; later duplicates stay unkeyed
+        if (payment.tenant_id, period) in seen:
+            continue
+        seen.add((payment.tenant_id, period))
+        payment.billing_period = period
+        updates.append(payment)
+
+    Payment.objects.bulk_update(updates, ['billing_period'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0007_tenantbalance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='billing_period',
+            field=models.DateField(blank=True, help_text='First day of the month a rent charge covers', null=True),
+        ),
+        migrations.RunPython(backfill_billing_period,
+                             migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.UniqueConstraint(condition=models.Q(('billing_period__isnull', False), ('payment_type', 'CHARGE')), fields=('tenant', 'billing_period'), name='unique_rent_charge_per_period'),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.0 on 2026-10-17 00:32
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, Sum, Value, Window, DecimalField
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def bucket_for(days):
+    if days <= 0:
+        return 'current'
+    if days <= 30:
+        return 'days_1_30'
+    if days <= 60:
+        return 'days_31_60'
+    if days <= 90:
+        return 'days_61_90'
+    return 'days_over_90'
+
+
+def build_aging(apps, schema_editor):
+    Tenant = apps.get_model('properties', 'Tenant')
+    Payment = apps.get_model('properties', 'Payment')
+    TenantAging = apps.get_model('properties', 'TenantAging')
+
+    as_of = timezone.now().date()
+    rows = Payment.objects.filter(payment_type='CHARGE').annotate(
+        paid=Coalesce(
+            F('tenant__ledger__total_payments'),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=12, decimal_places=2)
+        ),
+        running_total=Window(
+            Sum('amount'),
+            partition_by=[F('tenant_id')],
+            order_by=[F('transaction_date').asc(), F('id').asc()]
+        )
+    ).filter(running_total__gt=F('paid')).order_by(
+        'tenant_id', 'transaction_date', 'id'
+    ).values_list('tenant_id', 'transaction_date', 'amount',
+                  'running_total', 'paid')
+
+    aging = {}
+    for tenant_id, transaction_date, amount, running_total, paid in rows:
+        row = aging.get(tenant_id)
+        if row is None:
+            row = aging[tenant_id] = TenantAging(
+                tenant_id=tenant_id, as_of=as_of,
+                oldest_unpaid_date=transaction_date)
+        unpaid = min(amount, running_total - paid)
+        bucket = bucket_for((as_of - transaction_date).days)
+        setattr(row, bucket, getattr(row, bucket) + unpaid)
+        row.total_due += unpaid
+
+    TenantAging.objects.bulk_create([
+        aging.get(tenant_id) or TenantAging(tenant_id=tenant_id, as_of=as_of)
+        for tenant_id in Tenant.objects.values_list('id', flat=True)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0009_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantAging',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField()),
+                ('current', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('days_1_30', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('days_31_60', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('days_61_90', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('days_over_90', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('total_due', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('oldest_unpaid_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='aging', to='properties.tenant')),
+            ],
+            options={
+                'verbose_name_plural': 'Tenant Aging',
+            },
+        ),
+        migrations.RunPython(build_aging, migrations.RunPython.noop),
+    ]
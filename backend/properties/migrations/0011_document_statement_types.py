@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 00:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0010_tenantaging'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='document_type',
+            field=models.CharField(choices=[('LEASE', 'Lease Agreement'), ('ID', 'ID Document'), ('CONTRACT', 'Contract'), ('RECEIPT', 'Receipt'), ('CERTIFICATE', 'Certificate'), ('STATEMENT', 'Statement'), ('INVOICE', 'Invoice'), ('OTHER', 'Other')], max_length=20),
+        ),
+    ]
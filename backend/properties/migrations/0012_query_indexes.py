@@ -0,0 +1,65 @@
+# Generated by Django 5.0 on 2026-10-17 00:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0011_document_statement_types'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['-timestamp', '-id'], name='activity_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['action', '-timestamp'], name='activity_action_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['building', 'category', 'expense_date'], name='expense_bldg_cat_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lease',
+            index=models.Index(fields=['status', 'end_date'], name='lease_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['tenant', 'payment_type', 'transaction_date'], name='payment_tenant_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['tenant', 'transaction_date', 'id'], name='payment_tenant_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['-transaction_date', '-created_at', '-id'], name='payment_list_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('payment_type', 'CHARGE')), fields=['billing_period'], name='payment_charge_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tenant',
+            index=models.Index(fields=['email'], name='tenant_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tenant',
+            index=models.Index(condition=models.Q(('move_out_date__isnull', True)), fields=['unit'], name='tenant_active_unit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='unit',
+            index=models.Index(fields=['status', 'building'], name='unit_status_building_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='utility',
+            index=models.Index(fields=['-billing_period_start', '-id'], name='utility_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='utility',
+            index=models.Index(condition=models.Q(('paid', False)), fields=['due_date'], name='utility_unpaid_due_idx'),
+        ),
+    ]
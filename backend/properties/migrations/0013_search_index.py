@@ -0,0 +1,24 @@
+# Generated by Django 5.0 on 2026-10-17 03:10
+
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    from properties.search import SearchIndex
+    SearchIndex.install(schema_editor.connection, apps)
+
+
+def remove_search_index(apps, schema_editor):
+    from properties.search import SearchIndex
+    SearchIndex.uninstall(schema_editor.connection, apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0012_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, remove_search_index),
+    ]
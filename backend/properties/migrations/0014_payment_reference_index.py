@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-17 01:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0013_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('reference_number__isnull', False)), fields=['reference_number'], name='payment_reference_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0 on 2026-10-17 01:04
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0014_payment_reference_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciliationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payment_method', models.CharField(blank=True, choices=[('CASH', 'Cash'), ('MPESA', 'M-Pesa'), ('BANK_TRANSFER', 'Bank Transfer'), ('CHEQUE', 'Cheque'), ('OTHER', 'Other')], help_text='Only payments recorded with this method are compared', max_length=20)),
+                ('source_name', models.CharField(blank=True, max_length=255)),
+                ('date_from', models.DateField()),
+                ('date_to', models.DateField()),
+                ('total_records', models.IntegerField(default=0)),
+                ('matched_count', models.IntegerField(default=0)),
+                ('mismatch_count', models.IntegerField(default=0)),
+                ('duplicate_count', models.IntegerField(default=0)),
+                ('unknown_count', models.IntegerField(default=0)),
+                ('missing_count', models.IntegerField(default=0)),
+                ('matched_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('created_by', models.CharField(default='System', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReconciliationItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('MATCHED', 'Matched'), ('AMOUNT_MISMATCH', 'Amount Mismatch'), ('DUPLICATE', 'Duplicate'), ('UNKNOWN', 'Unknown'), ('MISSING', 'Missing from Statement')], max_length=20)),
+                ('line', models.IntegerField(blank=True, null=True)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('transaction_date', models.DateField()),
+                ('expected_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reconciliation_items', to='properties.payment')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='properties.reconciliationrun')),
+            ],
+            options={
+                'ordering': ['run', 'id'],
+                'indexes': [models.Index(fields=['run', 'status'], name='recon_item_run_status_idx')],
+            },
+        ),
+    ]
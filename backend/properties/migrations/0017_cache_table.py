@@ -0,0 +1,21 @@
+# Generated by Django 5.0 on 2026-10-17 02:20
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    # Only creates tables for DatabaseCache backends, if any are configured
+    call_command('createcachetable', database=schema_editor.connection.alias,
+                 verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0016_activitylog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.0 on 2026-10-17 02:40
+
+import re
+from datetime import datetime
+from django.db import migrations, models
+
+LATE_FEE_DESCRIPTION = re.compile(r'^Late Fee for ([A-Za-z]+ \d{4})')
+
+
+def backfill_late_fee_period(apps, schema_editor):
+    """Key existing 'Late Fee for <Month YYYY>' charges on their month."""
+    Payment = apps.get_model('properties', 'Payment')
+
+    seen = set()
+    updates = []
+    charges = Payment.objects.filter(
+        payment_type='CHARGE',
+        description__startswith='Late Fee',
+    ).order_by('created_at', 'id')
+
+    for payment in charges.only('id', 'tenant_id', 'description').iterator():
+        match = LATE_FEE_DESCRIPTION.search(payment.description)
+        if not match:
+            continue
+        try:
+            period = datetime.strptime(match.group(1), '%B %Y').date()
+        except ValueError:
+            continue
+        # Keep the first fee per month; later duplicates stay unkeyed
+        if (payment.tenant_id, period) in seen:
+            continue
+        seen.add((payment.tenant_id, period))
+        payment.late_fee_period = period
+        updates.append(payment)
+
+    Payment.objects.bulk_update(updates, ['late_fee_period'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0017_cache_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='late_fee_period',
+            field=models.DateField(blank=True, help_text='First day of the month a late fee charge was assessed for', null=True),
+        ),
+        migrations.RunPython(backfill_late_fee_period,
+                             migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.UniqueConstraint(condition=models.Q(('late_fee_period__isnull', False), ('payment_type', 'CHARGE')), fields=('tenant', 'late_fee_period'), name='unique_late_fee_per_period'),
+        ),
+    ]
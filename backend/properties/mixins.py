@@ -0,0 +1,241 @@
+"""
+Reusable ViewSet mixins
+"""
+import hashlib
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from rest_framework.decorators import action
+from .renderers import PassthroughRenderer
+
+
+@lru_cache(maxsize=None)
+def related_paths_for(serializer_class):
+    """
+    Derive select_related() paths from the dotted `source` attributes of a
+    ModelSerializer, e.g. source='tenant.unit.building.name' yields
+    'tenant__unit__building'. Only forward foreign keys and one-to-one
+    relations are followed; anything else is left to declared prefetches.
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+    model = getattr(meta, 'model', None)
+    if model is None:
+        return ()
+
+    paths = set()
+    for field in serializer_class().fields.values():
+        source = field.source or ''
+        if source == '*' or '.' not in source:
+            continue
+
+        current = model
+        path = []
+        for part in source.split('.')[:-1]:
+            try:
+                model_field = current._meta.get_field(part)
+            except FieldDoesNotExist:
+                break
+            if not (model_field.many_to_one or model_field.one_to_one):
+                break
+            path.append(part)
+            current = model_field.related_model
+
+        if path:
+            paths.add('__'.join(path))
+
+    # Drop paths already covered by a longer one
+    return tuple(sorted(
+        path for path in paths
+        if not any(other.startswith(path + '__') for other in paths)
+    ))
+
+
+class RelatedLoadingMixin:
+    """
+    Load the related objects a ViewSet's serializer reads in bulk instead of
+    lazily per row. The select_related() plan is derived from the serializer's
+    dotted `source` paths; ViewSets can add extra relations through
+    `select_related_fields` and `prefetch_related_fields`, which accept
+    lookup strings or Prefetch objects.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    def get_select_related(self):
+        return tuple(sorted(
+            set(related_paths_for(self.get_serializer_class())) |
+            set(self.select_related_fields)
+        ))
+
+    def get_prefetch_related(self):
+        return tuple(self.prefetch_related_fields)
+
+    def load_related(self, queryset):
+        """Apply the ViewSet's related-object loading plan to a queryset."""
+        select_related = self.get_select_related()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        prefetch_related = self.get_prefetch_related()
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        return queryset
+
+    def get_queryset(self):
+        return self.load_related(super().get_queryset())
+
+
+class ConditionalGetMixin:
+    """
+    Answer `If-None-Match` on list and retrieve with 304 Not Modified before
+    anything is serialized. The ETag hashes the row count and latest
+    `updated_at` of the filtered queryset, taken with one aggregate query,
+    together with the count and latest `updated_at` of each relation in
+    `conditional_related` whose data the serializer embeds (e.g. a tenant's
+    ledger balance), so changes there invalidate the response too.
+
+    No Last-Modified is sent: deleting a row lowers the count but not the
+    latest `updated_at`, so `If-Modified-Since` would keep answering 304
+    for a response that still lists the deleted row.
+    """
+    conditional_related = ()
+
+    def get_etag(self, queryset):
+        aggregates = {
+            'count': Count('pk', distinct=True),
+            'updated': Max('updated_at'),
+        }
+        for i, path in enumerate(self.conditional_related):
+            aggregates[f'count_{i}'] = Count(path, distinct=True)
+            aggregates[f'updated_{i}'] = Max(f'{path}__updated_at')
+        values = queryset.order_by().aggregate(**aggregates)
+
+        # The same rows render differently per page, filter and format
+        key = '|'.join([
+            self.request.get_full_path(),
+            self.request.accepted_renderer.format or '',
+            *(str(values[name]) for name in aggregates),
+        ])
+        return quote_etag(hashlib.sha256(key.encode()).hexdigest()[:32])
+
+    def conditional_response(self, queryset, render):
+        """
+        Return 304 if the client's copy is current, otherwise call render()
+        and stamp the response with the ETag.
+        """
+        etag = self.get_etag(queryset)
+
+        not_modified = get_conditional_response(self.request, etag=etag)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+
+        response = render()
+        if response.status_code == 200:
+            response['ETag'] = etag
+            # Revalidate every time rather than trusting a heuristic lifetime
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.filter_queryset(self.get_queryset()),
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return self.conditional_response(
+            queryset,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs))
+
+
+class ExportMixin:
+    """
+    Add a GET `export/` action that streams the filtered list as a CSV
+    (`?file_format=csv`, the default) or XLSX (`?file_format=xlsx`)
+    download. `?gzip=true` compresses CSV on the fly. Columns come from the
+    ViewSet's `export_columns`, a sequence of (header, dotted attribute
+    path) pairs. Every export is recorded in the activity log.
+    """
+    export_columns = ()
+    export_name = None
+
+    def get_export_name(self):
+        return self.export_name or self.queryset.model._meta.verbose_name_plural
+
+    def log_export(self, file_format, count, completed):
+        from .audit import log_activity
+
+        request = self.request
+        filters = ', '.join(
+            f'{key}={value}' for key, value in request.query_params.items()
+            if key not in ('file_format', 'gzip')
+        )
+        log_activity(
+            'EXPORT',
+            self.queryset.model.__name__,
+            (
+                f'Exported {count} {self.get_export_name()} as {file_format.upper()}'
+                f'{f" ({filters})" if filters else ""}'
+                f'{"" if completed else " - interrupted"}'
+            ),
+            request=request,
+        )
+
+    def logged_rows(self, rows, file_format):
+        """Pass rows through, logging the export once the stream ends."""
+        count = 0
+        completed = False
+        try:
+            for row in rows:
+                count += 1
+                yield row
+            completed = True
+        finally:
+            self.log_export(file_format, count, completed)
+
+    @action(detail=False, methods=['get'], renderer_classes=[PassthroughRenderer])
+    def export(self, request):
+        """Stream the filtered list as a CSV or XLSX file."""
+        from .exports import (
+            export_rows, csv_stream, gzip_stream, xlsx_stream, ExportError,
+            CONTENT_TYPES
+        )
+
+        file_format = request.query_params.get('file_format', 'csv').lower()
+        if file_format not in CONTENT_TYPES:
+            return JsonResponse(
+                {'error': 'file_format must be csv or xlsx'}, status=400)
+        compress = request.query_params.get('gzip') == 'true'
+
+        queryset = self.filter_queryset(self.get_queryset())
+        header = [title for title, _ in self.export_columns]
+        rows = self.logged_rows(
+            export_rows(queryset, self.export_columns), file_format)
+
+        name = self.get_export_name().replace(' ', '-')
+        filename = f'{name}-{timezone.now().strftime("%Y-%m-%d")}.{file_format}'
+        content_type = CONTENT_TYPES[file_format]
+
+        if file_format == 'xlsx':
+            try:
+                content = xlsx_stream(header, rows, name)
+            except ExportError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+        else:
+            content = csv_stream(header, rows)
+            if compress:
+                content = gzip_stream(content)
+                filename += '.gz'
+                content_type = 'application/gzip'
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -1,6 +1,12 @@
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import (
+    Sum, Max, Count, Q, F, Prefetch, Value, Window, DecimalField, Case, When,
+    ExpressionWrapper, OuterRef, Subquery
+)
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator
 from django.contrib.auth.models import User
+from django.utils import timezone
 from decimal import Decimal
 
 
@@ -30,6 +36,23 @@ class UserProfile(models.Model):
         return f"{self.user.username} ({self.get_role_display()})"
 
 
+class BuildingQuerySet(models.QuerySet):
+    """QuerySet helpers for computing building statistics in SQL."""
+
+    def with_stats(self):
+        """
+        Annotate unit counts and rent totals with conditional aggregates so
+        the Building stat properties don't need a query each.
+        """
+        occupied = Q(units__status='OCCUPIED')
+        return self.annotate(
+            num_occupied_units=Count('units', filter=occupied),
+            num_vacant_units=Count('units', filter=Q(units__status='VACANT')),
+            potential_income=Sum('units__monthly_rent'),
+            occupied_income=Sum('units__monthly_rent', filter=occupied),
+        )
+
+
 class Building(models.Model):
     """
     Represents a building/property in the rental system.
@@ -44,17 +67,23 @@ class Building(models.Model):
     def __str__(self):
         return f"{self.name} - {self.address}"
 
+    objects = BuildingQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
 
     @property
     def occupied_units_count(self):
         """Returns the number of occupied units in this building."""
+        if hasattr(self, 'num_occupied_units'):
+            return self.num_occupied_units
         return self.units.filter(status='OCCUPIED').count()
 
     @property
     def vacant_units_count(self):
         """Returns the number of vacant units in this building."""
+        if hasattr(self, 'num_vacant_units'):
+            return self.num_vacant_units
         return self.units.filter(status='VACANT').count()
 
     @property
@@ -67,15 +96,29 @@ class Building(models.Model):
     @property
     def total_potential_income(self):
         """Returns the total potential monthly income if all units were occupied."""
-        return sum(unit.monthly_rent for unit in self.units.all())
+        if hasattr(self, 'potential_income'):
+            return self.potential_income or 0
+        return self.units.aggregate(total=Sum('monthly_rent'))['total'] or 0
 
     @property
     def actual_monthly_income(self):
         """Returns the actual monthly income from occupied units."""
-        return sum(
-            unit.monthly_rent
-            for unit in self.units.filter(status='OCCUPIED')
-        )
+        if hasattr(self, 'occupied_income'):
+            return self.occupied_income or 0
+        return self.units.filter(status='OCCUPIED').aggregate(
+            total=Sum('monthly_rent'))['total'] or 0
+
+
+class UnitQuerySet(models.QuerySet):
+    """QuerySet helpers for loading units with their occupants."""
+
+    def with_current_tenant(self):
+        """Prefetch active tenants so Unit.current_tenant needs no query."""
+        return self.prefetch_related(Prefetch(
+            'tenants',
+            queryset=Tenant.objects.filter(move_out_date__isnull=True),
+            to_attr='active_tenants',
+        ))
 
 
 class Unit(models.Model):
@@ -111,17 +154,26 @@ class Unit(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = UnitQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.building.name} - Unit {self.unit_number}"
 
     class Meta:
         ordering = ['building', 'unit_number']
         unique_together = ['building', 'unit_number']
+        indexes = [
+            # Occupancy counts and the status filter
+            models.Index(fields=['status', 'building'],
+                         name='unit_status_building_idx'),
+        ]
 
     @property
     def current_tenant(self):
         """Returns the current tenant if unit is occupied."""
         if self.status == 'OCCUPIED':
+            if hasattr(self, 'active_tenants'):
+                return self.active_tenants[0] if self.active_tenants else None
             return self.tenants.filter(move_out_date__isnull=True).first()
         return None
 
@@ -160,6 +212,13 @@ class Tenant(models.Model):
 
     class Meta:
         ordering = ['-move_in_date']
+        indexes = [
+            # Login / current-user lookups
+            models.Index(fields=['email'], name='tenant_email_idx'),
+            # Active tenants only: current tenant per unit, active counts
+            models.Index(fields=['unit'], name='tenant_active_unit_idx',
+                         condition=Q(move_out_date__isnull=True)),
+        ]
 
     @property
     def full_name(self):
@@ -174,20 +233,23 @@ class Tenant(models.Model):
     @property
     def total_balance(self):
         """Returns the tenant's current balance (positive = owes money)."""
-        total_charges = sum(
-            payment.amount
-            for payment in self.payments.filter(payment_type='CHARGE')
-        )
-        total_payments = sum(
-            payment.amount
-            for payment in self.payments.filter(payment_type='PAYMENT')
-        )
-        return total_charges - total_payments
+        if self.pk is None:
+            return Decimal('0.00')
+        try:
+            ledger = self.ledger
+        except TenantBalance.DoesNotExist:
+            # Tenants created before ledgers existed: total without writing
+            ledger = (TenantBalance.compute_totals([self.pk]).get(self.pk)
+                      or TenantBalance(tenant_id=self.pk))
+        return ledger.balance
 
     def save(self, *args, **kwargs):
-        """Override save to update unit status."""
+        """Override save to update unit status and open the tenant's ledger."""
         is_new = self.pk is None
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                self.ledger = TenantBalance.objects.create(tenant=self)
 
         # Update unit status
         if self.is_active:
@@ -203,6 +265,94 @@ class Tenant(models.Model):
         self.unit.save()
 
 
+class PaymentQuerySet(models.QuerySet):
+    """QuerySet helpers for ledger calculations."""
+
+    def in_period(self, start_date=None, end_date=None):
+        """Transactions dated within the (inclusive, open-ended) period."""
+        queryset = self
+        if start_date:
+            queryset = queryset.filter(transaction_date__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(transaction_date__lte=end_date)
+        return queryset
+
+    def signed_amount(self):
+        """Charges count positive and payments negative."""
+        return Case(
+            When(payment_type='CHARGE', then=F('amount')),
+            default=-F('amount'),
+            output_field=DecimalField(max_digits=12, decimal_places=2)
+        )
+
+    def balance(self):
+        """Charges minus payments over the queryset, in one query."""
+        total = self.aggregate(balance=Sum(self.signed_amount()))['balance']
+        return total or Decimal('0.00')
+
+    def with_running_balance(self, opening_balance=Decimal('0.00')):
+        """
+        Order by (transaction_date, id) and annotate each row's
+        `running_balance` (opening balance plus the cumulative signed
+        amount) with a window function. Callers should check
+        `supports_running_balance()` first and accumulate in Python when
+        the database has no window support.
+        """
+        return self.order_by('transaction_date', 'id').annotate(
+            running_balance=ExpressionWrapper(
+                Value(opening_balance) + Window(
+                    Sum(self.signed_amount()),
+                    order_by=[F('transaction_date').asc(), F('id').asc()]
+                ),
+                output_field=DecimalField(max_digits=14, decimal_places=2)
+            )
+        )
+
+    def supports_running_balance(self):
+        return connections[self.db].features.supports_over_clause
+
+    def opening_balances(self, start_date):
+        """{tenant_id: balance} of everything dated before `start_date`."""
+        return dict(
+            self.filter(transaction_date__lt=start_date)
+            .order_by()
+            .values('tenant_id')
+            .annotate(balance=Sum(self.signed_amount()))
+            .values_list('tenant_id', 'balance')
+        )
+
+    def unpaid_charges(self):
+        """
+        Charges not yet covered by the tenant's payments, allocating payments
+        first-in first-out. Each row is annotated with `running_total` (the
+        tenant's cumulative charges up to and including it) and `paid` (the
+        tenant's total payments); its unpaid portion is
+        min(amount, running_total - paid). Reads payments from the ledger,
+        or sums them for tenants that have no ledger row yet.
+        """
+        paid_without_ledger = (
+            self.model.objects.filter(
+                tenant_id=OuterRef('tenant_id'), payment_type='PAYMENT')
+            .order_by()
+            .values('tenant_id')
+            .annotate(total=Sum('amount'))
+            .values('total')
+        )
+        return self.filter(payment_type='CHARGE').annotate(
+            paid=Coalesce(
+                F('tenant__ledger__total_payments'),
+                Subquery(paid_without_ledger),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+            running_total=Window(
+                Sum('amount'),
+                partition_by=[F('tenant_id')],
+                order_by=[F('transaction_date').asc(), F('id').asc()]
+            )
+        ).filter(running_total__gt=F('paid'))
+
+
 class Payment(models.Model):
     """
     Represents a payment transaction (both charges and payments).
@@ -242,17 +392,312 @@ class Payment(models.Model):
         null=True
     )
     transaction_date = models.DateField()
+    billing_period = models.DateField(
+        blank=True,
+        null=True,
+        help_text="First day of the month a rent charge covers"
+    )
+    late_fee_period = models.DateField(
+        blank=True,
+        null=True,
+        help_text="First day of the month a late fee charge was assessed for"
+    )
     description = models.CharField(max_length=200)
     reference_number = models.CharField(max_length=100, blank=True, null=True)
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PaymentQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.payment_type} - {self.tenant.full_name} - {self.amount}"
 
     class Meta:
         ordering = ['-transaction_date', '-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant', 'billing_period'],
+                condition=Q(payment_type='CHARGE',
+                            billing_period__isnull=False),
+                name='unique_rent_charge_per_period',
+            ),
+            models.UniqueConstraint(
+                fields=['tenant', 'late_fee_period'],
+                condition=Q(payment_type='CHARGE',
+                            late_fee_period__isnull=False),
+                name='unique_late_fee_per_period',
+            ),
+        ]
+        indexes = [
+            # Ledger totals and unpaid-charge windows per tenant
+            models.Index(fields=['tenant', 'payment_type', 'transaction_date'],
+                         name='payment_tenant_type_date_idx'),
+            # Statements: keyset seek over one tenant's history
+            models.Index(fields=['tenant', 'transaction_date', 'id'],
+                         name='payment_tenant_date_idx'),
+            # List order and keyset pagination
+            models.Index(fields=['-transaction_date', '-created_at', '-id'],
+                         name='payment_list_order_idx'),
+            # Rent already billed for a period
+            models.Index(fields=['billing_period'],
+                         name='payment_charge_period_idx',
+                         condition=Q(payment_type='CHARGE')),
+            # Duplicate checks when importing statements
+            models.Index(fields=['reference_number'],
+                         name='payment_reference_idx',
+                         condition=Q(reference_number__isnull=False)),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Override save to keep the tenant's balance ledger in sync."""
+        tenant_ids = {self.tenant_id}
+        if self.pk is not None:
+            # The payment may have been moved to a different tenant
+            previous = Payment.objects.filter(pk=self.pk).values_list(
+                'tenant_id', flat=True).first()
+            if previous is not None:
+                tenant_ids.add(previous)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            ledgers = TenantBalance.refresh_for(tenant_ids)
+
+        self._update_cached_ledger(ledgers)
+
+    def delete(self, *args, **kwargs):
+        """Override delete to keep the tenant's balance ledger in sync."""
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            ledgers = TenantBalance.refresh_for([self.tenant_id])
+
+        self._update_cached_ledger(ledgers)
+        return result
+
+    def _update_cached_ledger(self, ledgers):
+        """Refresh the ledger cached on an already-loaded tenant instance."""
+        if not Payment.tenant.is_cached(self):
+            return
+        for ledger in ledgers:
+            if ledger.tenant_id == self.tenant_id:
+                self.tenant.ledger = ledger
+
+
+class TenantBalance(models.Model):
+    """
+    Materialized per-tenant ledger totals.
+    Kept up to date by Payment.save()/delete(); rows written in bulk must be
+    followed by TenantBalance.refresh_for(). Rebuild everything with the
+    `reconcile_balances` management command.
+    """
+    tenant = models.OneToOneField(
+        Tenant,
+        on_delete=models.CASCADE,
+        related_name='ledger'
+    )
+    total_charges = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    total_payments = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    last_charge_date = models.DateField(null=True, blank=True)
+    last_payment_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    REFRESH_CHUNK_SIZE = 500
+
+    def __str__(self):
+        return f"{self.tenant_id} - Balance {self.balance}"
+
+    class Meta:
+        verbose_name_plural = 'Tenant Balances'
+
+    @property
+    def balance(self):
+        """Returns the outstanding balance (positive = owes money)."""
+        return self.total_charges - self.total_payments
+
+    @staticmethod
+    def compute_totals(tenant_ids=None):
+        """
+        Compute ledger totals straight from the Payment table in one grouped
+        query. Returns {tenant_id: TenantBalance} (unsaved instances).
+        """
+        payments = Payment.objects.all()
+        if tenant_ids is not None:
+            payments = payments.filter(tenant_id__in=tenant_ids)
+
+        rows = payments.order_by().values('tenant_id').annotate(
+            total_charges=Sum('amount', filter=Q(payment_type='CHARGE')),
+            total_payments=Sum('amount', filter=Q(payment_type='PAYMENT')),
+            last_charge_date=Max(
+                'transaction_date', filter=Q(payment_type='CHARGE')),
+            last_payment_date=Max(
+                'transaction_date', filter=Q(payment_type='PAYMENT')),
+        )
+
+        totals = {}
+        for row in rows:
+            totals[row['tenant_id']] = TenantBalance(
+                tenant_id=row['tenant_id'],
+                total_charges=row['total_charges'] or Decimal('0.00'),
+                total_payments=row['total_payments'] or Decimal('0.00'),
+                last_charge_date=row['last_charge_date'],
+                last_payment_date=row['last_payment_date'],
+            )
+        return totals
+
+    @classmethod
+    def refresh_for(cls, tenant_ids):
+        """
+        Recompute and upsert the ledger rows (and receivables aging) for the
+        given tenants. Returns the list of refreshed TenantBalance instances.
+
+        The tenant rows are locked first, so a concurrent write for the same
+        tenant waits and then totals a snapshot that includes this one's
+        payments, rather than both upserting totals that miss the other's.
+        """
+        tenant_ids = sorted(pk for pk in set(tenant_ids) if pk is not None)
+        ledgers = []
+
+        with transaction.atomic():
+            # Chunk the IN clause to stay under database parameter limits
+            for start in range(0, len(tenant_ids), cls.REFRESH_CHUNK_SIZE):
+                chunk = tenant_ids[start:start + cls.REFRESH_CHUNK_SIZE]
+                list(Tenant.objects.select_for_update().filter(pk__in=chunk)
+                     .order_by('pk').values_list('pk', flat=True))
+                totals = cls.compute_totals(chunk)
+                ledgers.extend(cls.save_ledgers([
+                    totals.get(pk) or cls(tenant_id=pk)
+                    for pk in chunk
+                ]))
+                TenantAging.refresh_for(chunk)
+        return ledgers
+
+    @classmethod
+    def save_ledgers(cls, ledgers, batch_size=1000):
+        """Insert or update ledger rows in bulk."""
+        return cls.objects.bulk_create(
+            ledgers,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['tenant'],
+            update_fields=[
+                'total_charges', 'total_payments',
+                'last_charge_date', 'last_payment_date', 'updated_at',
+            ],
+        )
+
+
+class TenantAging(models.Model):
+    """
+    Accounts-receivable aging per tenant: the unpaid part of each charge
+    (payments allocated oldest charge first) bucketed by days past its
+    transaction date as of `as_of`. Refreshed together with the tenant's
+    ledger and rebuilt nightly by the `rebuild_aging` command so the
+    buckets follow the calendar.
+    """
+    BUCKETS = ['current', 'days_1_30', 'days_31_60', 'days_61_90',
+               'days_over_90']
+
+    tenant = models.OneToOneField(
+        Tenant,
+        on_delete=models.CASCADE,
+        related_name='aging'
+    )
+    as_of = models.DateField()
+    current = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    days_1_30 = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    days_31_60 = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    days_61_90 = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    days_over_90 = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    total_due = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    oldest_unpaid_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.tenant_id} - Due {self.total_due} as of {self.as_of}"
+
+    class Meta:
+        verbose_name_plural = 'Tenant Aging'
+
+    @property
+    def days_overdue(self):
+        """Days since the oldest unpaid charge, as of today."""
+        if self.oldest_unpaid_date is None:
+            return 0
+        return (timezone.now().date() - self.oldest_unpaid_date).days
+
+    @staticmethod
+    def bucket_for(days):
+        if days <= 0:
+            return 'current'
+        if days <= 30:
+            return 'days_1_30'
+        if days <= 60:
+            return 'days_31_60'
+        if days <= 90:
+            return 'days_61_90'
+        return 'days_over_90'
+
+    @classmethod
+    def compute(cls, tenant_ids=None, as_of=None):
+        """
+        Compute aging rows from the unpaid charges in one window query.
+        Returns {tenant_id: TenantAging} (unsaved) for tenants that owe.
+        """
+        as_of = as_of or timezone.now().date()
+        charges = Payment.objects.all()
+        if tenant_ids is not None:
+            charges = charges.filter(tenant_id__in=tenant_ids)
+
+        rows = charges.unpaid_charges().order_by(
+            'tenant_id', 'transaction_date', 'id'
+        ).values_list('tenant_id', 'transaction_date', 'amount',
+                      'running_total', 'paid')
+
+        aging = {}
+        for tenant_id, transaction_date, amount, running_total, paid in rows.iterator():
+            row = aging.get(tenant_id)
+            if row is None:
+                row = aging[tenant_id] = cls(
+                    tenant_id=tenant_id, as_of=as_of,
+                    oldest_unpaid_date=transaction_date)
+
+            unpaid = min(amount, running_total - paid)
+            bucket = cls.bucket_for((as_of - transaction_date).days)
+            setattr(row, bucket, getattr(row, bucket) + unpaid)
+            row.total_due += unpaid
+
+        return aging
+
+    @classmethod
+    def refresh_for(cls, tenant_ids, as_of=None):
+        """Recompute and upsert the aging rows for the given tenants."""
+        as_of = as_of or timezone.now().date()
+        aging = cls.compute(tenant_ids, as_of)
+        return cls.save_rows([
+            aging.get(pk) or cls(tenant_id=pk, as_of=as_of)
+            for pk in tenant_ids
+        ])
+
+    @classmethod
+    def save_rows(cls, rows, batch_size=1000):
+        """Insert or update aging rows in bulk."""
+        return cls.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['tenant'],
+            update_fields=cls.BUCKETS + [
+                'as_of', 'total_due', 'oldest_unpaid_date', 'updated_at',
+            ],
+        )
 
 
 class SystemSettings(models.Model):
@@ -351,6 +796,10 @@ class Expense(models.Model):
 
     class Meta:
         ordering = ['-expense_date', '-created_at']
+        indexes = [
+            models.Index(fields=['building', 'category', 'expense_date'],
+                         name='expense_bldg_cat_date_idx'),
+        ]
 
 
 class MaintenanceRequest(models.Model):
@@ -432,6 +881,8 @@ class Document(models.Model):
         ('CONTRACT', 'Contract'),
         ('RECEIPT', 'Receipt'),
         ('CERTIFICATE', 'Certificate'),
+        ('STATEMENT', 'Statement'),
+        ('INVOICE', 'Invoice'),
         ('OTHER', 'Other'),
     ]
 
@@ -505,6 +956,11 @@ class Lease(models.Model):
 
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            # expiring_soon: active leases by end date
+            models.Index(fields=['status', 'end_date'],
+                         name='lease_status_end_idx'),
+        ]
 
     @property
     def is_expiring_soon(self):
@@ -535,13 +991,22 @@ class ActivityLog(models.Model):
     object_id = models.IntegerField(null=True, blank=True)
     description = models.TextField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: entries are written in batches after the fact
+    # (see audit.log_activity) and keep the time they were logged
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     def __str__(self):
         return f"{self.user} - {self.action} - {self.model_name} - {self.timestamp}"
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # List order and keyset pagination
+            models.Index(fields=['-timestamp', '-id'],
+                         name='activity_timestamp_idx'),
+            models.Index(fields=['action', '-timestamp'],
+                         name='activity_action_time_idx'),
+        ]
 
 
 class Utility(models.Model):
@@ -588,6 +1053,14 @@ class Utility(models.Model):
     class Meta:
         ordering = ['-billing_period_start']
         verbose_name_plural = 'Utilities'
+        indexes = [
+            # List order and keyset pagination
+            models.Index(fields=['-billing_period_start', '-id'],
+                         name='utility_period_idx'),
+            # Unpaid bills by due date
+            models.Index(fields=['due_date'], name='utility_unpaid_due_idx',
+                         condition=Q(paid=False)),
+        ]
 
     @property
     def is_overdue(self):
@@ -646,3 +1119,131 @@ class PropertyPhoto(models.Model):
     class Meta:
         ordering = ['display_order', '-uploaded_at']
         verbose_name_plural = 'Property Photos'
+
+
+class Notification(models.Model):
+    """
+    Outbox of SMS and email messages waiting to be delivered.
+    Rows are written in the same transaction as the change that triggered
+    them and drained by the `process_notifications` management command.
+    """
+    CHANNEL_CHOICES = [
+        ('SMS', 'SMS'),
+        ('EMAIL', 'Email'),
+    ]
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('SKIPPED', 'Skipped'),  # Channel not configured
+        ('DEAD', 'Dead Letter'),  # Gave up after repeated failures
+    ]
+
+    tenant = models.ForeignKey(
+        Tenant,
+        on_delete=models.SET_NULL,
+        related_name='notifications',
+        null=True,
+        blank=True
+    )
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    recipient = models.CharField(max_length=254)
+    subject = models.CharField(max_length=200, blank=True)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.channel} to {self.recipient} - {self.status}"
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'],
+                         name='notification_queue_idx'),
+        ]
+
+
+class ReconciliationRun(models.Model):
+    """
+    One reconciliation of an external transaction list (M-Pesa or bank
+    statement) against the recorded payments for a date window.
+    """
+    payment_method = models.CharField(
+        max_length=20,
+        choices=Payment.PAYMENT_METHOD_CHOICES,
+        blank=True,
+        help_text="Only payments recorded with this method are compared"
+    )
+    source_name = models.CharField(max_length=255, blank=True)
+    date_from = models.DateField()
+    date_to = models.DateField()
+    total_records = models.IntegerField(default=0)
+    matched_count = models.IntegerField(default=0)
+    mismatch_count = models.IntegerField(default=0)
+    duplicate_count = models.IntegerField(default=0)
+    unknown_count = models.IntegerField(default=0)
+    missing_count = models.IntegerField(default=0)
+    matched_amount = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    created_by = models.CharField(max_length=100, default='System')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Reconciliation {self.pk} - {self.date_from} to {self.date_to}"
+
+    class Meta:
+        ordering = ['-created_at']
+
+
+class ReconciliationItem(models.Model):
+    """
+    The outcome for one external record, or for a recorded payment the
+    external list does not contain (MISSING).
+    """
+    STATUS_CHOICES = [
+        ('MATCHED', 'Matched'),
+        ('AMOUNT_MISMATCH', 'Amount Mismatch'),
+        ('DUPLICATE', 'Duplicate'),
+        ('UNKNOWN', 'Unknown'),
+        ('MISSING', 'Missing from Statement'),
+    ]
+
+    run = models.ForeignKey(
+        ReconciliationRun,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    line = models.IntegerField(null=True, blank=True)
+    reference = models.CharField(max_length=100, blank=True)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    transaction_date = models.DateField()
+    payment = models.ForeignKey(
+        Payment,
+        on_delete=models.SET_NULL,
+        related_name='reconciliation_items',
+        null=True,
+        blank=True
+    )
+    expected_amount = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True)
+    note = models.CharField(max_length=200, blank=True)
+
+    def __str__(self):
+        return f"{self.reference or '-'} - {self.status}"
+
+    class Meta:
+        ordering = ['run', 'id']
+        indexes = [
+            models.Index(fields=['run', 'status'],
+                         name='recon_item_run_status_idx'),
+        ]
@@ -1,287 +1,420 @@
 """
 Notification service for sending SMS and Email notifications
+
+Messages are written to the Notification outbox by the notify_* methods and
+delivered in batches by the `process_notifications` management command.
 """
-from django.core.mail import send_mail
+import threading
+import time
+from datetime import timedelta
+from functools import lru_cache
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.safestring import mark_safe
 from decouple import config
+from .models import Notification
+from . import metrics
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Per-thread Twilio clients; each keeps its own pooled HTTP session
+_sms_clients = threading.local()
+
+TEMPLATE_DIR = 'properties/notifications'
+
+# Email subject and accent colour per notification kind; bodies live in
+# templates/properties/notifications/<kind>.html, <kind>.txt, <kind>_sms.txt
+NOTIFICATION_KINDS = {
+    'rent_charged': {
+        'subject': 'Rent Charged for {month}',
+        'accent': '#2196F3',
+    },
+    'payment_received': {
+        'subject': 'Payment Received - Thank You!',
+        'accent': '#4CAF50',
+    },
+    'late_payment': {
+        'subject': 'URGENT: Rent Payment {days_late} Days Overdue',
+        'accent': '#f44336',
+    },
+}
+
+
+class NotificationNotConfigured(Exception):
+    """Raised when a delivery channel has no credentials configured."""
+
+
+@lru_cache(maxsize=None)
+def notification_template(name):
+    """Load and compile a notification template once per process."""
+    return get_template(f'{TEMPLATE_DIR}/{name}')
+
+
+def render_notification(name, context):
+    return notification_template(name).render(context)
+
+
+@lru_cache(maxsize=None)
+def email_styles(accent):
+    """The static <style> fragment, rendered once per accent colour."""
+    return mark_safe(render_notification(
+        'email_styles.html', {'accent': accent}))
+
+
+@lru_cache(maxsize=None)
+def twilio_settings():
+    """Read the Twilio credentials once per process."""
+    account_sid = config('TWILIO_ACCOUNT_SID', default=None)
+    auth_token = config('TWILIO_AUTH_TOKEN', default=None)
+    from_phone = config('TWILIO_PHONE_NUMBER', default=None)
+
+    if not all([account_sid, auth_token, from_phone]):
+        return None
+    return account_sid, auth_token, from_phone
+
 
 class NotificationService:
     """Service for sending notifications to tenants"""
 
     @staticmethod
-    def send_sms(phone_number, message):
+    def get_sms_client():
         """
-        Send SMS using Twilio
+        Return this thread's Twilio client, creating it on first use.
+        Reusing the client reuses its HTTP connection pool.
         """
-        try:
-            # Only send if Twilio is configured
-            account_sid = config('TWILIO_ACCOUNT_SID', default=None)
-            auth_token = config('TWILIO_AUTH_TOKEN', default=None)
-            from_phone = config('TWILIO_PHONE_NUMBER', default=None)
-
-            if not all([account_sid, auth_token, from_phone]):
-                logger.warning("Twilio not configured. SMS not sent.")
-                return False
+        credentials = twilio_settings()
+        if credentials is None:
+            raise NotificationNotConfigured('Twilio not configured')
 
+        client = getattr(_sms_clients, 'client', None)
+        if client is None:
             from twilio.rest import Client
+            account_sid, auth_token, _ = credentials
             client = Client(account_sid, auth_token)
+            _sms_clients.client = client
+        return client
 
-            message = client.messages.create(
-                body=message,
-                from_=from_phone,
-                to=phone_number
-            )
+    @classmethod
+    def deliver_sms(cls, phone_number, message):
+        """
+        Send SMS using Twilio. Raises on failure.
+        """
+        client = cls.get_sms_client()
+        from_phone = twilio_settings()[2]
 
-            logger.info(
-                f"SMS sent successfully to {phone_number}. SID: {message.sid}")
-            return True
+        message = client.messages.create(
+            body=message,
+            from_=from_phone,
+            to=phone_number
+        )
 
-        except Exception as e:
-            logger.error(f"Failed to send SMS to {phone_number}: {str(e)}")
-            return False
+        logger.info(
+            f"SMS sent successfully to {phone_number}. SID: {message.sid}")
+        return message.sid
 
     @staticmethod
-    def send_email(recipient_email, subject, message, html_message=None):
-        """
-        Send email using Django's email backend
-        """
-        try:
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[recipient_email],
-                html_message=html_message,
-                fail_silently=False,
-            )
-            logger.info(f"Email sent successfully to {recipient_email}")
-            return True
+    def build_email(notification, connection=None):
+        """Build the email message for an outbox row."""
+        email = EmailMultiAlternatives(
+            subject=notification.subject,
+            body=notification.body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[notification.recipient],
+            connection=connection,
+        )
+        if notification.html_body:
+            email.attach_alternative(notification.html_body, 'text/html')
+        return email
+
+    @classmethod
+    def send_batch(cls, notifications):
+        """
+        Deliver a list of Notification messages, reusing one SMTP connection
+        and one SMS client for the whole batch.
+        Returns a list of (notification, error) pairs; error is None on success.
+        """
+        results = []
+        emails = [n for n in notifications if n.channel == 'EMAIL']
+        sms = [n for n in notifications if n.channel == 'SMS']
+
+        for notification in sms:
+            started = time.perf_counter()
+            try:
+                cls.deliver_sms(notification.recipient, notification.body)
+                results.append((notification, None))
+            except Exception as e:
+                results.append((notification, e))
+            cls.record_send(*results[-1], started)
+
+        if emails:
+            connection = get_connection(fail_silently=False)
+            try:
+                for notification in emails:
+                    started = time.perf_counter()
+                    try:
+                        # Open once and keep it open across sends: a message
+                        # sent over a closed connection opens and closes a
+                        # session of its own
+                        connection.open()
+                        cls.build_email(notification, connection).send()
+                        logger.info(
+                            f"Email sent successfully to {notification.recipient}")
+                        results.append((notification, None))
+                    except Exception as e:
+                        # Drop a possibly broken connection; the next send
+                        # opens a new one
+                        try:
+                            connection.close()
+                        except Exception:
+                            pass
+                        results.append((notification, e))
+                    cls.record_send(*results[-1], started)
+            finally:
+                connection.close()
+
+        return results
+
+    @staticmethod
+    def record_send(notification, error, started):
+        """Observe how long one delivery attempt took."""
+        if error is None:
+            outcome = 'sent'
+        elif isinstance(error, NotificationNotConfigured):
+            outcome = 'skipped'
+        else:
+            outcome = 'failed'
+        metrics.observe(
+            'notification_send_duration_seconds', time.perf_counter() - started,
+            channel=notification.channel, outcome=outcome)
+
+    @classmethod
+    def send_sms(cls, phone_number, message):
+        """
+        Send SMS immediately, bypassing the outbox
+        """
+        [(_, error)] = cls.send_batch([Notification(
+            channel='SMS', recipient=phone_number, body=message)])
+
+        if isinstance(error, NotificationNotConfigured):
+            logger.warning("Twilio not configured. SMS not sent.")
+        elif error is not None:
+            logger.error(f"Failed to send SMS to {phone_number}: {str(error)}")
+        return error is None
 
-        except Exception as e:
+    @classmethod
+    def send_email(cls, recipient_email, subject, message, html_message=None):
+        """
+        Send email immediately, bypassing the outbox
+        """
+        [(_, error)] = cls.send_batch([Notification(
+            channel='EMAIL', recipient=recipient_email, subject=subject,
+            body=message, html_body=html_message or '')])
+
+        if error is not None:
             logger.error(
-                f"Failed to send email to {recipient_email}: {str(e)}")
-            return False
+                f"Failed to send email to {recipient_email}: {str(error)}")
+        return error is None
+
+    # Outbox
+
+    @staticmethod
+    def enqueue(messages):
+        """
+        Write messages to the outbox. Call inside the transaction that
+        triggered them so they are only delivered if it commits.
+        """
+        return Notification.objects.bulk_create(messages, batch_size=500)
+
+    @staticmethod
+    def claim_batch(batch_size, lease_seconds=300):
+        """
+        Mark up to `batch_size` due messages as SENDING and return them.
+        A SENDING message whose lease expired (crashed worker) is due again.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                Notification.objects.select_for_update(skip_locked=True)
+                .filter(status__in=['PENDING', 'SENDING'],
+                        next_attempt_at__lte=now)
+                .order_by('next_attempt_at')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            Notification.objects.filter(id__in=ids).update(
+                status='SENDING',
+                next_attempt_at=now + timedelta(seconds=lease_seconds),
+                updated_at=now
+            )
+        return list(Notification.objects.filter(id__in=ids))
 
     @classmethod
-    def notify_rent_charged(cls, tenant, amount, month):
+    def process_batch(cls, executor, workers=1, batch_size=100):
         """
-        Notify tenant when rent is charged
+        Claim a batch, split it across the executor's threads (one
+        send_batch() and thus one connection per thread) and record the
+        outcome. Failed sends are retried with exponential backoff and
+        dead-lettered after NOTIFICATION_MAX_ATTEMPTS.
+        Returns a dict of counts per resulting status.
+        """
+        batch = cls.claim_batch(batch_size)
+        counts = {'SENT': 0, 'PENDING': 0, 'SKIPPED': 0, 'DEAD': 0}
+        if not batch:
+            return counts
+
+        max_attempts = settings.NOTIFICATION_MAX_ATTEMPTS
+        base_delay = settings.NOTIFICATION_RETRY_BASE_SECONDS
+        chunks = [batch[i::workers] for i in range(min(workers, len(batch)))]
+
+        for results in executor.map(cls.send_batch, chunks):
+            for notification, error in results:
+                now = timezone.now()
+                notification.attempts += 1
+                notification.updated_at = now
+
+                if error is None:
+                    notification.status = 'SENT'
+                    notification.sent_at = now
+                    notification.last_error = ''
+                elif isinstance(error, NotificationNotConfigured):
+                    notification.status = 'SKIPPED'
+                    notification.last_error = str(error)
+                elif notification.attempts >= max_attempts:
+                    notification.status = 'DEAD'
+                    notification.last_error = str(error)
+                    logger.error(
+                        f"Giving up on {notification}: {notification.last_error}")
+                else:
+                    delay = base_delay * 2 ** (notification.attempts - 1)
+                    notification.status = 'PENDING'
+                    notification.next_attempt_at = now + timedelta(seconds=delay)
+                    notification.last_error = str(error)
+
+                counts[notification.status] += 1
+
+        Notification.objects.bulk_update(batch, [
+            'status', 'attempts', 'next_attempt_at', 'last_error',
+            'sent_at', 'updated_at',
+        ])
+        return counts
+
+    # Message builders
+
+    @staticmethod
+    def tenant_context(tenant):
         """
-        # SMS Notification
-        sms_message = f"Dear {tenant.first_name}, your rent of KES {amount:,.2f} for {month} has been charged. Balance: KES {tenant.total_balance:,.2f}. Thank you!"
+        Context shared by every message for a tenant. Reads the balance once;
+        expects unit, building and ledger to be loaded already when called
+        in bulk (see build_bulk).
+        """
+        return {
+            'first_name': tenant.first_name,
+            'full_name': tenant.full_name,
+            'unit_number': tenant.unit.unit_number,
+            'building_name': tenant.unit.building.name,
+            'balance': f'{tenant.total_balance:,.2f}',
+        }
+
+    @classmethod
+    def build_messages(cls, kind, tenant, **context):
+        """
+        Render the SMS and email outbox messages of a notification kind
+        (a key of NOTIFICATION_KINDS) for one tenant.
+        """
+        spec = NOTIFICATION_KINDS[kind]
+        context = {**cls.tenant_context(tenant), **context}
+        messages = []
 
-        if tenant.phone_number:
-            cls.send_sms(tenant.phone_number, sms_message)
+        if tenant.phone:
+            messages.append(Notification(
+                tenant=tenant, channel='SMS', recipient=tenant.phone,
+                body=render_notification(f'{kind}_sms.txt', context).strip()))
 
-        # Email Notification
         if tenant.email:
-            subject = f"Rent Charged for {month}"
-            email_message = f"""
-Dear {tenant.full_name},
-
-This is to notify you that your rent has been charged:
-
-Amount: KES {amount:,.2f}
-Month: {month}
-Unit: {tenant.unit.unit_number}
-Building: {tenant.unit.building.name}
-
-Current Balance: KES {tenant.total_balance:,.2f}
-
-Please make payment at your earliest convenience.
-
-Thank you for your cooperation.
-
-Best regards,
-Property Management Team
-            """
-
-            html_message = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: #2196F3; color: white; padding: 20px; text-align: center; }}
-        .content {{ padding: 20px; background: #f9f9f9; }}
-        .detail {{ background: white; padding: 15px; margin: 10px 0; border-left: 4px solid #2196F3; }}
-        .footer {{ text-align: center; padding: 20px; color: #666; font-size: 12px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h2>Rent Charged Notice</h2>
-        </div>
-        <div class="content">
-            <p>Dear <strong>{tenant.full_name}</strong>,</p>
-            <p>This is to notify you that your rent has been charged:</p>
-            <div class="detail">
-                <p><strong>Amount:</strong> KES {amount:,.2f}</p>
-                <p><strong>Month:</strong> {month}</p>
-                <p><strong>Unit:</strong> {tenant.unit.unit_number}</p>
-                <p><strong>Building:</strong> {tenant.unit.building.name}</p>
-            </div>
-            <div class="detail">
-                <p><strong>Current Balance:</strong> KES {tenant.total_balance:,.2f}</p>
-            </div>
-            <p>Please make payment at your earliest convenience.</p>
-            <p>Thank you for your cooperation.</p>
-        </div>
-        <div class="footer">
-            <p>Property Management System</p>
-        </div>
-    </div>
-</body>
-</html>
-            """
-
-            cls.send_email(tenant.email, subject, email_message, html_message)
+            html_context = {**context, 'styles': email_styles(spec['accent'])}
+            messages.append(Notification(
+                tenant=tenant, channel='EMAIL', recipient=tenant.email,
+                subject=spec['subject'].format(**context),
+                body=render_notification(f'{kind}.txt', context),
+                html_body=render_notification(f'{kind}.html', html_context)))
+
+        return messages
 
     @classmethod
-    def notify_payment_received(cls, tenant, amount, payment_date):
+    def build_bulk(cls, kind, items):
         """
-        Notify tenant when payment is received
+        Render messages for many tenants at once. `items` is an iterable of
+        (tenant, context) pairs; units, buildings and ledgers missing from
+        the tenants are loaded with one query per relation up front.
         """
-        # SMS Notification
-        sms_message = f"Dear {tenant.first_name}, we have received your payment of KES {amount:,.2f}. New balance: KES {tenant.total_balance:,.2f}. Thank you!"
+        items = list(items)
+        prefetch_related_objects(
+            [tenant for tenant, _ in items], 'unit__building', 'ledger')
 
-        if tenant.phone_number:
-            cls.send_sms(tenant.phone_number, sms_message)
+        messages = []
+        for tenant, context in items:
+            messages.extend(cls.build_messages(kind, tenant, **context))
+        return messages
 
-        # Email Notification
-        if tenant.email:
-            subject = "Payment Received - Thank You!"
-            email_message = f"""
-Dear {tenant.full_name},
-
-We have successfully received your payment:
-
-Amount: KES {amount:,.2f}
-Date: {payment_date}
-New Balance: KES {tenant.total_balance:,.2f}
-
-Thank you for your prompt payment!
-
-Best regards,
-Property Management Team
-            """
-
-            html_message = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: #4CAF50; color: white; padding: 20px; text-align: center; }}
-        .content {{ padding: 20px; background: #f9f9f9; }}
-        .detail {{ background: white; padding: 15px; margin: 10px 0; border-left: 4px solid #4CAF50; }}
-        .footer {{ text-align: center; padding: 20px; color: #666; font-size: 12px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h2>✓ Payment Received</h2>
-        </div>
-        <div class="content">
-            <p>Dear <strong>{tenant.full_name}</strong>,</p>
-            <p>We have successfully received your payment:</p>
-            <div class="detail">
-                <p><strong>Amount:</strong> KES {amount:,.2f}</p>
-                <p><strong>Date:</strong> {payment_date}</p>
-                <p><strong>New Balance:</strong> KES {tenant.total_balance:,.2f}</p>
-            </div>
-            <p>Thank you for your prompt payment!</p>
-        </div>
-        <div class="footer">
-            <p>Property Management System</p>
-        </div>
-    </div>
-</body>
-</html>
-            """
-
-            cls.send_email(tenant.email, subject, email_message, html_message)
+    @classmethod
+    def rent_charged_messages(cls, tenant, amount, month):
+        """
+        Build the messages notifying a tenant that rent was charged
+        """
+        return cls.build_messages(
+            'rent_charged', tenant, amount=f'{amount:,.2f}', month=month)
 
     @classmethod
-    def notify_late_payment(cls, tenant, days_late, amount_due):
+    def rent_charged_bulk(cls, charges, month):
         """
-        Send late payment reminder to tenant
+        Build rent charged messages for a list of rent charge Payments
         """
-        # SMS Notification
-        sms_message = f"REMINDER: Dear {tenant.first_name}, your rent is {days_late} days overdue. Amount due: KES {amount_due:,.2f}. Please pay ASAP to avoid penalties."
+        return cls.build_bulk('rent_charged', (
+            (charge.tenant, {'amount': f'{charge.amount:,.2f}', 'month': month})
+            for charge in charges
+        ))
 
-        if tenant.phone_number:
-            cls.send_sms(tenant.phone_number, sms_message)
+    @classmethod
+    def payment_received_messages(cls, tenant, amount, payment_date):
+        """
+        Build the messages notifying a tenant that a payment was received
+        """
+        return cls.build_messages(
+            'payment_received', tenant,
+            amount=f'{amount:,.2f}', payment_date=payment_date)
 
-        # Email Notification
-        if tenant.email:
-            subject = f"URGENT: Rent Payment {days_late} Days Overdue"
-            email_message = f"""
-Dear {tenant.full_name},
-
-This is a friendly reminder that your rent payment is overdue.
-
-Days Overdue: {days_late}
-Amount Due: KES {amount_due:,.2f}
-Total Balance: KES {tenant.total_balance:,.2f}
-
-Please make payment as soon as possible to avoid late fees and other penalties.
-
-If you have already made payment, please disregard this notice.
-
-For any questions or payment arrangements, please contact us.
-
-Best regards,
-Property Management Team
-            """
-
-            html_message = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: #f44336; color: white; padding: 20px; text-align: center; }}
-        .content {{ padding: 20px; background: #f9f9f9; }}
-        .detail {{ background: white; padding: 15px; margin: 10px 0; border-left: 4px solid #f44336; }}
-        .warning {{ background: #fff3cd; padding: 15px; margin: 10px 0; border-left: 4px solid #ffc107; }}
-        .footer {{ text-align: center; padding: 20px; color: #666; font-size: 12px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h2>⚠ Late Payment Reminder</h2>
-        </div>
-        <div class="content">
-            <p>Dear <strong>{tenant.full_name}</strong>,</p>
-            <p>This is a friendly reminder that your rent payment is overdue.</p>
-            <div class="detail">
-                <p><strong>Days Overdue:</strong> {days_late}</p>
-                <p><strong>Amount Due:</strong> KES {amount_due:,.2f}</p>
-                <p><strong>Total Balance:</strong> KES {tenant.total_balance:,.2f}</p>
-            </div>
-            <div class="warning">
-                <p>⚠ Please make payment as soon as possible to avoid late fees and other penalties.</p>
-            </div>
-            <p>If you have already made payment, please disregard this notice.</p>
-            <p>For any questions or payment arrangements, please contact us.</p>
-        </div>
-        <div class="footer">
-            <p>Property Management System</p>
-        </div>
-    </div>
-</body>
-</html>
-            """
-
-            cls.send_email(tenant.email, subject, email_message, html_message)
+    @classmethod
+    def late_payment_messages(cls, tenant, days_late, amount_due):
+        """
+        Build the late payment reminder messages for a tenant
+        """
+        return cls.build_messages(
+            'late_payment', tenant,
+            days_late=days_late, amount_due=f'{amount_due:,.2f}')
+
+    @classmethod
+    def notify_rent_charged(cls, tenant, amount, month):
+        """
+        Notify tenant when rent is charged
+        """
+        return cls.enqueue(cls.rent_charged_messages(tenant, amount, month))
+
+    @classmethod
+    def notify_payment_received(cls, tenant, amount, payment_date):
+        """
+        Notify tenant when payment is received
+        """
+        return cls.enqueue(
+            cls.payment_received_messages(tenant, amount, payment_date))
+
+    @classmethod
+    def notify_late_payment(cls, tenant, days_late, amount_due):
+        """
+        Send late payment reminder to tenant
+        """
+        return cls.enqueue(
+            cls.late_payment_messages(tenant, days_late, amount_due))
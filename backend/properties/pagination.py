@@ -0,0 +1,134 @@
+"""
+Pagination classes
+"""
+import json
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination, CursorPagination, Cursor, PageNumberPagination
+)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on every column of the ordering rather
+    than DRF's first-column-plus-offset, so pages stay cheap even when
+    thousands of rows share a transaction date. The ordering comes from the
+    view's `keyset_ordering` and must end in a unique column (usually id).
+    """
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(view.keyset_ordering)
+
+    def get_position(self, instance):
+        position = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip('-'))
+            position.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return position
+
+    def keyset_filter(self, position, reverse):
+        """Rows strictly after `position` in (possibly reversed) ordering."""
+        query = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            query |= equal & Q(**{lookup: value})
+            equal &= Q(**{name: value})
+        return query
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = None
+        if self.cursor and self.cursor.position:
+            try:
+                position = json.loads(self.cursor.position)
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise NotFound(self.invalid_cursor_message)
+
+        if reverse:
+            queryset = queryset.order_by(*(
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in self.ordering
+            ))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        return self.page
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        position = json.dumps(self.get_position(self.page[-1]), default=str)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        position = json.dumps(self.get_position(self.page[0]), default=str)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+
+class OptionalKeysetPagination(BasePagination):
+    """
+    Page-number pagination (the project default) unless the request opts
+    in to keyset paging with `?pagination=cursor` or carries a `cursor`.
+    Existing clients keep the {count, next, previous, results} shape;
+    keyset pages return {next, previous, results} and skip the COUNT(*)
+    and OFFSET scan.
+    """
+    page_number_class = PageNumberPagination
+    keyset_class = KeysetPagination
+
+    def __init__(self):
+        self.paginator = None
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
+
+    def uses_keyset(self, request):
+        params = request.query_params
+        return params.get('pagination') == 'cursor' or 'cursor' in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.uses_keyset(request):
+            self.paginator = self.keyset_class()
+        else:
+            self.paginator = self.page_number_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
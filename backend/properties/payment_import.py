@@ -0,0 +1,365 @@
+"""
+Bulk import of tenant payments from M-Pesa and bank statement CSV files
+"""
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from .models import Tenant, TenantBalance, Payment
+from .dashboard import invalidate_dashboard_cache
+
+# Canonical field -> header spellings used by M-Pesa and bank exports
+HEADER_ALIASES = {
+    'reference': ('receipt no.', 'receipt no', 'receipt', 'transaction id',
+                  'reference', 'reference no', 'reference number', 'ref no',
+                  'cheque no', 'transaction ref'),
+    'date': ('completion time', 'transaction date', 'date', 'value date',
+             'posting date', 'trans date'),
+    'amount': ('paid in', 'credit', 'credit amount', 'amount', 'deposit',
+               'money in'),
+    'account': ('a/c no.', 'a/c no', 'account', 'account no', 'account number',
+                'bill ref number', 'bill reference', 'account reference'),
+    'payer': ('other party info', 'msisdn', 'phone', 'phone number', 'mobile',
+              'sender', 'payer'),
+    'details': ('details', 'description', 'narration', 'particulars',
+                'narrative', 'remarks'),
+    'status': ('transaction status', 'status'),
+}
+DATE_FORMATS = (
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d',
+    '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y',
+    '%d-%m-%Y %H:%M:%S', '%d-%m-%Y', '%d.%m.%Y',
+    '%d %b %Y', '%d-%b-%Y', '%d %B %Y',
+)
+# Largest value Payment.amount can hold
+MAX_AMOUNT = Decimal('99999999.99')
+# Statement preambles (account holder, period...) come before the header
+MAX_PREAMBLE_LINES = 50
+
+IMPORTED = 'imported'
+DUPLICATE = 'duplicate'
+UNMATCHED = 'unmatched'
+INVALID = 'invalid'
+SKIPPED = 'skipped'
+STATUSES = (IMPORTED, DUPLICATE, UNMATCHED, INVALID, SKIPPED)
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+def normalize_phone(value):
+    """Last nine digits of a Kenyan number, so 07.., 2547.. and +2547.. agree."""
+    digits = re.sub(r'\D', '', value or '')
+    return digits[-9:] if len(digits) >= 9 else None
+
+
+def parse_date(value):
+    value = value.strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Unrecognised date "{value}"')
+
+
+def parse_amount(value):
+    """Parse "12,500.00" or "KES 12500"; None for an empty cell."""
+    value = (value or '').strip()
+    if not value:
+        return None
+    cleaned = re.sub(r'[^\d.\-]', '', value)
+    try:
+        return Decimal(cleaned).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError(f'Unrecognised amount "{value}"')
+
+
+def read_header(reader):
+    """
+    Skip any statement preamble and map canonical fields to column
+    positions. Returns (header names, {field: index}). Raises
+    ImportFormatError if no header row is found.
+    """
+    for _ in range(MAX_PREAMBLE_LINES):
+        try:
+            cells = next(reader)
+        except StopIteration:
+            break
+        names = [cell.strip().lower() for cell in cells]
+        columns = {}
+        for key, aliases in HEADER_ALIASES.items():
+            for alias in aliases:
+                if alias in names:
+                    columns[key] = names.index(alias)
+                    break
+        if {'date', 'amount'} <= columns.keys():
+            return names, columns
+    raise ImportFormatError(
+        'No header row with a date and an amount (e.g. "Paid In") column')
+
+
+def open_text(file):
+    """Wrap binary uploads so csv can read them; pass text files through."""
+    if isinstance(file.read(0), bytes):
+        return io.TextIOWrapper(file, encoding='utf-8-sig', errors='replace', newline='')
+    return file
+
+
+@dataclass
+class ImportRow:
+    """Outcome for one line of the statement."""
+    line: int
+    status: str
+    reference: str = ''
+    amount: Decimal = None
+    transaction_date: object = None
+    tenant_id: int = None
+    message: str = ''
+
+    def as_dict(self):
+        return {
+            'line': self.line,
+            'status': self.status,
+            'reference': self.reference,
+            'amount': str(self.amount) if self.amount is not None else None,
+            'transaction_date': self.transaction_date,
+            'tenant': self.tenant_id,
+            'message': self.message,
+        }
+
+
+@dataclass
+class PaymentImportRun:
+    """Outcome of a statement import."""
+    payment_method: str
+    rows: list = field(default_factory=list)
+    dry_run: bool = False
+
+    @property
+    def imported(self):
+        return [row for row in self.rows if row.status == IMPORTED]
+
+    @property
+    def counts(self):
+        counts = dict.fromkeys(STATUSES, 0)
+        for row in self.rows:
+            counts[row.status] += 1
+        return counts
+
+    @property
+    def total_amount(self):
+        return sum((row.amount for row in self.imported), Decimal('0.00'))
+
+
+class PaymentImporter:
+    """
+    Stream a statement CSV into Payment rows. Tenants are matched through
+    lookup maps built once per import: the account reference the payer
+    typed (tenant ID number, unit number or phone) first, then the payer's
+    phone number. Rows are validated and checked for already-imported
+    references a batch at a time, and each batch is inserted with one
+    bulk_create() in its own transaction.
+    """
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, payment_method=None, dry_run=False, send_notifications=False,
+                 batch_size=None):
+        self.payment_method = payment_method
+        self.dry_run = dry_run
+        self.send_notifications = send_notifications
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.build_lookups()
+
+    def build_lookups(self):
+        """Index tenants by ID number, phone and unit number in one query."""
+        self.by_id_number = {}
+        self.by_phone = {}
+        self.by_unit = {}
+
+        tenants = Tenant.objects.values_list(
+            'id', 'id_number', 'phone', 'unit__unit_number', 'move_out_date')
+        for pk, id_number, phone, unit_number, move_out_date in tenants.iterator(
+                chunk_size=2000):
+            self.by_id_number[id_number.strip().upper()] = pk
+            active = move_out_date is None
+            phone = normalize_phone(phone)
+            if phone:
+                self.by_phone.setdefault(phone, []).append((pk, active))
+            if active and unit_number:
+                self.by_unit.setdefault(unit_number.strip().upper(), []).append(pk)
+
+    def match_tenant(self, account, payer):
+        """Return (tenant_id, message) for a row."""
+        key = (account or '').strip().upper()
+        if key:
+            if key in self.by_id_number:
+                return self.by_id_number[key], ''
+            units = self.by_unit.get(key, [])
+            if len(units) == 1:
+                return units[0], ''
+
+        for value in (account, payer):
+            phone = normalize_phone(value)
+            if not phone:
+                continue
+            matches = self.by_phone.get(phone, [])
+            active = [pk for pk, is_active in matches if is_active]
+            candidates = active or [pk for pk, _ in matches]
+            if len(candidates) == 1:
+                return candidates[0], ''
+            if len(candidates) > 1:
+                return None, f'Phone matches {len(candidates)} tenants'
+
+        return None, 'No tenant matches the account reference or phone'
+
+    def detect_method(self, names):
+        if self.payment_method:
+            return self.payment_method
+        return 'MPESA' if any(name.startswith('receipt no') for name in names) else 'BANK_TRANSFER'
+
+    def parse(self, lines, run):
+        """
+        Yield (ImportRow, account, payer, details) for each data line.
+        Rows that cannot become payments are recorded on the run instead.
+        """
+        reader = csv.reader(lines)
+        names, columns = read_header(reader)
+        run.payment_method = self.detect_method(names)
+
+        def cell(cells, key):
+            index = columns.get(key)
+            if index is None or index >= len(cells):
+                return ''
+            return cells[index].strip()
+
+        for cells in reader:
+            line = reader.line_num
+            if not any(value.strip() for value in cells):
+                continue
+
+            row = ImportRow(line=line, status=INVALID,
+                            reference=cell(cells, 'reference')[:100])
+            status = cell(cells, 'status').lower()
+            if status and status not in ('completed', 'success', 'successful'):
+                row.status = SKIPPED
+                row.message = f'Transaction status "{status}"'
+                run.rows.append(row)
+                continue
+
+            try:
+                row.amount = parse_amount(cell(cells, 'amount'))
+                row.transaction_date = parse_date(cell(cells, 'date'))
+            except ValueError as e:
+                row.message = str(e)
+                run.rows.append(row)
+                continue
+
+            if row.amount is None or row.amount <= 0:
+                row.status = SKIPPED
+                row.message = 'Not a credit'
+                run.rows.append(row)
+                continue
+            if row.amount > MAX_AMOUNT:
+                row.message = f'Amount {row.amount} is too large'
+                run.rows.append(row)
+                continue
+
+            yield row, cell(cells, 'account'), cell(cells, 'payer'), cell(cells, 'details')
+
+    def import_file(self, file, filename='statement'):
+        """
+        Import a statement from a text or binary file object and return a
+        PaymentImportRun with a row for every data line.
+        """
+        file = open_text(file)
+        run = PaymentImportRun(payment_method=self.payment_method, dry_run=self.dry_run)
+
+        seen_references = set()
+        touched_tenants = set()
+        batch = []
+        try:
+            for parsed in self.parse(file, run):
+                batch.append(parsed)
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch, run, filename, seen_references, touched_tenants)
+                    batch = []
+            if batch:
+                self.import_batch(batch, run, filename, seen_references, touched_tenants)
+        finally:
+            # One ledger refresh for the whole import rather than per batch
+            if touched_tenants:
+                with transaction.atomic():
+                    TenantBalance.refresh_for(touched_tenants)
+                    transaction.on_commit(invalidate_dashboard_cache)
+
+        run.rows.sort(key=lambda row: row.line)
+        if self.send_notifications and not self.dry_run:
+            self.notify(run)
+        return run
+
+    def notify(self, run):
+        """Queue payment receipts once the ledgers show the new balances."""
+        from .notifications import NotificationService
+
+        rows = run.imported
+        for start in range(0, len(rows), self.batch_size):
+            chunk = rows[start:start + self.batch_size]
+            tenants = Tenant.objects.in_bulk({row.tenant_id for row in chunk})
+            with transaction.atomic():
+                NotificationService.enqueue(NotificationService.build_bulk(
+                    'payment_received', (
+                        (tenants[row.tenant_id], {
+                            'amount': f'{row.amount:,.2f}',
+                            'payment_date': row.transaction_date,
+                        })
+                        for row in chunk
+                    )
+                ))
+
+    def import_batch(self, batch, run, filename, seen_references, touched_tenants):
+        """Validate one batch against the database and insert its payments."""
+        references = {row.reference for row, *_ in batch if row.reference}
+        existing = set(
+            Payment.objects.filter(reference_number__in=references).order_by()
+            .values_list('reference_number', flat=True)
+        ) if references else set()
+
+        payments = []
+        for row, account, payer, details in batch:
+            run.rows.append(row)
+            if row.reference and (row.reference in existing or row.reference in seen_references):
+                row.status = DUPLICATE
+                row.message = 'Reference already recorded'
+                continue
+
+            row.tenant_id, row.message = self.match_tenant(account, payer)
+            if row.tenant_id is None:
+                row.status = UNMATCHED
+                continue
+
+            if row.reference:
+                seen_references.add(row.reference)
+            row.status = IMPORTED
+            payments.append(Payment(
+                tenant_id=row.tenant_id,
+                payment_type='PAYMENT',
+                amount=row.amount,
+                payment_method=run.payment_method,
+                transaction_date=row.transaction_date,
+                description=(details or 'Payment received')[:200],
+                reference_number=row.reference or None,
+                notes=f'Imported from {filename} line {row.line}',
+            ))
+
+        if self.dry_run or not payments:
+            return
+
+        with transaction.atomic():
+            Payment.objects.bulk_create(payments, batch_size=self.batch_size)
+        touched_tenants.update(payment.tenant_id for payment in payments)
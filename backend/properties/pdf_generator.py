@@ -1,24 +1,203 @@
 """
 PDF generation service for statements and invoices
 """
+from decimal import Decimal
+from functools import lru_cache
 from io import BytesIO
 from django.http import HttpResponse
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer, Image, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
 from datetime import datetime
 
 
+@lru_cache(maxsize=None)
+def pdf_styles():
+    """
+    Paragraph and table styles shared by every document, built once per
+    process (the sample stylesheet and style objects are costly to create
+    for each PDF in bulk runs).
+    """
+    styles = getSampleStyleSheet()
+    info_table = TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ])
+    return {
+        'normal': styles['Normal'],
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#2196F3'),
+            spaceAfter=30,
+            alignment=TA_CENTER,
+        ),
+        'heading': ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=colors.HexColor('#333333'),
+            spaceAfter=12,
+        ),
+        'invoice_title': ParagraphStyle(
+            'InvoiceTitle',
+            parent=styles['Heading1'],
+            fontSize=28,
+            textColor=colors.HexColor('#2196F3'),
+            spaceAfter=20,
+            alignment=TA_CENTER,
+        ),
+        'bill_to': ParagraphStyle(
+            'BillTo',
+            parent=styles['Heading2'],
+            fontSize=14,
+            spaceAfter=10,
+        ),
+        'instructions': ParagraphStyle(
+            'Instructions',
+            parent=styles['Normal'],
+            fontSize=10,
+            spaceAfter=8,
+        ),
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.grey,
+            alignment=TA_CENTER,
+        ),
+        'info_table': info_table,
+        'transaction_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2196F3')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (3, 0), (4, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('TOPPADDING', (0, 0), (-1, 0), 12),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1),
+             [colors.white, colors.lightgrey]),
+        ]),
+        'opening_row': [
+            ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Oblique'),
+        ],
+        'summary_table': TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+            ('TOPPADDING', (0, 0), (-1, -1), 10),
+            ('LINEABOVE', (0, -1), (-1, -1), 2, colors.HexColor('#2196F3')),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+        ]),
+        'invoice_info_table': TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ]),
+        'items_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2196F3')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('TOPPADDING', (0, 0), (-1, -1), 12),
+            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+        ]),
+        'total_table': TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 14),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('TOPPADDING', (0, 0), (-1, -1), 12),
+            ('LINEABOVE', (0, 0), (-1, 0), 2, colors.black),
+            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+        ]),
+    }
+
+
+class LedgerTable(Flowable):
+    """
+    A transaction table of any length that splits across pages in linear
+    time. ReportLab rebuilds the whole remainder of a Table on every page
+    split, which is quadratic for long ledgers; this flowable only ever
+    materialises a LongTable for the next WINDOW rows and repeats the
+    header row on each page.
+    """
+    # Comfortably more rows than fit on one page
+    WINDOW = 60
+
+    def __init__(self, header, rows, col_widths, styles=()):
+        super().__init__()
+        self.header = header
+        self.rows = rows
+        self.col_widths = col_widths
+        self.styles = styles
+        self._table = None
+
+    def _build(self, rows):
+        table = LongTable([self.header] + rows, colWidths=self.col_widths,
+                          repeatRows=1)
+        for style in self.styles:
+            table.setStyle(style)
+        return table
+
+    def wrap(self, availWidth, availHeight):
+        self._table = self._build(self.rows[:self.WINDOW])
+        width, height = self._table.wrap(availWidth, availHeight)
+        if len(self.rows) > self.WINDOW:
+            # Too tall for any page, so the frame always asks for a split
+            height *= len(self.rows) / self.WINDOW
+        return width, height
+
+    def split(self, availWidth, availHeight):
+        window = self._table or self._build(self.rows[:self.WINDOW])
+        parts = window.split(availWidth, availHeight)
+        if not parts:
+            return []
+        consumed = len(parts[0]._cellvalues) - 1
+        rest = self.rows[consumed:]
+        if not rest:
+            return [parts[0]]
+        # Only the first window carries the extra (opening row) styles
+        return [parts[0], LedgerTable(
+            self.header, rest, self.col_widths, self.styles[:1])]
+
+    def draw(self):
+        self._table.drawOn(self.canv, 0, 0)
+
+
 class PDFGenerator:
     """Generate PDF documents for statements and invoices"""
 
     @staticmethod
-    def generate_tenant_statement(tenant, transactions):
+    def generate_tenant_statement(tenant, transactions, start_date=None,
+                                  end_date=None,
+                                  opening_balance=Decimal('0.00'),
+                                  generated_on=None):
         """
-        Generate a PDF statement for a tenant
+        Generate a PDF statement for a tenant.
+
+        `transactions` are the (ordered) payments within the statement
+        period; when the period has a start date, `opening_balance` is the
+        balance carried forward from before it. The transaction table splits
+        across pages (see LedgerTable) and repeats its header row. The footer
+        shows `generated_on` (a date) if given, otherwise the current time.
         """
         buffer = BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=letter,
@@ -27,28 +206,10 @@ class PDFGenerator:
 
         # Container for the 'Flowable' objects
         elements = []
-        styles = getSampleStyleSheet()
-
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#2196F3'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-        )
-
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#333333'),
-            spaceAfter=12,
-        )
+        styles = pdf_styles()
 
         # Title
-        title = Paragraph("TENANT STATEMENT", title_style)
+        title = Paragraph("TENANT STATEMENT", styles['title'])
         elements.append(title)
         elements.append(Spacer(1, 12))
 
@@ -58,18 +219,15 @@ class PDFGenerator:
             ['Unit Number:', tenant.unit.unit_number],
             ['Monthly Rent:', f'KES {tenant.unit.monthly_rent:,.2f}'],
         ]
+        if start_date or end_date:
+            property_info.append([
+                'Statement Period:',
+                f'{start_date.strftime("%Y-%m-%d") if start_date else "Start"} to '
+                f'{end_date.strftime("%Y-%m-%d") if end_date else "Today"}'
+            ])
 
         property_table = Table(property_info, colWidths=[2*inch, 4*inch])
-        property_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
+        property_table.setStyle(styles['info_table'])
 
         # Tenant Information
         tenant_info = [
@@ -81,40 +239,40 @@ class PDFGenerator:
         ]
 
         tenant_table = Table(tenant_info, colWidths=[2*inch, 4*inch])
-        tenant_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
+        tenant_table.setStyle(styles['info_table'])
 
-        elements.append(Paragraph("Property Details", heading_style))
+        elements.append(Paragraph("Property Details", styles['heading']))
         elements.append(property_table)
         elements.append(Spacer(1, 20))
 
-        elements.append(Paragraph("Tenant Information", heading_style))
+        elements.append(Paragraph("Tenant Information", styles['heading']))
         elements.append(tenant_table)
         elements.append(Spacer(1, 20))
 
         # Transactions Table
-        elements.append(Paragraph("Transaction History", heading_style))
+        elements.append(Paragraph("Transaction History", styles['heading']))
 
-        # Header
-        transaction_data = [
-            ['Date', 'Type', 'Description', 'Amount', 'Balance']]
+        header = ['Date', 'Type', 'Description', 'Amount', 'Balance']
+        transaction_data = []
 
-        running_balance = 0
+        if start_date:
+            transaction_data.append([
+                start_date.strftime('%Y-%m-%d'), '', 'Opening Balance', '',
+                f'KES {opening_balance:,.2f}'
+            ])
+
+        running_balance = opening_balance
+        total_charges = Decimal('0.00')
+        total_payments = Decimal('0.00')
         for transaction in transactions:
-            amount = float(transaction.amount)
+            amount = transaction.amount
             if transaction.payment_type == 'CHARGE':
                 running_balance += amount
+                total_charges += amount
                 amount_str = f'-KES {amount:,.2f}'
             else:  # PAYMENT
                 running_balance -= amount
+                total_payments += amount
                 amount_str = f'+KES {amount:,.2f}'
 
             transaction_data.append([
@@ -126,63 +284,40 @@ class PDFGenerator:
                 f'KES {running_balance:,.2f}'
             ])
 
-        transaction_table = Table(transaction_data, colWidths=[
-                                  1.2*inch, 1*inch, 2.5*inch, 1.3*inch, 1*inch])
-        transaction_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2196F3')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (3, 0), (4, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('TOPPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1),
-             [colors.white, colors.lightgrey]),
-        ]))
+        table_styles = [styles['transaction_table']]
+        if start_date:
+            table_styles.append(styles['opening_row'])
+        transaction_table = LedgerTable(
+            header, transaction_data,
+            col_widths=[1.2*inch, 1*inch, 2.5*inch, 1.3*inch, 1*inch],
+            styles=table_styles)
 
         elements.append(transaction_table)
         elements.append(Spacer(1, 20))
 
         # Summary
-        total_charges = sum(float(t.amount)
-                            for t in transactions if t.payment_type == 'CHARGE')
-        total_payments = sum(float(t.amount)
-                             for t in transactions if t.payment_type == 'PAYMENT')
-        current_balance = total_charges - total_payments
-
-        summary_data = [
+        summary_data = []
+        if start_date:
+            summary_data.append(
+                ['Opening Balance:', f'KES {opening_balance:,.2f}'])
+        summary_data += [
             ['Total Charges:', f'KES {total_charges:,.2f}'],
             ['Total Payments:', f'KES {total_payments:,.2f}'],
-            ['Current Balance:', f'KES {current_balance:,.2f}'],
+            ['Closing Balance:' if end_date else 'Current Balance:',
+             f'KES {running_balance:,.2f}'],
         ]
 
         summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
-        summary_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('LINEABOVE', (0, -1), (-1, -1), 2, colors.HexColor('#2196F3')),
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-        ]))
+        summary_table.setStyle(styles['summary_table'])
 
         elements.append(summary_table)
         elements.append(Spacer(1, 30))
 
         # Footer
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.grey,
-            alignment=TA_CENTER,
-        )
-
-        footer_text = f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br/>Property Management System"
-        footer = Paragraph(footer_text, footer_style)
+        generated = (generated_on.strftime('%Y-%m-%d') if generated_on
+                     else datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        footer_text = f"Generated on {generated}<br/>Property Management System"
+        footer = Paragraph(footer_text, styles['footer'])
         elements.append(footer)
 
         # Build PDF
@@ -204,20 +339,10 @@ class PDFGenerator:
                                 topMargin=72, bottomMargin=18)
 
         elements = []
-        styles = getSampleStyleSheet()
-
-        # Custom styles
-        title_style = ParagraphStyle(
-            'InvoiceTitle',
-            parent=styles['Heading1'],
-            fontSize=28,
-            textColor=colors.HexColor('#2196F3'),
-            spaceAfter=20,
-            alignment=TA_CENTER,
-        )
+        styles = pdf_styles()
 
         # Title
-        title = Paragraph("RENT INVOICE", title_style)
+        title = Paragraph("RENT INVOICE", styles['invoice_title'])
         elements.append(title)
         elements.append(Spacer(1, 20))
 
@@ -229,35 +354,23 @@ class PDFGenerator:
         ]
 
         invoice_table = Table(invoice_data, colWidths=[2*inch, 3*inch])
-        invoice_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        invoice_table.setStyle(styles['invoice_info_table'])
 
         elements.append(invoice_table)
         elements.append(Spacer(1, 30))
 
         # Bill To
-        bill_to_style = ParagraphStyle(
-            'BillTo',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=10,
-        )
-
-        elements.append(Paragraph("BILL TO:", bill_to_style))
+        elements.append(Paragraph("BILL TO:", styles['bill_to']))
 
         bill_to_data = [
             [tenant.full_name],
             [tenant.unit.building.name],
             [f'Unit: {tenant.unit.unit_number}'],
-            [tenant.phone_number or ''],
+            [tenant.phone or ''],
         ]
 
         for row in bill_to_data:
-            elements.append(Paragraph(row[0], styles['Normal']))
+            elements.append(Paragraph(row[0], styles['normal']))
 
         elements.append(Spacer(1, 30))
 
@@ -268,17 +381,7 @@ class PDFGenerator:
         ]
 
         items_table = Table(items_data, colWidths=[4*inch, 2*inch])
-        items_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2196F3')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('TOPPADDING', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ]))
+        items_table.setStyle(styles['items_table'])
 
         elements.append(items_table)
         elements.append(Spacer(1, 20))
@@ -289,26 +392,13 @@ class PDFGenerator:
         ]
 
         total_table = Table(total_data, colWidths=[4*inch, 2*inch])
-        total_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('TOPPADDING', (0, 0), (-1, -1), 12),
-            ('LINEABOVE', (0, 0), (-1, 0), 2, colors.black),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-        ]))
+        total_table.setStyle(styles['total_table'])
 
         elements.append(total_table)
         elements.append(Spacer(1, 40))
 
         # Payment Instructions
-        instructions_style = ParagraphStyle(
-            'Instructions',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=8,
-        )
+        instructions_style = styles['instructions']
 
         elements.append(
             Paragraph("<b>Payment Instructions:</b>", instructions_style))
@@ -320,16 +410,8 @@ class PDFGenerator:
         elements.append(Spacer(1, 30))
 
         # Footer
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.grey,
-            alignment=TA_CENTER,
-        )
-
         footer_text = "Thank you for your business!<br/>Property Management System"
-        footer = Paragraph(footer_text, footer_style)
+        footer = Paragraph(footer_text, styles['footer'])
         elements.append(footer)
 
         # Build PDF
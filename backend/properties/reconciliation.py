@@ -0,0 +1,240 @@
+"""
+Reconcile external transaction lists against recorded payments
+"""
+import csv
+from collections import namedtuple
+from datetime import timedelta
+from django.db import transaction
+from .models import Payment, ReconciliationRun, ReconciliationItem
+from .payment_import import read_header, open_text, parse_amount, parse_date
+
+ExternalRecord = namedtuple(
+    'ExternalRecord', ['line', 'reference', 'amount', 'transaction_date'])
+IndexedPayment = namedtuple(
+    'IndexedPayment', ['id', 'reference', 'amount', 'transaction_date'])
+
+
+def normalize_reference(value):
+    return (value or '').strip().upper()
+
+
+def read_records(file):
+    """
+    Parse a statement CSV into ExternalRecords, keeping only credits.
+    Returns (records, errors) where errors lists (line, message).
+    Raises ImportFormatError if the file has no usable header.
+    """
+    reader = csv.reader(open_text(file))
+    _, columns = read_header(reader)
+
+    def cell(cells, key):
+        index = columns.get(key)
+        if index is None or index >= len(cells):
+            return ''
+        return cells[index].strip()
+
+    records = []
+    errors = []
+    for cells in reader:
+        if not any(value.strip() for value in cells):
+            continue
+        status = cell(cells, 'status').lower()
+        if status and status not in ('completed', 'success', 'successful'):
+            continue
+        try:
+            amount = parse_amount(cell(cells, 'amount'))
+            transaction_date = parse_date(cell(cells, 'date'))
+        except ValueError as e:
+            errors.append((reader.line_num, str(e)))
+            continue
+        if amount is None or amount <= 0:
+            continue
+        records.append(ExternalRecord(
+            reader.line_num, cell(cells, 'reference')[:100], amount, transaction_date))
+    return records, errors
+
+
+class PaymentIndex:
+    """
+    Hash indexes over the recorded payments in a date window, loaded with
+    a single query: by reference number, and by (amount, date) for
+    payments recorded without a reference.
+    """
+
+    def __init__(self, date_from, date_to, payment_method=None):
+        payments = Payment.objects.filter(
+            payment_type='PAYMENT',
+            transaction_date__gte=date_from,
+            transaction_date__lte=date_to,
+        )
+        if payment_method:
+            payments = payments.filter(payment_method=payment_method)
+
+        self.payments = {}
+        self.by_reference = {}
+        self.by_amount_date = {}
+        for row in payments.order_by('id').values_list(
+                'id', 'reference_number', 'amount', 'transaction_date').iterator(
+                chunk_size=5000):
+            payment = IndexedPayment(row[0], normalize_reference(row[1]), *row[2:])
+            self.payments[payment.id] = payment
+            if payment.reference:
+                self.by_reference.setdefault(payment.reference, []).append(payment)
+            else:
+                self.by_amount_date.setdefault(
+                    (payment.amount, payment.transaction_date), []).append(payment)
+
+
+class Reconciler:
+    """
+    Classify each external record in one pass over the list:
+
+    - MATCHED: a payment with the same reference and amount, or (for
+      payments recorded without a reference) the same amount and date
+    - AMOUNT_MISMATCH: the reference is recorded with a different amount
+    - DUPLICATE: the reference already appeared earlier in the list
+    - UNKNOWN: nothing recorded matches
+
+    Recorded payments in the run's date window that no record claimed are
+    reported as MISSING. Each step is a dictionary lookup, so a run is linear in
+    the size of the list plus the window and makes no per-record queries.
+    """
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, date_from=None, date_to=None, payment_method='',
+                 date_tolerance=0):
+        self.date_from = date_from
+        self.date_to = date_to
+        self.payment_method = payment_method or ''
+        self.date_tolerance = timedelta(days=date_tolerance)
+
+    def classify(self, records, index, date_from, date_to):
+        """
+        Yield unsaved ReconciliationItems for the records, then the misses.
+        The index may extend past date_from..date_to by the date tolerance
+        so records near the edges can match; payments only in that margin
+        are not reported as missing.
+        """
+        claimed = set()
+        seen_references = set()
+
+        for record in records:
+            reference = normalize_reference(record.reference)
+            item = ReconciliationItem(
+                line=record.line,
+                reference=record.reference,
+                amount=record.amount,
+                transaction_date=record.transaction_date,
+            )
+
+            if reference and reference in seen_references:
+                item.status = 'DUPLICATE'
+                item.note = 'Reference appears earlier in the statement'
+                yield item
+                continue
+            if reference:
+                seen_references.add(reference)
+
+            candidates = index.by_reference.get(reference, []) if reference else []
+            unclaimed = [payment for payment in candidates if payment.id not in claimed]
+            if unclaimed:
+                payment = next(
+                    (payment for payment in unclaimed if payment.amount == record.amount),
+                    unclaimed[0])
+                claimed.add(payment.id)
+                item.payment_id = payment.id
+                if payment.amount == record.amount:
+                    item.status = 'MATCHED'
+                else:
+                    item.status = 'AMOUNT_MISMATCH'
+                    item.expected_amount = payment.amount
+                if abs(payment.transaction_date - record.transaction_date) > self.date_tolerance:
+                    item.note = f'Recorded on {payment.transaction_date}'
+                yield item
+                continue
+
+            payment = self.match_without_reference(record, index, claimed)
+            if payment is not None:
+                claimed.add(payment.id)
+                item.payment_id = payment.id
+                item.status = 'MATCHED'
+                item.note = 'Matched on amount and date'
+            else:
+                item.status = 'UNKNOWN'
+            yield item
+
+        for payment in index.payments.values():
+            if payment.id not in claimed and date_from <= payment.transaction_date <= date_to:
+                yield ReconciliationItem(
+                    status='MISSING',
+                    reference=payment.reference,
+                    amount=payment.amount,
+                    transaction_date=payment.transaction_date,
+                    payment_id=payment.id,
+                )
+
+    def match_without_reference(self, record, index, claimed):
+        """An unclaimed reference-less payment of the same amount near the date."""
+        days = self.date_tolerance.days
+        for offset in range(-days, days + 1):
+            key = (record.amount, record.transaction_date + timedelta(days=offset))
+            for payment in index.by_amount_date.get(key, []):
+                if payment.id not in claimed:
+                    return payment
+        return None
+
+    def reconcile(self, records, source_name='', created_by='System'):
+        """
+        Reconcile the records and persist the run and its items. The date
+        window defaults to the span of the records.
+        """
+        if not records:
+            raise ValueError('The statement has no credit transactions')
+
+        date_from = self.date_from or min(record.transaction_date for record in records)
+        date_to = self.date_to or max(record.transaction_date for record in records)
+        if date_from > date_to:
+            raise ValueError('date_from must not be after date_to')
+        records = [
+            record for record in records
+            if date_from <= record.transaction_date <= date_to
+        ]
+        index = PaymentIndex(date_from - self.date_tolerance,
+                             date_to + self.date_tolerance,
+                             self.payment_method)
+
+        run = ReconciliationRun(
+            payment_method=self.payment_method,
+            source_name=source_name[:255],
+            date_from=date_from,
+            date_to=date_to,
+            total_records=len(records),
+            created_by=created_by,
+        )
+        counters = {
+            'MATCHED': 'matched_count',
+            'AMOUNT_MISMATCH': 'mismatch_count',
+            'DUPLICATE': 'duplicate_count',
+            'UNKNOWN': 'unknown_count',
+            'MISSING': 'missing_count',
+        }
+
+        with transaction.atomic():
+            run.save()
+            batch = []
+            for item in self.classify(records, index, date_from, date_to):
+                item.run = run
+                attr = counters[item.status]
+                setattr(run, attr, getattr(run, attr) + 1)
+                if item.status == 'MATCHED':
+                    run.matched_amount += item.amount
+                batch.append(item)
+                if len(batch) >= self.BATCH_SIZE:
+                    ReconciliationItem.objects.bulk_create(batch)
+                    batch = []
+            if batch:
+                ReconciliationItem.objects.bulk_create(batch)
+            run.save(update_fields=[*counters.values(), 'matched_amount'])
+
+        return run
@@ -0,0 +1,15 @@
+"""
+Custom renderers
+"""
+from rest_framework.renderers import BaseRenderer
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    Return data as-is. Used for binary responses like PDFs.
+    """
+    media_type = '*/*'
+    format = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
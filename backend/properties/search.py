@@ -0,0 +1,203 @@
+"""
+Full-text search index over buildings, units, tenants and payments
+"""
+import re
+from django.apps import apps as global_apps
+from django.db import connection as default_connection
+
+# kind -> (model name, indexed columns)
+SEARCH_FIELDS = {
+    'buildings': ('Building', ('name', 'address')),
+    'units': ('Unit', ('unit_number',)),
+    'tenants': ('Tenant', ('first_name', 'last_name', 'email', 'phone', 'id_number')),
+    'payments': ('Payment', ('reference_number', 'description')),
+}
+MAX_TERMS = 8
+# SQLite prefix indexes: a prefix query longer than these has to merge
+# every matching word's postings, which is slow for common words
+PREFIX_LENGTHS = '2 3 4 5 6'
+# Rank only the newest matches, so a word that appears on most rows
+# (e.g. "rent" in charge descriptions) stays fast on large tables
+CANDIDATE_LIMIT = 500
+
+
+def search_terms(query):
+    """Split a query into lowercase word tokens, as the index does."""
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+class SearchIndex:
+    """
+    Maintain and query the search index. SQLite keeps an FTS5 table per
+    model whose content is the model's own table, kept in sync by
+    triggers; Postgres uses GIN indexes on a `tsvector` of the same columns
+    plus a trigram index for fuzzy and partial matches. Either way rows
+    written with bulk_create() or update() are indexed too.
+    """
+
+    @staticmethod
+    def tables(apps=global_apps, connection=default_connection):
+        """Yield (kind, table, quoted columns) for each indexed model."""
+        quote = connection.ops.quote_name
+        for kind, (model_name, columns) in SEARCH_FIELDS.items():
+            model = apps.get_model('properties', model_name)
+            yield kind, model._meta.db_table, [quote(column) for column in columns]
+
+    @staticmethod
+    def document(columns):
+        """SQL for the columns as one text document (Postgres)."""
+        return " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+
+    @classmethod
+    def sqlite_statements(cls, table, columns):
+        fts = f'{table}_fts'
+        cols = ', '.join(columns)
+        new = ', '.join(f'new.{column}' for column in columns)
+        old = ', '.join(f'old.{column}' for column in columns)
+        insert = f'INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});'
+        delete = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{cols}, content='{table}', content_rowid='id', prefix='{PREFIX_LENGTHS}')",
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} '
+            f'BEGIN {insert} END',
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} '
+            f'BEGIN {delete} END',
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {cols} '
+            f'ON {table} BEGIN {delete} {insert} END',
+        ]
+
+    @classmethod
+    def postgres_statements(cls, table, columns):
+        document = cls.document(columns)
+        return [
+            f"CREATE INDEX IF NOT EXISTS {table}_fts_idx ON {table} "
+            f"USING gin (to_tsvector('simple', {document}))",
+            f'CREATE INDEX IF NOT EXISTS {table}_trgm_idx ON {table} '
+            f'USING gin (({document}) gin_trgm_ops)',
+        ]
+
+    @classmethod
+    def install(cls, connection=default_connection, apps=global_apps):
+        """Create the index structures and index the existing rows."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+                for _, table, columns in cls.tables(apps, connection):
+                    for sql in cls.postgres_statements(table, columns):
+                        cursor.execute(sql)
+            elif connection.vendor == 'sqlite':
+                for _, table, columns in cls.tables(apps, connection):
+                    for sql in cls.sqlite_statements(table, columns):
+                        cursor.execute(sql)
+                    cursor.execute(
+                        f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+    @classmethod
+    def uninstall(cls, connection=default_connection, apps=global_apps):
+        with connection.cursor() as cursor:
+            for _, table, _ in cls.tables(apps, connection):
+                if connection.vendor == 'postgresql':
+                    cursor.execute(f'DROP INDEX IF EXISTS {table}_fts_idx')
+                    cursor.execute(f'DROP INDEX IF EXISTS {table}_trgm_idx')
+                elif connection.vendor == 'sqlite':
+                    for suffix in ('insert', 'delete', 'update'):
+                        cursor.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{suffix}')
+                    cursor.execute(f'DROP TABLE IF EXISTS {table}_fts')
+
+    @classmethod
+    def repair(cls, connection=default_connection):
+        """
+        SQLite drops a table's triggers when a migration rebuilds it; put
+        them back and reindex. Does nothing if the index was never
+        installed. Returns True if anything was repaired.
+        """
+        if connection.vendor != 'sqlite':
+            return False
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+            existing = {row[0] for row in cursor.fetchall()}
+
+        tables = list(cls.tables(connection=connection))
+        if not all(f'{table}_fts' in existing for _, table, _ in tables):
+            return False
+        if all(f'{table}_fts_{suffix}' in existing
+               for _, table, _ in tables
+               for suffix in ('insert', 'delete', 'update')):
+            return False
+
+        cls.install(connection)
+        return True
+
+    @classmethod
+    def search(cls, kind, terms, limit=10, connection=default_connection):
+        """
+        Return [(id, score)] for rows of `kind` matching every term as a
+        word prefix, best match first.
+        """
+        if not terms:
+            return []
+
+        quote = connection.ops.quote_name
+        model_name, columns = SEARCH_FIELDS[kind]
+        table = global_apps.get_model('properties', model_name)._meta.db_table
+        columns = [quote(column) for column in columns]
+
+        if connection.vendor == 'postgresql':
+            document = cls.document(columns)
+            tsquery = ' & '.join(f'{term}:*' for term in terms)
+            text = ' '.join(terms)
+            sql = (
+                f"SELECT id, ts_rank(to_tsvector('simple', document), "
+                f"to_tsquery('simple', %s)) + word_similarity(%s, document) AS score "
+                f'FROM (SELECT id, {document} AS document FROM {table} '
+                f"WHERE to_tsvector('simple', {document}) @@ to_tsquery('simple', %s) "
+                f'OR %s <%% ({document}) '
+                f'ORDER BY id DESC LIMIT %s) matches '
+                f'ORDER BY score DESC, id DESC LIMIT %s'
+            )
+            params = [tsquery, text, tsquery, text, CANDIDATE_LIMIT, limit]
+        elif connection.vendor == 'sqlite':
+            return cls.search_sqlite(table, columns, terms, limit, connection)
+        else:
+            raise NotImplementedError(
+                f'Search is not supported on {connection.vendor}')
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(pk, float(score)) for pk, score in cursor.fetchall()]
+
+    @staticmethod
+    def search_sqlite(table, columns, terms, limit, connection):
+        """
+        Match on the FTS5 index and rank the candidates in Python. FTS5's
+        bm25() counts every row containing each term before ranking, which
+        alone costs tens of milliseconds for a word on most of a million
+        rows, so candidates are scored like Postgres' ts_rank instead: term
+        hits (whole words count double) relative to the field's length.
+        """
+        fts = f'{table}_fts'
+        match = ' '.join(f'"{term}"*' for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, {", ".join(columns)} FROM {fts} '
+                f'WHERE {fts} MATCH %s ORDER BY rowid DESC LIMIT %s',
+                [match, CANDIDATE_LIMIT])
+            rows = cursor.fetchall()
+
+        scored = []
+        for pk, *values in rows:
+            score = 0.0
+            for value in values:
+                words = re.findall(r'\w+', (value or '').lower())
+                hits = sum(
+                    1.0 if word == term else 0.5
+                    for term in terms for word in words if word.startswith(term)
+                )
+                if hits:
+                    score += hits / len(words)
+            scored.append((pk, score))
+
+        scored.sort(key=lambda row: (-row[1], -row[0]))
+        return scored[:limit]
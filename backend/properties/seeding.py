@@ -0,0 +1,486 @@
+"""
+Deterministic bulk generation of buildings, units, tenants and their history
+"""
+import itertools
+import math
+import random
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.db import connection
+from django.utils import timezone
+from .models import (
+    Building, Unit, Tenant, Lease, Payment, TenantBalance, Expense, Utility,
+    MaintenanceRequest, ActivityLog
+)
+
+FIRST_NAMES = [
+    'James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda',
+    'William', 'Elizabeth', 'David', 'Susan', 'Richard', 'Jessica', 'Joseph', 'Sarah',
+    'Thomas', 'Karen', 'Charles', 'Nancy', 'Peter', 'Grace', 'Daniel', 'Faith',
+]
+LAST_NAMES = [
+    'Kamau', 'Wanjiru', 'Otieno', 'Achieng', 'Kimani', 'Njeri', 'Omondi', 'Mutua',
+    'Mwangi', 'Njoroge', 'Kipchoge', 'Waweru', 'Ochieng', 'Chebet', 'Karanja', 'Maina',
+]
+BUILDING_NAMES = [
+    'Sunset Apartments', 'Palm View Residences', 'Garden Court', 'Executive Towers',
+    'Riverside Flats', 'Acacia Heights', 'Jacaranda Court', 'Baobab House',
+]
+LOCATIONS = [
+    'Main Street, Nairobi', 'Mombasa Road, Nairobi', 'Ngong Road, Karen',
+    'Kilimani Road, Kilimani', 'Waiyaki Way, Westlands', 'Thika Road, Kasarani',
+]
+UNIT_TYPES = [
+    {'bedrooms': 1, 'bathrooms': 1, 'rent_base': 25000},
+    {'bedrooms': 2, 'bathrooms': 1, 'rent_base': 35000},
+    {'bedrooms': 2, 'bathrooms': 2, 'rent_base': 45000},
+    {'bedrooms': 3, 'bathrooms': 2, 'rent_base': 55000},
+    {'bedrooms': 3, 'bathrooms': 3, 'rent_base': 70000},
+]
+PAYMENT_METHODS = ['MPESA', 'MPESA', 'MPESA', 'BANK_TRANSFER', 'CASH', 'CHEQUE']
+EXPENSE_CATEGORIES = [
+    ('MAINTENANCE', 'Repairs', 5000, 15000),
+    ('MAINTENANCE', 'Plumbing', 3000, 12000),
+    ('MAINTENANCE', 'Electrical', 4000, 10000),
+    ('UTILITIES', 'Common area electricity', 15000, 45000),
+    ('SALARIES', 'Caretaker wages', 15000, 25000),
+    ('PROFESSIONAL', 'Property Management Fee', 20000, 50000),
+    ('PROFESSIONAL', 'Security Services', 15000, 30000),
+    ('PROFESSIONAL', 'Cleaning Services', 8000, 20000),
+    ('INSURANCE', 'Property Insurance', 25000, 60000),
+    ('TAXES', 'Property Tax', 30000, 80000),
+]
+VENDORS = [
+    'ABC Services Ltd', 'XYZ Contractors', 'Professional Services',
+    'City Utilities', 'National Insurance Corp', 'KRA',
+]
+# utility type -> (provider, monthly units per 100 building units, price per unit)
+UTILITY_BILLS = {
+    'WATER': ('Nairobi Water', 900, Decimal('120.00')),
+    'ELECTRICITY': ('Kenya Power', 2500, Decimal('25.00')),
+    'GARBAGE': ('City Council', None, Decimal('15000.00')),
+}
+MAINTENANCE_ISSUES = [
+    ('PLUMBING', 'Leaking faucet in kitchen'),
+    ('PLUMBING', 'Blocked sink in bathroom'),
+    ('PLUMBING', 'Water heater not working'),
+    ('ELECTRICAL', 'Power socket not working'),
+    ('ELECTRICAL', 'Circuit breaker tripping'),
+    ('APPLIANCE', 'Refrigerator making noise'),
+    ('APPLIANCE', 'Stove burner not heating'),
+    ('STRUCTURAL', 'Door lock needs fixing'),
+    ('STRUCTURAL', 'Window latch broken'),
+    ('HVAC', 'AC not cooling properly'),
+    ('PEST', 'Pest control needed'),
+    ('OTHER', 'Wall paint chipping'),
+]
+
+# Named scales (number of current tenants) accepted by seed_data and benchmark
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000}
+
+
+def parse_scale(value):
+    """
+    Number of tenants for a scale such as '100k', '2.5k', '1m' or '500'.
+    Raises ValueError for anything else.
+    """
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([km]?)', str(value).strip().lower())
+    if not match:
+        raise ValueError(f'Invalid scale "{value}". Use e.g. 500, 10k or 1m.')
+    number, suffix = match.groups()
+    tenants = int(float(number) * {'': 1, 'k': 1000, 'm': 1000000}[suffix])
+    if tenants < 1:
+        raise ValueError('The scale must be at least one tenant')
+    return tenants
+
+
+def batched(iterable, size):
+    """Lists of up to `size` items from `iterable`."""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def months_before(day, months):
+    """First day of the month `months` before `day`'s month."""
+    index = day.year * 12 + day.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+@dataclass
+class SeedRun:
+    """Rows created by a DatasetBuilder."""
+    seed: int
+    as_of: date
+    counts: dict = field(default_factory=dict)
+
+
+class DatasetBuilder:
+    """
+    Generate a dataset from a seeded random generator with bulk_create(),
+    so the same tenant count, seed and `as_of` date always produce the same
+    rows. Every current tenant occupies their own unit (a tenth of the
+    units are vacant or under maintenance) and is charged rent for each
+    month they lived there in the `months` before `as_of`, most of it
+    paid. Unit statuses are written directly rather than through
+    Tenant.save(), and ledgers are rebuilt once at the end.
+
+    With `full_history`, a fifth of the units also had a former tenant,
+    and leases, building expenses, utility bills, maintenance requests and
+    activity log entries are generated over the same months.
+    """
+
+    BATCH_SIZE = 2000
+    # Small datasets are spread over at least MIN_BUILDINGS smaller buildings
+    UNITS_PER_BUILDING = 100
+    MIN_BUILDINGS = 4
+    VACANCY_RATE = 0.1
+    TURNOVER_RATE = 0.2
+
+    def __init__(self, tenants, seed=42, months=6, as_of=None, full_history=False,
+                 log=None):
+        self.tenant_count = tenants
+        self.seed = seed
+        self.months = months
+        self.as_of = as_of or date.today().replace(day=1)
+        self.full_history = full_history
+        self.log = log or (lambda message: None)
+        self.rng = random.Random(seed)
+        self.unit_count = tenants + math.ceil(tenants * self.VACANCY_RATE)
+        self.units_per_building = max(1, min(
+            self.UNITS_PER_BUILDING, math.ceil(self.unit_count / self.MIN_BUILDINGS)))
+        self.periods = [months_before(self.as_of, n) for n in range(months, 0, -1)]
+
+    def build(self):
+        run = SeedRun(seed=self.seed, as_of=self.as_of)
+        buildings = self.create_buildings()
+        run.counts['buildings'] = len(buildings)
+        units = self.create_units(buildings)
+        run.counts['units'] = len(units)
+        tenants = self.create_tenants(units)
+        run.counts['tenants'] = len(tenants)
+        run.counts['payments'] = self.create_payments(tenants)
+
+        if self.full_history:
+            run.counts['leases'] = self.create_leases(tenants)
+            run.counts['expenses'] = self.create_expenses(buildings)
+            run.counts['utilities'] = self.create_utilities(buildings)
+            run.counts['maintenance_requests'] = self.create_maintenance_requests(tenants)
+            run.counts['activity_logs'] = self.create_activity_logs(tenants)
+
+        self.log('Rebuilding ledgers...')
+        TenantBalance.refresh_for(tenant.pk for tenant in tenants)
+        return run
+
+    def bulk_create(self, model, objects):
+        """Insert an iterable of unsaved objects in batches; return the count."""
+        count = 0
+        for batch in batched(objects, self.BATCH_SIZE):
+            model.objects.bulk_create(batch)
+            count += len(batch)
+        return count
+
+    def insert_rows(self, model, fields, rows):
+        """
+        Insert tuples of values for `fields` with multi-row INSERTs. This is
+        bulk_create() without its per-value preparation, which dominates the
+        time for millions of rows: strings, integers and None go in as they
+        are, and other values are converted to their database form once per
+        distinct value. Defaults and save() are skipped. Returns the count.
+        """
+        meta = model._meta
+        quote = connection.ops.quote_name
+        model_fields = [meta.get_field(name) for name in fields]
+        per_statement = min(
+            self.BATCH_SIZE, (connection.features.max_query_params or 65535) // len(fields))
+        placeholder = f'({", ".join(["%s"] * len(fields))})'
+        statement = (f'INSERT INTO {quote(meta.db_table)} '
+                     f'({", ".join(quote(field.column) for field in model_fields)}) VALUES ')
+        prepared = {}
+
+        def prepare(field, value):
+            if value is None or isinstance(value, (str, int)):
+                return value
+            key = (field.attname, value)
+            if key not in prepared:
+                prepared[key] = field.get_db_prep_save(value, connection)
+            return prepared[key]
+
+        count = 0
+        with connection.cursor() as cursor:
+            for batch in batched(rows, per_statement):
+                params = [prepare(field, value)
+                          for row in batch for field, value in zip(model_fields, row)]
+                cursor.execute(statement + ', '.join([placeholder] * len(batch)), params)
+                count += len(batch)
+        return count
+
+    def money(self, low, high, step=50):
+        return Decimal(self.rng.randrange(low, high + 1, step))
+
+    def create_buildings(self):
+        count = math.ceil(self.unit_count / self.units_per_building)
+        self.log(f'Creating {count} buildings...')
+
+        buildings = []
+        for i in range(count):
+            name = BUILDING_NAMES[i % len(BUILDING_NAMES)]
+            if i >= len(BUILDING_NAMES):
+                name = f'{name} {i // len(BUILDING_NAMES) + 1}'
+            buildings.append(Building(
+                name=name,
+                address=f'{self.rng.randint(1, 999)} {self.rng.choice(LOCATIONS)}, Kenya',
+                total_units=self.units_per_building,
+                description=f'{self.units_per_building} unit residential building',
+            ))
+        return Building.objects.bulk_create(buildings, batch_size=self.BATCH_SIZE)
+
+    def create_units(self, buildings):
+        unit_count = len(buildings) * self.units_per_building
+        self.log(f'Creating {unit_count} units...')
+
+        occupied = set(self.rng.sample(range(unit_count), min(self.tenant_count, unit_count)))
+        units = []
+        for building_index, building in enumerate(buildings):
+            prefix = building.name[:3].upper()
+            for i in range(self.units_per_building):
+                index = building_index * self.units_per_building + i
+                unit_type = self.rng.choice(UNIT_TYPES)
+                floor = i // 10 + 1
+                if index in occupied:
+                    status = 'OCCUPIED'
+                else:
+                    status = 'MAINTENANCE' if self.rng.random() < 0.3 else 'VACANT'
+                units.append(Unit(
+                    building=building,
+                    unit_number=f'{prefix}-{floor}{i % 10:02d}',
+                    monthly_rent=unit_type['rent_base'] + self.rng.randrange(-2000, 5001, 500),
+                    bedrooms=unit_type['bedrooms'],
+                    bathrooms=unit_type['bathrooms'],
+                    square_feet=self.rng.randint(600, 1500),
+                    status=status,
+                    description=(f"{unit_type['bedrooms']} bedroom, "
+                                 f"{unit_type['bathrooms']} bathroom unit on floor {floor}"),
+                ))
+        return Unit.objects.bulk_create(units, batch_size=self.BATCH_SIZE)
+
+    def new_tenant(self, unit, number, move_in, move_out=None):
+        first_name = self.rng.choice(FIRST_NAMES)
+        last_name = self.rng.choice(LAST_NAMES)
+        return Tenant(
+            unit=unit,
+            first_name=first_name,
+            last_name=last_name,
+            email=f'{first_name.lower()}.{last_name.lower()}{number}@example.com',
+            phone=f'+2547{self.rng.randint(10000000, 99999999)}',
+            id_number=f'{20000000 + number}',
+            emergency_contact_name=f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}',
+            emergency_contact_phone=f'+2547{self.rng.randint(10000000, 99999999)}',
+            move_in_date=move_in,
+            move_out_date=move_out,
+            deposit_amount=unit.monthly_rent,
+            notes=self.rng.choice(['Excellent tenant', 'Always pays on time', 'No issues', '']),
+        )
+
+    def create_tenants(self, units):
+        """Current tenants of the occupied units, then former tenants."""
+        occupied = [unit for unit in units if unit.status == 'OCCUPIED']
+        self.log(f'Creating {len(occupied)} tenants...')
+
+        tenants = []
+        for unit in occupied:
+            move_in = months_before(self.as_of, self.rng.randint(1, self.months + 24))
+            tenants.append(self.new_tenant(
+                unit, len(tenants), move_in + timedelta(days=self.rng.randint(0, 27))))
+
+        if self.full_history:
+            for current in tenants[:len(occupied)]:
+                if self.rng.random() >= self.TURNOVER_RATE:
+                    continue
+                move_out = current.move_in_date - timedelta(days=self.rng.randint(1, 20))
+                move_in = months_before(move_out, self.rng.randint(6, 24))
+                tenants.append(self.new_tenant(
+                    current.unit, len(tenants), move_in, move_out=move_out))
+            self.log(f'  and {len(tenants) - len(occupied)} former tenants')
+
+        # bulk_create skips Tenant.save(), which would save each unit again
+        return Tenant.objects.bulk_create(tenants, batch_size=self.BATCH_SIZE)
+
+    def tenancy_periods(self, tenant):
+        """Billing periods in the window the tenant lived in the unit for."""
+        first = tenant.move_in_date.replace(day=1)
+        last = tenant.move_out_date or self.as_of
+        return [period for period in self.periods if first <= period <= last]
+
+    def create_payments(self, tenants):
+        """
+        Rent charges for every month of each tenancy and the payments made.
+        Most of the rows, so they are written with insert_rows().
+        """
+        self.log(f'Creating up to {self.months} months of payment history...')
+        half = Decimal('0.5')
+        now = timezone.now()
+        fields = ['tenant', 'payment_type', 'amount', 'payment_method', 'transaction_date',
+                  'billing_period', 'description', 'reference_number', 'created_at',
+                  'updated_at']
+
+        def rows():
+            sequence = 0
+            for tenant in tenants:
+                rent = Decimal(tenant.unit.monthly_rent)
+                for period in self.tenancy_periods(tenant):
+                    yield (tenant.pk, 'CHARGE', rent, None, period, period,
+                           f'Rent for {period.strftime("%B %Y")}', None, now, now)
+                    # Nine in ten months are paid, one in ten of those in part
+                    if self.rng.random() < 0.9:
+                        sequence += 1
+                        yield (
+                            tenant.pk, 'PAYMENT',
+                            rent * half if self.rng.random() < 0.1 else rent,
+                            self.rng.choice(PAYMENT_METHODS),
+                            period + timedelta(days=self.rng.randint(0, 10)),
+                            None, 'Rent Payment', f'SEED{self.seed}-{sequence:09d}',
+                            now, now,
+                        )
+
+        return self.insert_rows(Payment, fields, rows())
+
+    def create_leases(self, tenants):
+        self.log('Creating leases...')
+
+        def leases():
+            for tenant in tenants:
+                # Yearly leases, renewed until the tenant left or `as_of`
+                start = tenant.move_in_date
+                end = tenant.move_out_date or self.as_of
+                years = max(1, math.ceil((end - start).days / 365))
+                lease_end = start + timedelta(days=365 * years)
+                if tenant.move_out_date:
+                    status = 'TERMINATED' if tenant.move_out_date < lease_end else 'EXPIRED'
+                else:
+                    status = 'ACTIVE'
+                yield Lease(
+                    tenant=tenant,
+                    unit=tenant.unit,
+                    start_date=start,
+                    end_date=tenant.move_out_date or lease_end,
+                    monthly_rent=tenant.unit.monthly_rent,
+                    security_deposit=tenant.deposit_amount,
+                    status=status,
+                )
+
+        return self.bulk_create(Lease, leases())
+
+    def create_expenses(self, buildings):
+        self.log('Creating expenses...')
+
+        def expenses():
+            for building in buildings:
+                for period in self.periods:
+                    for _ in range(self.rng.randint(3, 6)):
+                        category, description, low, high = self.rng.choice(EXPENSE_CATEGORIES)
+                        yield Expense(
+                            building=building,
+                            category=category,
+                            description=description,
+                            amount=self.money(low, high),
+                            expense_date=period + timedelta(days=self.rng.randint(0, 27)),
+                            vendor=self.rng.choice(VENDORS),
+                            receipt_number=f'RCP-{self.rng.randint(10000, 99999)}',
+                            paid=True,
+                        )
+
+        return self.bulk_create(Expense, expenses())
+
+    def create_utilities(self, buildings):
+        """Monthly water, electricity and garbage bills per building."""
+        self.log('Creating utility bills...')
+        last_period = self.periods[-1] if self.periods else None
+
+        def bills():
+            for building in buildings:
+                readings = {kind: Decimal(self.rng.randint(1000, 50000)) for kind in UTILITY_BILLS}
+                for period in self.periods:
+                    period_end = months_before(period, -1) - timedelta(days=1)
+                    for kind, (provider, usage, price) in UTILITY_BILLS.items():
+                        start_reading = end_reading = None
+                        if usage is None:
+                            amount = price
+                        else:
+                            consumed = Decimal(int(usage * self.rng.uniform(0.8, 1.2)))
+                            start_reading = readings[kind]
+                            end_reading = readings[kind] = start_reading + consumed
+                            amount = consumed * price
+                        # The latest month's bills are still open
+                        paid = period != last_period
+                        yield Utility(
+                            utility_type=kind,
+                            building=building,
+                            amount=amount,
+                            billing_period_start=period,
+                            billing_period_end=period_end,
+                            due_date=period_end + timedelta(days=10),
+                            paid=paid,
+                            payment_date=(period_end + timedelta(days=self.rng.randint(1, 10))
+                                          if paid else None),
+                            provider=provider,
+                            account_number=f'{kind[:3]}-{building.pk:06d}',
+                            meter_reading_start=start_reading,
+                            meter_reading_end=end_reading,
+                        )
+
+        return self.bulk_create(Utility, bills())
+
+    def create_maintenance_requests(self, tenants):
+        """About one request per tenant every two years of tenancy."""
+        self.log('Creating maintenance requests...')
+        recent = self.as_of - timedelta(days=30)
+
+        def requests():
+            for tenant in tenants:
+                end = tenant.move_out_date or self.as_of
+                days = (end - tenant.move_in_date).days
+                for _ in range(sum(self.rng.random() < days / 730 / 3 for _ in range(3))):
+                    category, description = self.rng.choice(MAINTENANCE_ISSUES)
+                    reported = tenant.move_in_date + timedelta(days=self.rng.randint(0, max(days, 0)))
+                    if reported < recent or tenant.move_out_date:
+                        status = self.rng.choice(['COMPLETED'] * 8 + ['CANCELLED'])
+                    else:
+                        status = self.rng.choice(['PENDING', 'IN_PROGRESS'])
+                    completed = status == 'COMPLETED'
+                    yield MaintenanceRequest(
+                        tenant=tenant,
+                        unit=tenant.unit,
+                        title=description,
+                        description=f'{description} in unit {tenant.unit.unit_number}',
+                        category=category,
+                        priority=self.rng.choice(['LOW', 'MEDIUM', 'MEDIUM', 'HIGH', 'URGENT']),
+                        status=status,
+                        scheduled_date=reported + timedelta(days=self.rng.randint(1, 7)),
+                        completed_date=self.aware(
+                            reported + timedelta(days=self.rng.randint(1, 14))) if completed else None,
+                        estimated_cost=self.money(500, 15000),
+                        actual_cost=self.money(500, 15000) if completed else None,
+                        resolution_notes='Work completed satisfactorily' if completed else '',
+                    )
+
+        return self.bulk_create(MaintenanceRequest, requests())
+
+    def create_activity_logs(self, tenants):
+        """A CREATE entry per tenant, as the admin UI would have logged."""
+        self.log('Creating activity logs...')
+        return self.bulk_create(ActivityLog, (
+            ActivityLog(
+                action='CREATE',
+                model_name='Tenant',
+                object_id=tenant.pk,
+                description=f'Created tenant {tenant.full_name}',
+            )
+            for tenant in tenants
+        ))
+
+    @staticmethod
+    def aware(day):
+        return timezone.make_aware(datetime.combine(day, time(12, 0)))
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Building, Unit, Tenant, Payment, Expense, MaintenanceRequest, Document, Lease, ActivityLog, UserProfile, Utility, PropertyPhoto
+from .models import Building, Unit, Tenant, TenantAging, Payment, Expense, MaintenanceRequest, Document, Lease, ActivityLog, UserProfile, Utility, PropertyPhoto, ReconciliationRun, ReconciliationItem
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -123,8 +123,26 @@ class PaymentSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'tenant', 'tenant_name', 'unit_number', 'building_name',
             'payment_type', 'amount', 'payment_method', 'transaction_date',
-            'description', 'reference_number', 'notes',
-            'created_at', 'updated_at'
+            'billing_period', 'late_fee_period', 'description',
+            'reference_number', 'notes', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['billing_period', 'late_fee_period']
+
+
+class StatementLineSerializer(serializers.ModelSerializer):
+    """
+    A statement transaction with its running balance. The tenant is given
+    once at the top of the statement, so rows carry no tenant lookups.
+    """
+    running_balance = serializers.DecimalField(
+        max_digits=14, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = Payment
+        fields = [
+            'id', 'payment_type', 'amount', 'payment_method',
+            'transaction_date', 'billing_period', 'description',
+            'reference_number', 'running_balance'
         ]
 
 
@@ -133,10 +151,15 @@ class TenantStatementSerializer(serializers.Serializer):
     Serializer for tenant statement/report.
     """
     tenant = TenantSerializer()
-    transactions = PaymentSerializer(many=True)
-    total_charges = serializers.DecimalField(max_digits=10, decimal_places=2)
-    total_payments = serializers.DecimalField(max_digits=10, decimal_places=2)
-    current_balance = serializers.DecimalField(max_digits=10, decimal_places=2)
+    start_date = serializers.DateField(allow_null=True)
+    end_date = serializers.DateField(allow_null=True)
+    opening_balance = serializers.DecimalField(max_digits=12, decimal_places=2)
+    total_charges = serializers.DecimalField(max_digits=12, decimal_places=2)
+    total_payments = serializers.DecimalField(max_digits=12, decimal_places=2)
+    closing_balance = serializers.DecimalField(max_digits=12, decimal_places=2)
+    current_balance = serializers.DecimalField(max_digits=12, decimal_places=2)
+    next = serializers.URLField(allow_null=True)
+    transactions = StatementLineSerializer(many=True)
 
 
 class BuildingReportSerializer(serializers.Serializer):
@@ -157,6 +180,25 @@ class BuildingReportSerializer(serializers.Serializer):
     units = UnitSerializer(many=True)
 
 
+class TenantAgingSerializer(serializers.ModelSerializer):
+    tenant_name = serializers.CharField(
+        source='tenant.full_name', read_only=True)
+    phone = serializers.CharField(source='tenant.phone', read_only=True)
+    unit_number = serializers.CharField(
+        source='tenant.unit.unit_number', read_only=True)
+    building_name = serializers.CharField(
+        source='tenant.unit.building.name', read_only=True)
+
+    class Meta:
+        model = TenantAging
+        fields = [
+            'tenant', 'tenant_name', 'phone', 'unit_number', 'building_name',
+            'current', 'days_1_30', 'days_31_60', 'days_61_90',
+            'days_over_90', 'total_due', 'oldest_unpaid_date', 'days_overdue',
+            'as_of'
+        ]
+
+
 class ExpenseSerializer(serializers.ModelSerializer):
     building_name = serializers.CharField(
         source='building.name', read_only=True)
@@ -235,6 +277,29 @@ class ActivityLogSerializer(serializers.ModelSerializer):
         ]
 
 
+class ReconciliationRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReconciliationRun
+        fields = [
+            'id', 'payment_method', 'source_name', 'date_from', 'date_to',
+            'total_records', 'matched_count', 'mismatch_count',
+            'duplicate_count', 'unknown_count', 'missing_count',
+            'matched_amount', 'created_by', 'created_at'
+        ]
+
+
+class ReconciliationItemSerializer(serializers.ModelSerializer):
+    tenant_name = serializers.CharField(
+        source='payment.tenant.full_name', read_only=True, default=None)
+
+    class Meta:
+        model = ReconciliationItem
+        fields = [
+            'id', 'status', 'line', 'reference', 'amount', 'transaction_date',
+            'payment', 'tenant_name', 'expected_amount', 'note'
+        ]
+
+
 class UtilitySerializer(serializers.ModelSerializer):
     building_name = serializers.CharField(
         source='building.name', read_only=True)
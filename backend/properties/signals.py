@@ -0,0 +1,34 @@
+"""
+Model signal handlers
+"""
+from django.core.signals import request_finished
+from django.db import connections, transaction
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver
+from .models import Unit, Tenant, Payment
+from .dashboard import invalidate_dashboard_cache
+
+
+@receiver([post_save, post_delete], sender=Payment)
+@receiver([post_save, post_delete], sender=Unit)
+@receiver([post_save, post_delete], sender=Tenant)
+def dashboard_data_changed(sender, **kwargs):
+    """Invalidate the dashboard summary when its source data changes."""
+    transaction.on_commit(invalidate_dashboard_cache)
+
+
+@receiver(post_migrate)
+def repair_search_index(sender, using, **kwargs):
+    """Restore the SQLite search triggers if a migration rebuilt a table."""
+    from .search import SearchIndex
+
+    if sender.name == 'properties':
+        SearchIndex.repair(connections[using])
+
+
+@receiver(request_finished)
+def flush_activity_log(sender, **kwargs):
+    """Write the activity log entries queued while handling the request."""
+    from . import audit
+
+    audit.flush_activity_log()
@@ -0,0 +1,160 @@
+"""
+On-disk cache of rendered tenant statement PDFs
+"""
+import hashlib
+import io
+import os
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+from .pdf_generator import PDFGenerator
+
+# Bump when the statement layout changes so cached files are re-rendered
+STATEMENT_LAYOUT_VERSION = 2
+
+
+class StatementCache:
+    """
+    Cache rendered statements keyed on a fingerprint of everything the PDF
+    shows: the tenant's payments (count and latest `updated_at`), the
+    tenant, unit and building rows, and the day it was generated, which
+    the footer prints. Each tenant and statement period keeps at most one
+    file; files unused for STATEMENT_CACHE_MAX_AGE seconds are dropped and
+    the least recently used are evicted once the directory exceeds
+    STATEMENT_CACHE_MAX_BYTES.
+    """
+
+    @staticmethod
+    def directory():
+        return Path(settings.STATEMENT_CACHE_DIR)
+
+    @staticmethod
+    def fingerprint(tenant, start_date=None, end_date=None):
+        """
+        Return the ETag of the tenant's statement over the given period
+        using a single aggregate query over their payments. There is no
+        Last-Modified to go with it: deleting a payment changes the count
+        but not the latest `updated_at`.
+        """
+        payments = tenant.payments.aggregate(
+            count=Count('id'), last_updated=Max('updated_at'))
+        unit = tenant.unit
+        stamps = [tenant.updated_at, unit.updated_at, unit.building.updated_at]
+        if payments['last_updated']:
+            stamps.append(payments['last_updated'])
+
+        key = '|'.join([
+            str(STATEMENT_LAYOUT_VERSION),
+            str(tenant.pk),
+            str(start_date),
+            str(end_date),
+            str(timezone.localdate()),
+            str(payments['count']),
+            *(stamp.isoformat() for stamp in stamps),
+        ])
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    @staticmethod
+    def prefix_for(tenant, start_date=None, end_date=None):
+        period = '-'.join(
+            date.strftime('%Y%m%d') if date else 'all'
+            for date in (start_date, end_date)
+        )
+        return f'tenant_{tenant.pk}_{period}_'
+
+    @classmethod
+    def open(cls, tenant, etag, start_date=None, end_date=None):
+        """
+        Return the cached statement for `etag` as a binary file object,
+        rendering and storing it first on a miss. A file opened here stays
+        readable even if another request evicts or replaces it afterwards;
+        a fresh render is served from memory.
+        """
+        prefix = cls.prefix_for(tenant, start_date, end_date)
+        path = cls.directory() / f'{prefix}{etag}.pdf'
+        try:
+            cached = open(path, 'rb')
+        except FileNotFoundError:
+            pass
+        else:
+            # Refresh the mtime so eviction is least-recently-used
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            return cached
+
+        pdf = cls.render(tenant, start_date, end_date)
+        cls.store(path, pdf)
+
+        # Older renders of this statement can never be served again
+        for stale in cls.directory().glob(f'{prefix}*.pdf'):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        cls.evict()
+        return io.BytesIO(pdf)
+
+    @staticmethod
+    def render(tenant, start_date=None, end_date=None):
+        payments = tenant.payments.all()
+        transactions = payments.in_period(start_date, end_date).only(
+            'payment_type', 'amount', 'transaction_date', 'description'
+        ).order_by('transaction_date', 'created_at')
+        opening_balance = (
+            payments.filter(transaction_date__lt=start_date).balance()
+            if start_date else Decimal('0.00')
+        )
+        return PDFGenerator.generate_tenant_statement(
+            tenant, transactions.iterator(chunk_size=2000),
+            start_date=start_date, end_date=end_date,
+            opening_balance=opening_balance, generated_on=timezone.localdate())
+
+    @classmethod
+    def store(cls, path, pdf):
+        """Write atomically so concurrent readers never see a partial file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(pdf)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def evict(cls, max_bytes=None, max_age=None):
+        """
+        Remove cached statements older than `max_age` seconds, then the least
+        recently used ones until the cache fits in `max_bytes`. Returns the
+        number of files removed.
+        """
+        max_bytes = settings.STATEMENT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        max_age = settings.STATEMENT_CACHE_MAX_AGE if max_age is None else max_age
+        directory = cls.directory()
+        if not directory.exists():
+            return 0
+
+        entries = []
+        for path in directory.glob('*.pdf'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        cutoff = time.time() - max_age
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if mtime >= cutoff and total <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,118 @@
+"""
+Cursor-paged tenant statements with running balances
+"""
+from datetime import datetime
+from decimal import Decimal
+from functools import cached_property
+from django.core import signing
+from django.db.models import Q, Sum
+
+CURSOR_SALT = 'properties.statement.cursor'
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def parse_statement_period(params):
+    """
+    Read optional `start_date` / `end_date` (YYYY-MM-DD) query parameters.
+    Raises ValueError if either is malformed.
+    """
+    return tuple(
+        datetime.strptime(value, '%Y-%m-%d').date() if value else None
+        for value in (params.get('start_date'), params.get('end_date'))
+    )
+
+
+class TenantStatement:
+    """
+    One page of a tenant's statement, ordered by (transaction_date, id).
+
+    The cursor is signed and carries the key and running balance of the
+    last row served, so each page is a keyset seek plus a window over that
+    page alone: page cost does not grow with the size of the ledger. It is
+    bound to the tenant and period it was issued for, since the balance it
+    carries is only valid for that statement.
+    """
+
+    def __init__(self, tenant, start_date=None, end_date=None):
+        self.tenant = tenant
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def payments(self):
+        return self.tenant.payments.in_period(self.start_date, self.end_date)
+
+    @cached_property
+    def opening_balance(self):
+        if not self.start_date:
+            return Decimal('0.00')
+        return self.tenant.payments.filter(
+            transaction_date__lt=self.start_date).balance()
+
+    def totals(self):
+        """Period totals from the ledger, or one aggregate for a date range."""
+        ledger = getattr(self.tenant, 'ledger', None)
+        if ledger is not None and not (self.start_date or self.end_date):
+            return ledger.total_charges, ledger.total_payments
+
+        totals = self.payments().aggregate(
+            charges=Sum('amount', filter=Q(payment_type='CHARGE')),
+            payments=Sum('amount', filter=Q(payment_type='PAYMENT')),
+        )
+        return (totals['charges'] or Decimal('0.00'),
+                totals['payments'] or Decimal('0.00'))
+
+    def encode_cursor(self, row):
+        return signing.dumps({
+            'tenant': self.tenant.pk,
+            'start': str(self.start_date),
+            'end': str(self.end_date),
+            'date': row.transaction_date.isoformat(),
+            'id': row.pk,
+            'balance': str(row.running_balance),
+        }, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, cursor):
+        try:
+            data = signing.loads(cursor, salt=CURSOR_SALT)
+            if data['tenant'] != self.tenant.pk:
+                raise InvalidCursor('Cursor belongs to a different tenant')
+            if (data['start'], data['end']) != (str(self.start_date),
+                                                str(self.end_date)):
+                raise InvalidCursor('Cursor belongs to a different period')
+            return (datetime.strptime(data['date'], '%Y-%m-%d').date(),
+                    data['id'], Decimal(data['balance']))
+        except (signing.BadSignature, KeyError, ValueError, ArithmeticError):
+            raise InvalidCursor('Invalid cursor')
+
+    def page(self, cursor=None, page_size=50):
+        """
+        Return (rows, next_cursor). Each row is a Payment annotated with
+        `running_balance`. Raises InvalidCursor for a bad cursor.
+        """
+        payments = self.payments()
+        if cursor:
+            last_date, last_id, balance = self.decode_cursor(cursor)
+            payments = payments.filter(
+                Q(transaction_date__gt=last_date) |
+                Q(transaction_date=last_date, id__gt=last_id)
+            )
+        else:
+            balance = self.opening_balance
+
+        if payments.supports_running_balance():
+            rows = list(payments.with_running_balance(balance)[:page_size + 1])
+        else:
+            # No window functions: accumulate while streaming the page
+            rows = list(payments.order_by('transaction_date', 'id')[:page_size + 1])
+            for row in rows:
+                balance += row.amount if row.payment_type == 'CHARGE' else -row.amount
+                row.running_balance = balance
+
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, self.encode_cursor(rows[-1])
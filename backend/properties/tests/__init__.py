@@ -0,0 +1,36 @@
+"""
+Fixtures shared by the test modules. Each helper creates only what it is
+asked for plus the rows it depends on, with overridable defaults.
+"""
+from datetime import date
+from properties.models import Building, Tenant, Unit
+
+
+def create_building(**fields):
+    return Building.objects.create(**{
+        'name': 'Garden Court', 'address': '1 Ngong Road', 'total_units': 1,
+        **fields,
+    })
+
+
+def create_unit(building=None, **fields):
+    return Unit.objects.create(
+        building=building or create_building(),
+        **{'unit_number': 'G-1', 'monthly_rent': 25000, 'bedrooms': 1,
+           'bathrooms': 1, **fields},
+    )
+
+
+def create_tenant(unit=None, number=1, **fields):
+    """A tenant with contact details numbered `number`, in a new unit by default."""
+    return Tenant.objects.create(
+        unit=unit or create_unit(unit_number=f'G-{number}'),
+        **{'first_name': 'Grace', 'last_name': 'Kamau',
+           'email': f'grace{number}@example.com',
+           'phone': f'+2547000000{number:02d}',
+           'id_number': f'123456{number:02d}',
+           'emergency_contact_name': 'Peter Kamau',
+           'emergency_contact_phone': '+254799999999',
+           'move_in_date': date(2025, 1, 1), 'deposit_amount': 25000,
+           **fields},
+    )
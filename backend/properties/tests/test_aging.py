@@ -0,0 +1,171 @@
+"""
+Receivables aging: bucket computation, the aging report, the reminder
+command and keeping aging in step with repaired ledgers
+"""
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from properties.models import Notification, Payment, TenantAging, TenantBalance
+from properties.tests import create_building, create_tenant, create_unit
+
+
+@override_settings(METRICS_ENABLED=False)
+class AgingTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.now().date()
+        cls.tenant = create_tenant()
+        # Charged 100, 45 and 10 days ago; the payment covers the oldest
+        for days_ago in (100, 45, 10):
+            cls.charge(cls.tenant, days_ago)
+        cls.pay(cls.tenant, 25000)
+
+    @classmethod
+    def charge(cls, tenant, days_ago, amount=25000):
+        return Payment.objects.create(
+            tenant=tenant, payment_type='CHARGE', amount=amount,
+            transaction_date=cls.today - timedelta(days=days_ago),
+            description='Rent')
+
+    @classmethod
+    def pay(cls, tenant, amount):
+        return Payment.objects.create(
+            tenant=tenant, payment_type='PAYMENT', amount=amount,
+            payment_method='MPESA', transaction_date=cls.today,
+            description='Rent Payment')
+
+
+class AgingBucketTests(AgingTestCase):
+
+    def test_payment_write_ages_the_tenant(self):
+        aging = TenantAging.objects.get(tenant=self.tenant)
+
+        self.assertEqual(
+            [getattr(aging, bucket) for bucket in TenantAging.BUCKETS],
+            [Decimal('0.00'), Decimal('25000.00'), Decimal('25000.00'),
+             Decimal('0.00'), Decimal('0.00')])
+        self.assertEqual(aging.total_due, Decimal('50000.00'))
+        self.assertEqual(aging.oldest_unpaid_date, self.today - timedelta(days=45))
+        self.assertEqual(aging.days_overdue, 45)
+
+    def test_payments_settle_the_oldest_charges_first(self):
+        self.pay(self.tenant, 30000)
+
+        aging = TenantAging.objects.get(tenant=self.tenant)
+        self.assertEqual((aging.days_31_60, aging.days_1_30),
+                         (Decimal('0.00'), Decimal('20000.00')))
+        self.assertEqual(aging.oldest_unpaid_date, self.today - timedelta(days=10))
+
+    def test_settled_tenant_owes_nothing(self):
+        self.pay(self.tenant, 50000)
+
+        aging = TenantAging.objects.get(tenant=self.tenant)
+        self.assertEqual(aging.total_due, Decimal('0.00'))
+        self.assertIsNone(aging.oldest_unpaid_date)
+
+    def test_buckets_follow_the_calendar(self):
+        later = self.today + timedelta(days=60)
+        aging = TenantAging.compute([self.tenant.pk], as_of=later)[self.tenant.pk]
+
+        self.assertEqual((aging.days_61_90, aging.days_over_90),
+                         (Decimal('25000.00'), Decimal('25000.00')))
+
+
+class AgingReportTests(AgingTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        other_building = create_building(name='Riverside')
+        cls.recent = create_tenant(create_unit(other_building), number=2)
+        cls.charge(cls.recent, 10, amount=30000)
+        cls.settled = create_tenant(create_unit(other_building, unit_number='R-2'),
+                                    number=3)
+        cls.charge(cls.settled, 40)
+        cls.pay(cls.settled, 25000)
+        cls.moved_out = create_tenant(create_unit(other_building, unit_number='R-3'),
+                                      number=4, move_out_date=date(2025, 6, 1))
+        cls.charge(cls.moved_out, 200)
+        cls.user = User.objects.create_superuser('staff', 'staff@example.com', 'pw')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_owing_active_tenants_oldest_first(self):
+        response = self.client.get('/api/reports/aging/')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual([row['tenant'] for row in response.data['results']],
+                         [self.tenant.pk, self.recent.pk])
+        totals = response.data['totals']
+        self.assertEqual(Decimal(totals['total_due']), Decimal('80000.00'))
+        self.assertEqual(Decimal(totals['days_1_30']), Decimal('55000.00'))
+        self.assertEqual(Decimal(totals['days_31_60']), Decimal('25000.00'))
+
+    def test_building_filter(self):
+        response = self.client.get('/api/reports/aging/',
+                                   {'building': self.recent.unit.building_id})
+
+        self.assertEqual([row['tenant'] for row in response.data['results']],
+                         [self.recent.pk])
+        self.assertEqual(Decimal(response.data['totals']['total_due']),
+                         Decimal('30000.00'))
+
+
+class LateRemindersTests(AgingTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.recent = create_tenant(number=2)
+        cls.charge(cls.recent, 10)
+
+    def test_reminds_tenants_overdue_past_the_threshold(self):
+        call_command('send_late_reminders', days=30, stdout=io.StringIO())
+
+        self.assertEqual(
+            set(Notification.objects.values_list('tenant_id', flat=True)),
+            {self.tenant.pk})
+
+    def test_dry_run_queues_nothing(self):
+        call_command('send_late_reminders', days=5, dry_run=True,
+                     stdout=io.StringIO())
+
+        self.assertFalse(Notification.objects.exists())
+
+
+class ReconcileBalancesTests(AgingTestCase):
+
+    def test_repaired_ledger_is_re_aged(self):
+        expected = TenantAging.objects.get(tenant=self.tenant)
+        # A ledger that missed the payment, and aging computed from it
+        TenantBalance.objects.filter(tenant=self.tenant).update(
+            total_payments=Decimal('0.00'))
+        TenantAging.refresh_for([self.tenant.pk])
+        self.assertEqual(TenantAging.objects.get(tenant=self.tenant).total_due,
+                         Decimal('75000.00'))
+
+        call_command('reconcile_balances', stdout=io.StringIO())
+
+        aging = TenantAging.objects.get(tenant=self.tenant)
+        self.assertEqual(aging.total_due, expected.total_due)
+        self.assertEqual(aging.oldest_unpaid_date, expected.oldest_unpaid_date)
+        self.assertEqual(TenantBalance.objects.get(tenant=self.tenant).total_payments,
+                         Decimal('25000.00'))
+
+    def test_dry_run_leaves_aging_alone(self):
+        TenantBalance.objects.filter(tenant=self.tenant).update(
+            total_payments=Decimal('0.00'))
+        TenantAging.refresh_for([self.tenant.pk])
+
+        call_command('reconcile_balances', dry_run=True, stdout=io.StringIO())
+
+        self.assertEqual(TenantAging.objects.get(tenant=self.tenant).total_due,
+                         Decimal('75000.00'))
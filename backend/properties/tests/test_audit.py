@@ -0,0 +1,97 @@
+"""
+Buffered activity log writes
+"""
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import DatabaseError, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from properties import audit
+from properties.audit import AuditBuffer, flush_activity_log, log_activity
+from properties.models import ActivityLog
+from properties.tests import create_tenant
+
+
+class AuditBufferTests(TestCase):
+
+    def setUp(self):
+        self.buffer = AuditBuffer(max_entries=3, flush_interval=3600, max_pending=5)
+        patcher = mock.patch.object(audit, '_buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def log(self, description='Created Garden Court'):
+        return log_activity('CREATE', 'Building', description)
+
+    def test_unknown_action(self):
+        with self.assertRaisesMessage(ValueError, 'Unknown activity log action "ERASE"'):
+            log_activity('ERASE', 'Building', 'Erased Garden Court')
+        self.assertEqual(self.buffer.pending, [])
+
+    def test_written_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.log('one')
+            self.log('two')
+        self.assertEqual(ActivityLog.objects.count(), 0)
+        self.assertEqual(len(self.buffer.pending), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.log('three')
+        self.assertEqual(
+            list(ActivityLog.objects.order_by('timestamp').values_list('description', flat=True)),
+            ['one', 'two', 'three'])
+        self.assertEqual(self.buffer.pending, [])
+
+    def test_rolled_back_entries_are_discarded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.log('kept')
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.log('rolled back')
+                raise RuntimeError
+
+        self.assertEqual([entry.description for entry in self.buffer.pending], ['kept'])
+
+    def test_queued_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.log()
+            self.assertEqual(self.buffer.pending, [])
+        self.assertEqual(len(callbacks), 1)
+
+    def test_failed_flush_is_capped(self):
+        with mock.patch.object(ActivityLog.objects, 'bulk_create',
+                               side_effect=DatabaseError), \
+                self.assertLogs('properties.audit', 'WARNING') as logs:
+            for n in range(8):
+                self.buffer.enqueue(ActivityLog(user='System', action='CREATE',
+                                                model_name='Building', description=str(n)))
+
+        self.assertEqual([entry.description for entry in self.buffer.pending],
+                         ['3', '4', '5', '6', '7'])
+        dropped = [line for line in logs.output if 'oldest' in line]
+        self.assertEqual(len(dropped), 3)
+        self.assertIn('dropped the 1 oldest entries', dropped[0])
+        self.assertEqual(flush_activity_log(), 5)
+
+
+@override_settings(METRICS_ENABLED=False)
+class RequestFlushTests(TransactionTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(audit, '_buffer', AuditBuffer(100, 3600))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_superuser('staff', 'staff@example.com', 'pw'))
+
+    def test_flushed_at_request_end(self):
+        tenant = create_tenant()
+
+        response = self.client.post(f'/api/tenants/{tenant.pk}/move_out/',
+                                    {'move_out_date': '2026-03-31'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        entry = ActivityLog.objects.get(action='UPDATE')
+        self.assertEqual(entry.user, 'staff')
+        self.assertEqual(entry.object_id, tenant.pk)
+        self.assertEqual(entry.ip_address, '127.0.0.1')
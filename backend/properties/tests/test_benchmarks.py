@@ -0,0 +1,98 @@
+"""
+The benchmark harness: runner, registered benchmarks and comparisons
+"""
+import io
+import tempfile
+from datetime import date
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+from properties.benchmarks import (
+    BENCHMARKS, Benchmark, BenchmarkContext, BenchmarkRunner, compare_results
+)
+from properties.models import Building, Payment
+from properties.seeding import DatasetBuilder
+
+
+def document(**medians):
+    return {'benchmarks': {
+        name: {'median': median, 'queries': 3} for name, median in medians.items()
+    }}
+
+
+class CompareResultsTests(SimpleTestCase):
+
+    def test_statuses(self):
+        baseline = document(slower=0.100, faster=0.100, noise=0.100, tiny=0.001,
+                            dropped=0.050)
+        current = document(slower=0.120, faster=0.080, noise=0.105, tiny=0.002,
+                           added=0.010)
+
+        rows = {row['name']: row for row in compare_results(baseline, current, 10)}
+
+        self.assertEqual({name: row['status'] for name, row in rows.items()}, {
+            'added': 'new', 'dropped': 'missing', 'faster': 'improved',
+            'noise': 'unchanged', 'slower': 'regressed', 'tiny': 'unchanged',
+        })
+        self.assertAlmostEqual(rows['slower']['change'], 20.0)
+        self.assertEqual(rows['slower']['queries'], (3, 3))
+        self.assertEqual(list(rows), sorted(rows))
+
+    def test_command_arguments(self):
+        out = io.StringIO()
+        call_command('benchmark', list=True, stdout=out)
+        self.assertIn('TenantViewSet.list', out.getvalue())
+
+        with self.assertRaisesMessage(CommandError, 'No benchmark matches'):
+            call_command('benchmark', only=['Nope'], stdout=io.StringIO())
+        with self.assertRaisesMessage(CommandError, 'File not found'):
+            call_command('benchmark', compare='/nonexistent/baseline.json',
+                         stdout=io.StringIO())
+
+
+@override_settings(METRICS_ENABLED=False)
+class BenchmarkRunnerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetBuilder(8, seed=5, months=2, as_of=date(2026, 1, 1)).build()
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(STATEMENT_CACHE_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.context = BenchmarkContext(next_month='January 2026')
+
+    def test_rollback_rounds_leave_no_writes(self):
+        def rename(context):
+            Building.objects.update(name='Renamed')
+
+        stats = BenchmarkRunner(rounds=3, warmup=1).run(
+            Benchmark('rename', rename, rollback=True), self.context)
+
+        self.assertEqual(stats['rounds'], 3)
+        self.assertEqual(stats['queries'], 1)
+        self.assertLessEqual(stats['min'], stats['median'])
+        self.assertLessEqual(stats['median'], stats['max'])
+        self.assertFalse(Building.objects.filter(name='Renamed').exists())
+
+    def test_setup_is_not_counted(self):
+        def setup(context):
+            list(Payment.objects.all())
+
+        stats = BenchmarkRunner(rounds=1, warmup=0).run(
+            Benchmark('noop', lambda context: None, setup=setup), self.context)
+        self.assertEqual(stats['queries'], 0)
+
+    def test_every_benchmark_runs(self):
+        runner = BenchmarkRunner(rounds=1, warmup=0)
+        for bench in BENCHMARKS.values():
+            with self.subTest(bench=bench.name):
+                charges = Payment.objects.filter(payment_type='CHARGE').count()
+                stats = runner.run(bench, self.context)
+                self.assertGreater(stats['queries'], 0)
+                if bench.rollback:
+                    self.assertEqual(
+                        Payment.objects.filter(payment_type='CHARGE').count(), charges)
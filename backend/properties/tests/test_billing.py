@@ -0,0 +1,162 @@
+"""
+Rent billing and late fee assessment
+"""
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+from properties.billing import RentBilling
+from properties.late_fees import LateFees
+from properties.models import Payment, Tenant, TenantAging, TenantBalance
+from properties.seeding import DatasetBuilder
+from properties.tests import create_tenant
+
+
+class RentBillingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetBuilder(5, seed=3, months=2, as_of=date(2026, 1, 1)).build()
+
+    def charges(self, period):
+        return Payment.objects.filter(payment_type='CHARGE', billing_period=period)
+
+    def test_dry_run_writes_nothing(self):
+        run = RentBilling.charge_month('January 2026', dry_run=True)
+
+        self.assertEqual(len(run.charges), 5)
+        self.assertFalse(self.charges(date(2026, 1, 1)).exists())
+
+    def test_second_run_skips_charged_tenants(self):
+        first = RentBilling.charge_month('January 2026')
+        second = RentBilling.charge_month('January 2026')
+
+        self.assertEqual((len(first.charges), len(first.skipped)), (5, 0))
+        self.assertEqual((len(second.charges), len(second.skipped)), (0, 5))
+        self.assertEqual(self.charges(date(2026, 1, 1)).count(), 5)
+
+
+@override_settings(METRICS_ENABLED=False)
+class ChargeRentEndpointTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetBuilder(5, seed=3, months=2, as_of=date(2026, 1, 1)).build()
+        cls.user = User.objects.create_superuser('staff', 'staff@example.com', 'pw')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.tenant = Tenant.objects.filter(move_out_date__isnull=True).first()
+
+    def charge(self, tenant, **data):
+        return self.client.post(f'/api/tenants/{tenant.pk}/charge_rent/',
+                                {'month': 'January 2026', **data}, format='json')
+
+    def test_tenant_charged_once_per_month(self):
+        response = self.charge(self.tenant, amount='20000.00')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['billing_period'], '2026-01-01')
+
+        response = self.client.post('/api/payments/charge_all_rent/',
+                                    {'month': 'January 2026'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['charged'], response.data['skipped']), (4, 1))
+
+        charges = self.tenant.payments.filter(billing_period=date(2026, 1, 1))
+        self.assertEqual([c.amount for c in charges], [Decimal('20000.00')])
+
+    def test_second_charge_is_rejected(self):
+        self.assertEqual(self.charge(self.tenant).status_code, 201)
+
+        response = self.charge(self.tenant)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.tenant.payments.filter(
+            billing_period=date(2026, 1, 1)).count(), 1)
+
+    def test_invalid_month(self):
+        self.assertEqual(self.charge(self.tenant, month='Smarch 2026').status_code, 400)
+
+
+@override_settings(METRICS_ENABLED=False)
+class LateFeeTests(TestCase):
+    today = date(2026, 1, 20)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant()
+        # A tenant from before ledgers existed, with charges written in bulk
+        TenantBalance.objects.all().delete()
+        Payment.objects.bulk_create([Payment(
+            tenant=cls.tenant, payment_type='CHARGE', amount=25000,
+            transaction_date=date(2025, 12, 1), billing_period=date(2025, 12, 1),
+            description='Rent for December 2025')])
+
+    def assess(self):
+        return LateFees.assess(today=self.today, grace_days=5,
+                               percentage=5, minimum=500)
+
+    def test_assessment_writes_nothing(self):
+        [assessment] = self.assess()
+
+        self.assertEqual(assessment.balance, Decimal('25000.00'))
+        self.assertEqual(assessment.days_overdue, 50)
+        self.assertEqual(assessment.fee, Decimal('1250.00'))
+        self.assertFalse(TenantBalance.objects.exists())
+        self.assertFalse(TenantAging.objects.exists())
+
+    def test_fee_is_charged_once_per_month(self):
+        [fee] = LateFees.apply(self.assess(), today=self.today, notify=False)
+        self.assertEqual(fee.late_fee_period, date(2026, 1, 1))
+
+        [assessment] = self.assess()
+        self.assertTrue(assessment.already_charged)
+        self.assertEqual(assessment.balance, Decimal('26250.00'))
+        self.assertEqual(LateFees.apply([assessment], today=self.today), [])
+
+    def test_unledgered_payments_cover_the_oldest_charges_first(self):
+        Payment.objects.bulk_create([
+            Payment(tenant=self.tenant, payment_type='PAYMENT', amount=25000,
+                    payment_method='MPESA', transaction_date=date(2025, 12, 3),
+                    description='Rent Payment'),
+            Payment(tenant=self.tenant, payment_type='CHARGE', amount=25000,
+                    transaction_date=date(2026, 1, 1), billing_period=date(2026, 1, 1),
+                    description='Rent for January 2026'),
+        ])
+
+        [assessment] = self.assess()
+        self.assertEqual(assessment.oldest_unpaid_date, date(2026, 1, 1))
+        self.assertEqual(assessment.days_overdue, 19)
+        self.assertEqual(assessment.balance, Decimal('25000.00'))
+        self.assertFalse(TenantBalance.objects.exists())
+
+    def test_unledgered_tenant_within_grace_is_not_charged(self):
+        Payment.objects.bulk_create([
+            Payment(tenant=self.tenant, payment_type='PAYMENT', amount=25000,
+                    payment_method='MPESA', transaction_date=date(2025, 12, 3),
+                    description='Rent Payment'),
+            Payment(tenant=self.tenant, payment_type='CHARGE', amount=25000,
+                    transaction_date=date(2026, 1, 15), billing_period=date(2026, 1, 1),
+                    description='Rent for January 2026'),
+        ])
+
+        self.assertEqual(self.assess(), [])
+
+    def test_stale_assessment_is_not_charged_twice(self):
+        assessments = self.assess()
+        stale = self.assess()
+        LateFees.apply(assessments, today=self.today, notify=False)
+
+        self.assertEqual(LateFees.apply(stale, today=self.today, notify=False), [])
+        self.assertTrue(stale[0].already_charged)
+        self.assertEqual(Payment.objects.filter(
+            late_fee_period=date(2026, 1, 1)).count(), 1)
+
+    def test_other_charges_are_not_mistaken_for_late_fees(self):
+        Payment.objects.create(
+            tenant=self.tenant, payment_type='CHARGE', amount=500,
+            transaction_date=date(2026, 1, 5),
+            description='Late Fee waiver reversal')
+
+        [assessment] = self.assess()
+        self.assertFalse(assessment.already_charged)
@@ -0,0 +1,88 @@
+"""
+ETag revalidation of list and detail responses
+"""
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.utils.http import http_date
+from rest_framework.test import APITestCase
+from properties.models import Payment
+from properties.tests import create_building, create_tenant, create_unit
+
+
+@override_settings(METRICS_ENABLED=False)
+class ConditionalGetTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.building = create_building(total_units=2)
+        cls.units = [create_unit(cls.building, unit_number=f'G-{n}') for n in (1, 2)]
+        cls.tenant = create_tenant(cls.units[0])
+        cls.user = User.objects.create_superuser('staff', 'staff@example.com', 'pw')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, etag=None, **headers):
+        if etag:
+            headers['HTTP_IF_NONE_MATCH'] = etag
+        return self.client.get(url, **headers)
+
+    def test_list_revalidates(self):
+        response = self.get('/api/units/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        not_modified = self.get('/api/units/', response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        self.assertEqual(not_modified.content, b'')
+
+    def test_detail_revalidates(self):
+        etag = self.get(f'/api/buildings/{self.building.pk}/')['ETag']
+        self.assertEqual(self.get(f'/api/buildings/{self.building.pk}/', etag).status_code, 304)
+
+    def test_change_invalidates(self):
+        etag = self.get('/api/units/')['ETag']
+        self.units[1].rent_amount = Decimal('27000.00')
+        self.units[1].save()
+
+        response = self.get('/api/units/', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_delete_invalidates(self):
+        etag = self.get('/api/units/')['ETag']
+        seen = http_date()
+        self.units[1].delete()
+
+        response = self.get('/api/units/', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        # Nothing left is newer than the client's copy, which must not matter
+        response = self.get('/api/units/', HTTP_IF_MODIFIED_SINCE=seen)
+        self.assertEqual(response.status_code, 200)
+
+    def test_embedded_relation_invalidates(self):
+        etag = self.get('/api/tenants/')['ETag']
+        Payment.objects.create(
+            tenant=self.tenant, payment_type='PAYMENT', amount=Decimal('5000.00'),
+            payment_method='CASH', transaction_date=date(2026, 3, 2),
+            description='Rent Payment')
+
+        response = self.get('/api/tenants/', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data['results'][0]['total_balance']),
+                         Decimal('-5000.00'))
+
+    def test_etag_varies_with_query_and_format(self):
+        etags = {
+            self.get(url)['ETag']
+            for url in ('/api/units/', '/api/units/?is_occupied=true',
+                        '/api/units/?format=json')
+        }
+        self.assertEqual(len(etags), 3)
@@ -0,0 +1,111 @@
+"""
+Streaming CSV / XLSX exports of the financial lists
+"""
+import csv
+import gzip
+import io
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from openpyxl import load_workbook
+from rest_framework.test import APITestCase
+from properties.audit import flush_activity_log
+from properties.models import ActivityLog, Payment, Tenant
+from properties.seeding import DatasetBuilder
+from properties.tests import create_tenant
+
+
+@override_settings(METRICS_ENABLED=False)
+class ExportTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetBuilder(20, seed=9, months=2, as_of=date(2026, 1, 1),
+                       full_history=True).build()
+        cls.user = User.objects.create_superuser('staff', 'staff@example.com', 'pw')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def export(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content)
+        response.close()
+        return response, content
+
+    def read_csv(self, content):
+        return list(csv.reader(io.StringIO(content.decode('utf-8-sig'))))
+
+    def test_csv_honors_filters(self):
+        response, content = self.export('/api/payments/export/', payment_type='CHARGE')
+
+        rows = self.read_csv(content)
+        self.assertEqual(rows[0][:3], ['ID', 'Date', 'Type'])
+        self.assertEqual(len(rows) - 1, Payment.objects.filter(payment_type='CHARGE').count())
+        self.assertEqual({row[2] for row in rows[1:]}, {'Charge'})
+        self.assertIn('attachment; filename="payments-', response['Content-Disposition'])
+
+    def test_gzip(self):
+        response, content = self.export('/api/payments/export/', gzip='true')
+        _, plain = self.export('/api/payments/export/')
+
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertTrue(response['Content-Disposition'].endswith('.csv.gz"'))
+        self.assertEqual(gzip.decompress(content), plain)
+
+    def test_xlsx(self):
+        _, content = self.export('/api/tenants/export/', file_format='xlsx')
+
+        sheet = load_workbook(io.BytesIO(content), read_only=True).active
+        rows = list(sheet.values)
+        self.assertEqual(rows[0][:2], ('ID', 'Name'))
+        tenant = Tenant.objects.get(pk=rows[1][0])
+        self.assertEqual(rows[1][1], tenant.full_name)
+        self.assertEqual(Decimal(str(rows[1][-1])), tenant.total_balance)
+        self.assertEqual(len(rows) - 1, Tenant.objects.count())
+
+    def test_every_financial_list(self):
+        for url in ('/api/payments/export/', '/api/expenses/export/',
+                    '/api/utilities/export/', '/api/tenants/export/'):
+            with self.subTest(url=url):
+                _, content = self.export(url)
+                self.assertGreater(len(self.read_csv(content)), 1)
+
+    def test_unknown_format(self):
+        response = self.client.get('/api/payments/export/', {'file_format': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_is_logged(self):
+        flush_activity_log()
+        ActivityLog.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.export('/api/payments/export/', payment_type='PAYMENT')
+        flush_activity_log()
+
+        entry = ActivityLog.objects.get(action='EXPORT')
+        count = Payment.objects.filter(payment_type='PAYMENT').count()
+        self.assertEqual(entry.user, 'staff')
+        self.assertEqual(entry.description,
+                         f'Exported {count} payments as CSV (payment_type=PAYMENT)')
+
+    def count_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as captured:
+            self.export(url, **params)
+        return len(captured)
+
+    def test_payment_queries_do_not_grow_with_rows(self):
+        tenant = Tenant.objects.order_by('pk').first()
+        few = self.count_queries('/api/payments/export/', tenant=tenant.pk)
+        self.assertEqual(self.count_queries('/api/payments/export/'), few)
+
+    def test_tenant_queries_do_not_grow_with_rows(self):
+        before = self.count_queries('/api/tenants/export/')
+        for number in range(90, 95):
+            create_tenant(number=number)
+        self.assertEqual(self.count_queries('/api/tenants/export/'), before)
@@ -0,0 +1,105 @@
+"""
+The generate_statements command
+"""
+import io
+import tempfile
+import zipfile
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from properties.billing import RentBilling
+from properties.management.commands.generate_statements import Command
+from properties.models import Document, Payment
+from properties.tests import create_building, create_tenant, create_unit
+
+
+class GenerateStatementsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        building = create_building(total_units=3)
+        cls.charged = create_tenant(create_unit(building, unit_number='G-1'), number=1)
+        cls.uncharged = create_tenant(create_unit(building, unit_number='G-2'), number=2)
+        cls.moved_out = create_tenant(create_unit(building, unit_number='G-3'), number=3,
+                                      move_out_date=date(2025, 12, 31))
+
+        Payment.objects.create(
+            tenant=cls.charged, payment_type='CHARGE', amount=25000,
+            transaction_date=date(2025, 12, 1), billing_period=date(2025, 12, 1),
+            description='Rent for December 2025')
+        Payment.objects.create(
+            tenant=cls.charged, payment_type='PAYMENT', amount=20000,
+            payment_method='MPESA', transaction_date=date(2025, 12, 5),
+            description='Rent Payment')
+        RentBilling.charge_tenant(cls.charged, 'January 2026',
+                                  transaction_date=date(2026, 1, 1))
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.media = Path(directory.name)
+        settings = override_settings(MEDIA_ROOT=directory.name, METRICS_ENABLED=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def generate(self, **options):
+        call_command('generate_statements', workers=2, stdout=io.StringIO(),
+                     **{'month': 'January 2026', **options})
+
+    def test_statements_and_invoices_for_active_tenants(self):
+        self.generate(invoices=True)
+
+        files = sorted(path.name for path in (self.media / 'statements' / '2026-01').iterdir())
+        self.assertEqual(files, [
+            f'invoice_{self.charged.pk}_Grace_Kamau_202601.pdf',
+            f'statement_{self.charged.pk}_Grace_Kamau_202601.pdf',
+            f'statement_{self.uncharged.pk}_Grace_Kamau_202601.pdf',
+        ])
+        for name in files:
+            pdf = (self.media / 'statements' / '2026-01' / name).read_bytes()
+            self.assertTrue(pdf.startswith(b'%PDF'))
+
+    def test_zip(self):
+        archive = self.media / 'statements.zip'
+        self.generate(zip=str(archive))
+
+        with zipfile.ZipFile(archive) as statements:
+            names = statements.namelist()
+            self.assertEqual(len(names), 2)
+            self.assertTrue(all(statements.read(name).startswith(b'%PDF')
+                                for name in names))
+        self.assertFalse((self.media / 'statements' / '2026-01').exists())
+
+    def test_attach_records_documents(self):
+        self.generate(invoices=True, attach=True)
+
+        documents = Document.objects.filter(tenant=self.charged).order_by('document_type')
+        self.assertEqual(
+            [(d.document_type, d.title) for d in documents],
+            [('INVOICE', 'Rent Invoice - January 2026'),
+             ('STATEMENT', 'Statement - January 2026')])
+        for document in documents:
+            self.assertTrue((self.media / document.file.name).is_file())
+
+    def test_invalid_options(self):
+        with self.assertRaises(CommandError):
+            self.generate(month='Smarch 2026')
+        with self.assertRaises(CommandError):
+            self.generate(attach=True, zip=str(self.media / 'statements.zip'))
+        with self.assertRaises(CommandError):
+            self.generate(attach=True, output_dir=tempfile.gettempdir())
+
+    def test_statement_covers_only_the_month(self):
+        jobs = list(Command().build_jobs(
+            date(2026, 1, 1), 'January 2026', self.media, invoices=True,
+            in_memory=True))
+
+        statement, invoice = [job for job in jobs if job['tenant'] == self.charged]
+        self.assertEqual(statement['opening_balance'], Decimal('5000.00'))
+        self.assertEqual([p.description for p in statement['transactions']],
+                         ['Rent for January 2026'])
+        self.assertEqual((statement['start_date'], statement['end_date']),
+                         (date(2026, 1, 1), date(2026, 1, 31)))
+        self.assertEqual(invoice['payment'].billing_period, date(2026, 1, 1))
@@ -0,0 +1,88 @@
+"""
+The materialized tenant ledger must always match a from-scratch total of
+the tenant's payments
+"""
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from properties.models import Payment, Tenant, TenantBalance, Unit
+from properties.seeding import DatasetBuilder
+
+
+@override_settings(METRICS_ENABLED=False)
+class LedgerTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetBuilder(2, seed=5, months=2, as_of=date(2026, 1, 1)).build()
+        cls.user = User.objects.create_superuser('staff', 'staff@example.com', 'pw')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.tenant, self.other = Tenant.objects.order_by('pk')[:2]
+
+    def assertLedgerMatchesPayments(self):
+        totals = TenantBalance.compute_totals()
+        for ledger in TenantBalance.objects.all():
+            expected = totals.get(ledger.tenant_id) or TenantBalance()
+            self.assertEqual(
+                (ledger.total_charges, ledger.total_payments,
+                 ledger.last_charge_date, ledger.last_payment_date),
+                (expected.total_charges, expected.total_payments,
+                 expected.last_charge_date, expected.last_payment_date),
+                f'Ledger of tenant {ledger.tenant_id} has drifted')
+
+    def pay(self, tenant, amount, day=date(2026, 1, 10)):
+        return Payment.objects.create(
+            tenant=tenant, payment_type='PAYMENT', amount=Decimal(amount),
+            payment_method='CASH', transaction_date=day, description='Rent Payment')
+
+    def test_create_update_move_and_delete(self):
+        payment = self.pay(self.tenant, '1000.00')
+        self.assertLedgerMatchesPayments()
+
+        payment.amount = Decimal('2500.00')
+        payment.save()
+        self.assertLedgerMatchesPayments()
+
+        payment.tenant = self.other
+        payment.save()
+        self.assertLedgerMatchesPayments()
+
+        payment.delete()
+        self.assertLedgerMatchesPayments()
+
+    def test_bulk_create_then_refresh(self):
+        Payment.objects.bulk_create([
+            Payment(tenant=tenant, payment_type='CHARGE', amount=Decimal('300.00'),
+                    transaction_date=date(2026, 1, day), description='Water')
+            for tenant in (self.tenant, self.other) for day in (2, 3)
+        ])
+        TenantBalance.refresh_for([self.tenant.pk, self.other.pk])
+        self.assertLedgerMatchesPayments()
+
+    def test_new_tenant_has_a_ledger(self):
+        unit = Unit.objects.filter(status='VACANT').first()
+        response = self.client.post('/api/tenants/', {
+            'unit': unit.pk, 'first_name': 'Grace', 'last_name': 'Kamau',
+            'email': 'grace@example.com', 'phone': '+254700000001',
+            'id_number': '12345678', 'emergency_contact_name': 'Peter Kamau',
+            'emergency_contact_phone': '+254700000002',
+            'move_in_date': '2026-01-01', 'deposit_amount': '25000.00',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+
+        ledger = TenantBalance.objects.get(tenant_id=response.data['id'])
+        self.assertEqual(ledger.balance, Decimal('0.00'))
+
+    def test_reading_a_balance_writes_nothing(self):
+        self.pay(self.tenant, '1000.00')
+        TenantBalance.objects.filter(tenant=self.tenant).delete()
+        expected = TenantBalance.compute_totals([self.tenant.pk])[self.tenant.pk]
+
+        response = self.client.get(f'/api/tenants/{self.tenant.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data['total_balance']), expected.balance)
+        self.assertFalse(TenantBalance.objects.filter(tenant=self.tenant).exists())
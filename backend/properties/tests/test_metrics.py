@@ -0,0 +1,113 @@
+"""
+Prometheus metrics collection and the metrics endpoint
+"""
+import os
+import tempfile
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+from properties import metrics
+from properties.metrics import MetricsStore
+
+
+class MetricsStoreTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'metrics.sqlite3')
+
+    def test_exposition(self):
+        store = MetricsStore(self.path)
+        store.inc('http_requests_total', view='TenantViewSet.list', method='GET', status=200)
+        store.inc('http_requests_total', view='TenantViewSet.list', method='GET', status=200)
+        store.inc('http_requests_total', view='a "quoted"\nname', method='GET', status=500)
+        for value in (0.003, 0.02, 0.02, 30):
+            store.observe('http_request_duration_seconds', value, view='v', method='GET')
+
+        lines = store.render().splitlines()
+
+        self.assertIn('# HELP http_requests_total Requests handled, by view, '
+                      'method and status code', lines)
+        self.assertIn('# TYPE http_requests_total counter', lines)
+        self.assertIn('http_requests_total{method="GET",status="200",'
+                      'view="TenantViewSet.list"} 2', lines)
+        self.assertIn('http_requests_total{method="GET",status="500",'
+                      'view="a \\"quoted\\"\\nname"} 1', lines)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', lines)
+        histogram = [line for line in lines
+                     if line.startswith('http_request_duration_seconds')]
+        self.assertEqual(histogram[0],
+                         'http_request_duration_seconds_bucket{method="GET",view="v",le="0.005"} 1')
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",view="v",le="0.025"} 3',
+                      histogram)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",view="v",le="10"} 3',
+                      histogram)
+        self.assertEqual(histogram[-3:], [
+            'http_request_duration_seconds_bucket{method="GET",view="v",le="+Inf"} 4',
+            'http_request_duration_seconds_sum{method="GET",view="v"} 30.043',
+            'http_request_duration_seconds_count{method="GET",view="v"} 4',
+        ])
+        self.assertNotIn('# TYPE http_request_db_queries histogram', lines)
+
+    def test_processes_share_totals(self):
+        worker, sender = MetricsStore(self.path), MetricsStore(self.path)
+        worker.inc('http_requests_total', view='v', method='GET', status=200)
+        sender.inc('http_requests_total', view='v', method='GET', status=200)
+        sender.flush()
+
+        self.assertIn('http_requests_total{method="GET",status="200",view="v"} 2',
+                      worker.render())
+
+    def test_failed_flush_keeps_samples(self):
+        store = MetricsStore(os.path.join(self.path, 'not-a-directory', 'metrics.sqlite3'))
+        store.schema_ready = True
+        store.inc('http_requests_total', view='v', method='GET', status=200)
+        store.flush()
+
+        self.assertEqual(list(store.pending.values()), [1])
+
+
+class MetricsEndpointTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_superuser('staff', 'staff@example.com', 'pw')
+        cls.clerk = User.objects.create_user('clerk', 'clerk@example.com', 'pw')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            METRICS_ENABLED=True, METRICS_FLUSH_INTERVAL=0,
+            METRICS_DB=os.path.join(directory.name, 'metrics.sqlite3'))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        patcher = mock.patch.object(metrics, '_store', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_staff_only(self):
+        self.assertIn(self.client.get('/api/_metrics').status_code, (401, 403))
+        self.client.force_authenticate(self.clerk)
+        self.assertEqual(self.client.get('/api/_metrics').status_code, 403)
+
+    def test_requests_are_recorded(self):
+        self.client.force_authenticate(self.staff)
+        self.client.get('/api/buildings/')
+
+        response = self.client.get('/api/_metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        body = response.content.decode()
+        self.assertIn('http_requests_total{method="GET",status="200",'
+                      'view="BuildingViewSet.list"} 1', body)
+        self.assertIn('http_request_db_queries_count{view="BuildingViewSet.list"} 1', body)
+        self.assertIn('http_response_size_bytes_count{view="BuildingViewSet.list"} 1', body)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(self.client.get('/api/_metrics').status_code, 404)
@@ -0,0 +1,226 @@
+"""
+The notification outbox: queueing, delivery, retries and dead letters,
+and SMTP connection reuse
+"""
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from properties.models import Notification
+from properties.notifications import NotificationNotConfigured, NotificationService
+from properties.tests import create_tenant
+
+
+class FakeSMSClient:
+    """Stands in for the Twilio client; fails while `failures` is positive."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+        self.messages = SimpleNamespace(create=self.create)
+
+    def create(self, body, from_, to):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('Twilio unavailable')
+        self.sent.append((to, body))
+        return SimpleNamespace(sid=f'SM{len(self.sent)}')
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    METRICS_ENABLED=False,
+    NOTIFICATION_MAX_ATTEMPTS=3,
+    NOTIFICATION_RETRY_BASE_SECONDS=60,
+)
+class OutboxTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant()
+
+    def setUp(self):
+        self.sms = FakeSMSClient()
+        for patch in (
+            mock.patch.object(NotificationService, 'get_sms_client',
+                              side_effect=lambda: self.sms),
+            mock.patch('properties.notifications.twilio_settings',
+                       return_value=('AC123', 'token', '+15550000000')),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def process(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return NotificationService.process_batch(executor, workers=2)
+
+    def make_due(self):
+        Notification.objects.update(next_attempt_at=timezone.now())
+
+
+class QueueTests(OutboxTestCase):
+
+    def test_notify_queues_without_sending(self):
+        NotificationService.notify_rent_charged(self.tenant, 25000, 'January 2026')
+
+        queued = Notification.objects.order_by('channel')
+        self.assertEqual([n.channel for n in queued], ['EMAIL', 'SMS'])
+        self.assertTrue(all(n.status == 'PENDING' for n in queued))
+        self.assertEqual(queued[0].subject, 'Rent Charged for January 2026')
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(self.sms.sent, [])
+
+    def test_process_sends_queued_messages(self):
+        NotificationService.notify_rent_charged(self.tenant, 25000, 'January 2026')
+
+        self.assertEqual(self.process()['SENT'], 2)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['grace1@example.com'])
+        self.assertEqual([to for to, _ in self.sms.sent], ['+254700000001'])
+        for notification in Notification.objects.all():
+            self.assertEqual(notification.status, 'SENT')
+            self.assertEqual(notification.attempts, 1)
+            self.assertIsNotNone(notification.sent_at)
+
+        # Nothing is due any more
+        self.assertEqual(self.process()['SENT'], 0)
+
+    def test_unconfigured_channel_is_skipped(self):
+        NotificationService.notify_rent_charged(self.tenant, 25000, 'January 2026')
+
+        with mock.patch.object(NotificationService, 'get_sms_client',
+                               side_effect=NotificationNotConfigured('Twilio not configured')):
+            counts = self.process()
+
+        self.assertEqual((counts['SENT'], counts['SKIPPED']), (1, 1))
+        sms = Notification.objects.get(channel='SMS')
+        self.assertEqual(sms.status, 'SKIPPED')
+        self.assertEqual(sms.last_error, 'Twilio not configured')
+
+
+class RetryTests(OutboxTestCase):
+
+    def setUp(self):
+        super().setUp()
+        NotificationService.enqueue([Notification(
+            tenant=self.tenant, channel='SMS', recipient=self.tenant.phone,
+            body='Rent reminder')])
+
+    def test_failure_is_retried_with_exponential_backoff(self):
+        self.sms.failures = 2
+
+        delays = []
+        for attempt in (1, 2):
+            started = timezone.now()
+            self.assertEqual(self.process()['PENDING'], 1)
+            notification = Notification.objects.get()
+            self.assertEqual(notification.status, 'PENDING')
+            self.assertEqual(notification.attempts, attempt)
+            self.assertEqual(notification.last_error, 'Twilio unavailable')
+            delays.append(notification.next_attempt_at - started)
+
+            # Not due again until the backoff has passed
+            self.assertEqual(self.process()['PENDING'], 0)
+            self.make_due()
+
+        self.assertAlmostEqual(delays[0].total_seconds(), 60, delta=5)
+        self.assertAlmostEqual(delays[1].total_seconds(), 120, delta=5)
+
+        self.assertEqual(self.process()['SENT'], 1)
+        notification = Notification.objects.get()
+        self.assertEqual((notification.status, notification.attempts), ('SENT', 3))
+        self.assertEqual(notification.last_error, '')
+        self.assertEqual(len(self.sms.sent), 1)
+
+    def test_dead_lettered_after_max_attempts(self):
+        self.sms.failures = 10
+
+        for _ in range(2):
+            self.process()
+            self.make_due()
+        self.assertEqual(self.process()['DEAD'], 1)
+
+        notification = Notification.objects.get()
+        self.assertEqual((notification.status, notification.attempts), ('DEAD', 3))
+        self.assertEqual(notification.last_error, 'Twilio unavailable')
+
+        # Dead letters are never picked up again
+        self.make_due()
+        self.assertEqual(sum(self.process().values()), 0)
+        self.assertEqual(self.sms.failures, 7)
+
+    def test_expired_lease_is_claimed_again(self):
+        """A message left SENDING by a crashed worker is retried."""
+        claimed = NotificationService.claim_batch(10, lease_seconds=300)
+        self.assertEqual([n.status for n in claimed], ['SENDING'])
+        self.assertEqual(NotificationService.claim_batch(10), [])
+
+        Notification.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.process()['SENT'], 1)
+
+
+class FakeSMTP:
+    """Stands in for smtplib.SMTP, counting the sessions opened."""
+    sessions = 0
+    sent = []
+    fail_for = set()
+
+    def __init__(self, host, port, **kwargs):
+        FakeSMTP.sessions += 1
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        if set(to_addrs) & self.fail_for:
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        FakeSMTP.sent.append(to_addrs)
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    EMAIL_HOST='smtp.example.com', EMAIL_PORT=25, EMAIL_USE_TLS=False,
+    EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+    METRICS_ENABLED=False,
+)
+class SMTPConnectionTests(TestCase):
+    """send_batch() delivers a batch of emails over one SMTP session."""
+
+    def setUp(self):
+        FakeSMTP.sessions = 0
+        FakeSMTP.sent = []
+        FakeSMTP.fail_for = set()
+        patch = mock.patch('django.core.mail.backends.smtp.smtplib.SMTP', FakeSMTP)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def emails(self, count):
+        return [Notification(channel='EMAIL', recipient=f'tenant{i}@example.com',
+                             subject='Rent', body='Rent is due')
+                for i in range(count)]
+
+    def test_batch_reuses_one_connection(self):
+        results = NotificationService.send_batch(self.emails(5))
+
+        self.assertEqual([error for _, error in results], [None] * 5)
+        self.assertEqual(len(FakeSMTP.sent), 5)
+        self.assertEqual(FakeSMTP.sessions, 1)
+
+    def test_connection_is_reopened_after_a_failure(self):
+        FakeSMTP.fail_for = {'tenant1@example.com'}
+
+        results = NotificationService.send_batch(self.emails(5))
+
+        errors = [error for _, error in results]
+        self.assertIsInstance(errors[1], smtplib.SMTPServerDisconnected)
+        self.assertEqual(errors[:1] + errors[2:], [None] * 4)
+        self.assertEqual(len(FakeSMTP.sent), 4)
+        # One session before the failure and one shared by the rest
+        self.assertEqual(FakeSMTP.sessions, 2)
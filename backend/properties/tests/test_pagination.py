@@ -0,0 +1,116 @@
+"""
+Opt-in keyset pagination: page boundaries over tied sort keys, walking
+back with the previous cursor, and the page-number default
+"""
+from datetime import date, datetime, timezone as dt_timezone
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APITestCase
+from properties.models import ActivityLog, Payment
+from properties.pagination import KeysetPagination
+from properties.tests import create_tenant
+
+
+@override_settings(METRICS_ENABLED=False)
+class KeysetPaginationTests(APITestCase):
+    PAGE_SIZE = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        tenant = create_tenant()
+        # Three dates with four payments each, all created at one instant,
+        # so only the id breaks ties inside a date
+        Payment.objects.bulk_create(
+            Payment(tenant=tenant, payment_type='PAYMENT', amount=100 + i,
+                    payment_method='CASH', transaction_date=date(2026, 1, 1 + i % 3),
+                    description=f'Payment {i}')
+            for i in range(12)
+        )
+        Payment.objects.update(created_at=datetime(2026, 1, 1, tzinfo=dt_timezone.utc))
+        moment = datetime(2026, 1, 1, 12, tzinfo=dt_timezone.utc)
+        ActivityLog.objects.bulk_create(
+            ActivityLog(action='UPDATE', model_name='Tenant', object_id=tenant.pk,
+                        description=f'Change {i}', timestamp=moment)
+            for i in range(7)
+        )
+        cls.user = User.objects.create_superuser('staff', 'staff@example.com', 'pw')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        patch = mock.patch.object(KeysetPagination, 'page_size', self.PAGE_SIZE)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def walk(self, url, link='next', **params):
+        """Follow `link` from the first page; return each page's ids."""
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append([row['id'] for row in response.data['results']])
+            if not response.data[link]:
+                return pages, response
+            response = self.client.get(response.data[link])
+
+    def expected_payment_ids(self):
+        return list(Payment.objects.order_by(
+            '-transaction_date', '-created_at', '-id').values_list('id', flat=True))
+
+    def test_pages_split_ties_without_gaps_or_repeats(self):
+        pages, last = self.walk('/api/payments/', pagination='cursor')
+
+        self.assertEqual([row for page in pages for row in page],
+                         self.expected_payment_ids())
+        self.assertTrue(all(len(page) == self.PAGE_SIZE for page in pages))
+        self.assertNotIn('count', last.data)
+        self.assertIsNone(last.data['next'])
+
+    def test_previous_cursor_walks_back(self):
+        forward, last = self.walk('/api/payments/', pagination='cursor')
+
+        backward = [[row['id'] for row in last.data['results']]]
+        response = last
+        while response.data['previous']:
+            response = self.client.get(response.data['previous'])
+            self.assertEqual(response.status_code, 200)
+            backward.append([row['id'] for row in response.data['results']])
+
+        self.assertEqual(backward, forward[::-1])
+        self.assertIsNone(response.data['previous'])
+
+    def test_deep_page_costs_the_same_as_the_first(self):
+        def queries(url, params=None):
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            return len(captured), response
+
+        first, response = queries('/api/payments/', {'pagination': 'cursor'})
+        for _ in range(2):
+            deep, response = queries(response.data['next'])
+        self.assertEqual(deep, first)
+
+    def test_activity_logs_with_equal_timestamps(self):
+        pages, _ = self.walk('/api/activity-logs/', pagination='cursor')
+
+        self.assertEqual(
+            [row for page in pages for row in page],
+            list(ActivityLog.objects.order_by('-timestamp', '-id')
+                 .values_list('id', flat=True)))
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+    @mock.patch.object(PageNumberPagination, 'page_size', 5)
+    def test_page_numbers_stay_the_default(self):
+        response = self.client.get('/api/payments/')
+
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIn('page=2', response.data['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/payments/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,128 @@
+"""
+Importing payments from M-Pesa and bank statement uploads
+"""
+import io
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+from properties.models import Payment, TenantBalance
+from properties.payment_import import PaymentImporter
+from properties.tests import create_tenant
+
+STATEMENT = '''\
+MPESA FULL STATEMENT
+Customer Name:,Garden Court
+Receipt No.,Completion Time,Details,Transaction Status,Paid In,Withdrawn,Other Party Info,A/C No.
+QK1,2026-03-02 09:15:00,Pay Bill from Grace,Completed,"25,000.00",,254711111111 - Grace,12345601
+QK1,2026-03-02 09:15:00,Pay Bill from Grace,Completed,"25,000.00",,254711111111 - Grace,12345601
+QK2,2026-03-03 10:00:00,Pay Bill from Grace,Completed,5000,,0700000001 - Grace,
+QK3,2026-03-04 11:30:00,Pay Bill from Otieno,Completed,7000,,0799999999 - Otieno,ZZ-9
+QK0,2026-03-05 08:00:00,Pay Bill from Grace,Completed,1000,,0700000001 - Grace,12345601
+QK4,2026-03-05 12:00:00,Pay Bill from Grace,Failed,1000,,0700000001 - Grace,12345601
+QK5,05/13/2026,Pay Bill from Grace,Completed,1000,,0700000001 - Grace,12345601
+QK6,2026-03-06 12:00:00,Withdrawal,Completed,,500,0700000001 - Grace,
+'''
+
+
+@override_settings(METRICS_ENABLED=False)
+class PaymentImportEndpointTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant()
+        Payment.objects.create(
+            tenant=cls.tenant, payment_type='PAYMENT', amount=Decimal('1000.00'),
+            payment_method='MPESA', transaction_date=date(2026, 3, 5),
+            description='Rent Payment', reference_number='QK0')
+        cls.user = User.objects.create_superuser('staff', 'staff@example.com', 'pw')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content=STATEMENT, **data):
+        statement = SimpleUploadedFile('statement.csv', content.encode(), 'text/csv')
+        return self.client.post('/api/payments/import/', {'file': statement, **data},
+                                format='multipart')
+
+    def test_import(self):
+        response = self.upload()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['payment_method'], 'MPESA')
+        self.assertEqual(response.data['counts'], {
+            'imported': 2, 'duplicate': 2, 'unmatched': 1, 'invalid': 1, 'skipped': 2,
+        })
+        self.assertEqual(response.data['total_amount'], 30000.0)
+        statuses = {(row['line'], row['reference']): row['status']
+                    for row in response.data['rows']}
+        self.assertEqual(statuses[(4, 'QK1')], 'imported')
+        self.assertEqual(statuses[(5, 'QK1')], 'duplicate')
+        self.assertEqual(statuses[(6, 'QK2')], 'imported')
+        self.assertEqual(statuses[(7, 'QK3')], 'unmatched')
+        self.assertEqual(statuses[(8, 'QK0')], 'duplicate')
+
+        imported = Payment.objects.filter(reference_number__in=['QK1', 'QK2'])
+        self.assertEqual(imported.count(), 2)
+        self.assertEqual({payment.tenant_id for payment in imported}, {self.tenant.pk})
+        self.assertEqual(TenantBalance.objects.get(tenant=self.tenant).total_payments,
+                         Decimal('31000.00'))
+
+    def test_reimport_is_all_duplicates(self):
+        self.upload()
+        response = self.upload()
+
+        self.assertEqual(response.data['counts']['imported'], 0)
+        self.assertEqual(response.data['counts']['duplicate'], 4)
+        self.assertEqual(Payment.objects.count(), 3)
+
+    def test_dry_run(self):
+        response = self.upload(dry_run='true')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['dry_run'])
+        self.assertEqual(response.data['counts']['imported'], 2)
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_bad_uploads(self):
+        cases = [
+            ({}, 'file'),
+            ({'file': SimpleUploadedFile('x.csv', b'name,phone\nGrace,0700\n')}, 'header'),
+            ({'file': SimpleUploadedFile('x.csv', STATEMENT.encode()),
+              'payment_method': 'GOLD'}, 'payment_method'),
+        ]
+        for data, reason in cases:
+            with self.subTest(reason=reason):
+                response = self.client.post('/api/payments/import/', data,
+                                            format='multipart')
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(Payment.objects.count(), 1)
+
+
+class PaymentImporterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant()
+
+    def test_duplicates_across_batches(self):
+        run = PaymentImporter(batch_size=1).import_file(io.StringIO(STATEMENT))
+
+        self.assertEqual(run.counts['imported'], 3)
+        self.assertEqual(run.counts['duplicate'], 1)
+        self.assertEqual(Payment.objects.filter(reference_number='QK1').count(), 1)
+
+    def test_bank_statement_matches_unit_number(self):
+        statement = (
+            'Transaction Date,Narration,Credit,Reference No,Account\n'
+            '02/03/2026,EFT from Grace,"12,500.00",FT001,g-1\n'
+        )
+        run = PaymentImporter().import_file(io.BytesIO(statement.encode('utf-8-sig')))
+
+        self.assertEqual(run.payment_method, 'BANK_TRANSFER')
+        payment = Payment.objects.get(reference_number='FT001')
+        self.assertEqual(payment.tenant, self.tenant)
+        self.assertEqual(payment.amount, Decimal('12500.00'))
+        self.assertEqual(payment.transaction_date, date(2026, 3, 2))
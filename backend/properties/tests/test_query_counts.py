@@ -0,0 +1,133 @@
+"""
+Query counts of the list and report endpoints must not grow with the
+page size or the amount of data
+"""
+from contextlib import ExitStack
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.test import APITestCase
+from properties.models import Building, Payment, Tenant, Unit
+from properties.seeding import DatasetBuilder
+
+
+@override_settings(METRICS_ENABLED=False)
+class QueryCountTestCase(APITestCase):
+    """Endpoints over a small generated dataset, logged in as staff."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Four buildings of 17 units
+        DatasetBuilder(60, seed=7, months=3, as_of=date(2026, 1, 1),
+                       full_history=True).build()
+        cls.user = User.objects.create_superuser('staff', 'staff@example.com', 'pw')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, url, page_size=None, **params):
+        """Queries run by one GET of `url`, with an optional page size."""
+        with ExitStack() as stack:
+            if page_size is not None:
+                for pagination in (PageNumberPagination, CursorPagination):
+                    stack.enter_context(
+                        mock.patch.object(pagination, 'page_size', page_size))
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content[:200])
+        if page_size is not None:
+            self.assertEqual(len(response.data['results']), page_size,
+                             f'{url} has too few rows to fill the page')
+        return len(queries)
+
+    def assertConstantAcrossPageSizes(self, url, page_sizes=(2, 10), **params):
+        small, large = (self.count_queries(url, page_size=size, **params)
+                        for size in page_sizes)
+        self.assertEqual(
+            small, large,
+            f'{url} ran {small} queries for {page_sizes[0]} rows but '
+            f'{large} for {page_sizes[1]}')
+        return large
+
+
+class BuildingQueryCountTests(QueryCountTestCase):
+
+    def test_list(self):
+        self.assertConstantAcrossPageSizes('/api/buildings/', page_sizes=(1, 4))
+
+    def test_report_does_not_grow_with_units(self):
+        building = Building.objects.order_by('pk').first()
+        url = f'/api/buildings/{building.pk}/report/'
+        before = self.count_queries(url)
+
+        Unit.objects.bulk_create(
+            Unit(building=building, unit_number=f'X-{i}', monthly_rent=30000,
+                 bedrooms=1, bathrooms=1, status='VACANT')
+            for i in range(20)
+        )
+        self.assertEqual(self.count_queries(url), before)
+
+
+class UnitQueryCountTests(QueryCountTestCase):
+
+    def test_list(self):
+        self.assertConstantAcrossPageSizes('/api/units/')
+
+    def test_filtered_list(self):
+        building = Building.objects.order_by('pk').first()
+        self.assertConstantAcrossPageSizes('/api/units/', building=building.pk)
+
+
+class TenantQueryCountTests(QueryCountTestCase):
+
+    def test_list(self):
+        self.assertConstantAcrossPageSizes('/api/tenants/')
+
+    def test_active_list(self):
+        self.assertConstantAcrossPageSizes('/api/tenants/', active='true')
+
+
+class PaymentQueryCountTests(QueryCountTestCase):
+
+    def test_list(self):
+        self.assertConstantAcrossPageSizes('/api/payments/')
+
+    def test_keyset_list(self):
+        self.assertConstantAcrossPageSizes('/api/payments/', pagination='cursor')
+
+    def test_filtered_list(self):
+        self.assertConstantAcrossPageSizes('/api/payments/', payment_type='PAYMENT')
+
+
+class ReportQueryCountTests(QueryCountTestCase):
+
+    def test_aging(self):
+        self.assertConstantAcrossPageSizes('/api/reports/aging/')
+
+    def test_statement_does_not_grow_with_payments(self):
+        tenant = Tenant.objects.filter(move_out_date__isnull=True).order_by('pk').first()
+        url = f'/api/tenants/{tenant.pk}/statement/'
+        before = self.count_queries(url)
+
+        Payment.objects.bulk_create(
+            Payment(tenant=tenant, payment_type='PAYMENT', amount=Decimal('100.00'),
+                    payment_method='CASH', transaction_date=date(2025, 12, day),
+                    description='Part payment')
+            for day in range(1, 21)
+        )
+        self.assertEqual(self.count_queries(url), before)
+
+
+class ListQueryCountTests(QueryCountTestCase):
+    """Every other list endpoint with enough generated rows to page."""
+
+    def test_lists(self):
+        for url in ('/api/expenses/', '/api/maintenance/', '/api/leases/',
+                    '/api/utilities/', '/api/activity-logs/'):
+            with self.subTest(url=url):
+                self.assertConstantAcrossPageSizes(url)
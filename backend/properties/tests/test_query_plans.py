@@ -0,0 +1,40 @@
+"""
+The hot queries must keep using their indexes; explain_queries is the
+same check as a management command
+"""
+import io
+from datetime import date
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from properties.management.commands.explain_queries import hot_queries
+from properties.seeding import DatasetBuilder
+
+
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetBuilder(40, seed=11, months=3, as_of=date(2026, 1, 1),
+                       full_history=True).build()
+
+    def test_hot_queries_use_their_indexes(self):
+        for label, queryset, indexes in hot_queries():
+            with self.subTest(label):
+                plan = queryset.explain()
+                self.assertTrue(any(name in plan for name in indexes),
+                                f'{label} does not use {" or ".join(indexes)}:\n{plan}')
+
+    def test_command_passes(self):
+        out = io.StringIO()
+        call_command('explain_queries', stdout=out)
+        self.assertIn('All queries use their indexes', out.getvalue())
+
+    def test_command_fails_when_an_index_is_dropped(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX payment_list_order_idx')
+
+        out = io.StringIO()
+        with self.assertRaisesMessage(CommandError, '1 hot queries no longer use their index'):
+            call_command('explain_queries', stdout=out)
+        self.assertIn('✗ Payment list page', out.getvalue())
@@ -0,0 +1,61 @@
+"""
+Reconciling statement records against recorded payments
+"""
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from properties.models import Payment
+from properties.reconciliation import ExternalRecord, Reconciler
+from properties.tests import create_tenant
+
+
+class ReconcilerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant()
+
+    def pay(self, reference, day, amount='25000.00'):
+        return Payment.objects.create(
+            tenant=self.tenant, payment_type='PAYMENT', amount=Decimal(amount),
+            payment_method='MPESA', transaction_date=day,
+            description='Rent Payment', reference_number=reference)
+
+    def reconcile(self, records, **kwargs):
+        run = Reconciler(payment_method='MPESA', **kwargs).reconcile(records)
+        return run, {item.reference: item.status for item in run.items.all()}
+
+    def test_statuses(self):
+        self.pay('QA1', date(2026, 3, 2))
+        self.pay('QA2', date(2026, 3, 3), amount='20000.00')
+        self.pay('QA3', date(2026, 3, 4))
+
+        run, statuses = self.reconcile([
+            ExternalRecord(2, 'qa1', Decimal('25000.00'), date(2026, 3, 2)),
+            ExternalRecord(3, 'QA2', Decimal('25000.00'), date(2026, 3, 3)),
+            ExternalRecord(4, 'QA1', Decimal('25000.00'), date(2026, 3, 3)),
+            ExternalRecord(5, 'ZZ9', Decimal('1000.00'), date(2026, 3, 4)),
+        ], date_from=date(2026, 3, 1), date_to=date(2026, 3, 31))
+
+        self.assertEqual(statuses, {
+            'qa1': 'MATCHED', 'QA2': 'AMOUNT_MISMATCH', 'QA1': 'DUPLICATE',
+            'ZZ9': 'UNKNOWN', 'QA3': 'MISSING',
+        })
+        self.assertEqual(
+            (run.matched_count, run.mismatch_count, run.duplicate_count,
+             run.unknown_count, run.missing_count), (1, 1, 1, 1, 1))
+
+    def test_tolerance_margin_matches_but_is_not_missing(self):
+        # Recorded a day after the window closed, paid on its last day
+        self.pay('QB1', date(2026, 4, 1))
+        # Only in the margin, and nothing on the statement claims it
+        self.pay('QB2', date(2026, 2, 27))
+        # Inside the window and unclaimed
+        self.pay('QB3', date(2026, 3, 15))
+
+        run, statuses = self.reconcile([
+            ExternalRecord(2, 'QB1', Decimal('25000.00'), date(2026, 3, 31)),
+        ], date_from=date(2026, 3, 1), date_to=date(2026, 3, 31), date_tolerance=3)
+
+        self.assertEqual(statuses, {'QB1': 'MATCHED', 'QB3': 'MISSING'})
+        self.assertEqual(run.missing_count, 1)
@@ -0,0 +1,96 @@
+"""
+Full-text search index and the search endpoint
+"""
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+from properties.models import Payment, Tenant
+from properties.search import SearchIndex, search_terms
+from properties.tests import create_building, create_tenant
+
+
+class SearchIndexTests(TestCase):
+
+    def setUp(self):
+        self.tenant = create_tenant(first_name='Wanjiru', last_name='Kamau')
+
+    def tenant_ids(self, query):
+        return [pk for pk, _ in SearchIndex.search('tenants', search_terms(query))]
+
+    def test_insert_is_indexed(self):
+        self.assertEqual(self.tenant_ids('wanj'), [self.tenant.pk])
+        self.assertEqual(self.tenant_ids('Wanjiru Kam'), [self.tenant.pk])
+
+    def test_update_reindexes(self):
+        self.tenant.last_name = 'Otieno'
+        self.tenant.save()
+
+        self.assertEqual(self.tenant_ids('kamau'), [])
+        self.assertEqual(self.tenant_ids('otieno'), [self.tenant.pk])
+
+    def test_delete_unindexes(self):
+        self.tenant.delete()
+        self.assertEqual(self.tenant_ids('wanjiru'), [])
+
+    def test_bulk_writes_are_indexed(self):
+        Payment.objects.bulk_create([
+            Payment(tenant=self.tenant, payment_type='PAYMENT', amount=Decimal('100.00'),
+                    transaction_date=date(2026, 1, 5), reference_number=f'MPX{n}',
+                    description='Mpesa deposit')
+            for n in range(3)
+        ])
+        Tenant.objects.filter(pk=self.tenant.pk).update(first_name='Akinyi')
+
+        self.assertEqual(len(SearchIndex.search('payments', ['mpesa'])), 3)
+        self.assertEqual(self.tenant_ids('akinyi'), [self.tenant.pk])
+        self.assertEqual(self.tenant_ids('wanjiru'), [])
+
+    def test_whole_words_rank_first(self):
+        other = create_tenant(number=2, first_name='Wanjirugi')
+        self.assertEqual(self.tenant_ids('wanjiru'), [self.tenant.pk, other.pk])
+
+    def test_repair_restores_dropped_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER properties_tenant_fts_insert')
+
+        self.assertTrue(SearchIndex.repair(connection))
+        self.assertFalse(SearchIndex.repair(connection))
+        added = create_tenant(number=2, first_name='Njeri')
+        self.assertEqual(self.tenant_ids('njeri'), [added.pk])
+
+
+@override_settings(METRICS_ENABLED=False)
+class SearchEndpointTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.building = create_building(name='Kamau Heights')
+        cls.tenant = create_tenant(first_name='Wanjiru', last_name='Kamau')
+        cls.user = User.objects.create_superuser('staff', 'staff@example.com', 'pw')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_results_grouped_by_type(self):
+        response = self.client.get('/api/search/', {'q': 'kamau'})
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([row['id'] for row in results['tenants']], [self.tenant.pk])
+        self.assertEqual([row['id'] for row in results['buildings']], [self.building.pk])
+        self.assertEqual(results['tenants'][0]['type'], 'tenant')
+        self.assertEqual(response.data['count'], 2)
+
+    def test_type_filter(self):
+        response = self.client.get('/api/search/', {'q': 'kamau', 'type': 'tenants'})
+        self.assertEqual(list(response.data['results']), ['tenants'])
+
+    def test_bad_requests(self):
+        for params in ({'q': '  '}, {'q': 'kamau', 'type': 'leases'},
+                       {'q': 'kamau', 'limit': 'ten'}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/search/', params)
+                self.assertEqual(response.status_code, 400)
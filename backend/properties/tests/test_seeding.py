@@ -0,0 +1,115 @@
+"""
+Deterministic bulk seeding of sample data
+"""
+import io
+from datetime import date
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from properties.models import Building, Payment, Tenant, TenantBalance, Unit
+from properties.seeding import DatasetBuilder, parse_scale
+
+
+def snapshot():
+    """Every generated tenant and payment, without database ids."""
+    tenants = list(Tenant.objects.order_by('pk').values_list(
+        'first_name', 'last_name', 'email', 'unit__unit_number', 'move_in_date',
+        'move_out_date'))
+    payments = list(Payment.objects.order_by('pk').values_list(
+        'tenant__email', 'payment_type', 'amount', 'transaction_date', 'payment_method'))
+    return tenants, payments
+
+
+class ParseScaleTests(SimpleTestCase):
+
+    def test_scales(self):
+        for value, tenants in (('500', 500), ('10k', 10000), ('2.5K', 2500),
+                               (' 1m ', 1000000)):
+            with self.subTest(value=value):
+                self.assertEqual(parse_scale(value), tenants)
+
+    def test_invalid(self):
+        for value in ('', 'ten', '10x', '-5', '0'):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_scale(value)
+
+
+class DatasetBuilderTests(TestCase):
+
+    def build(self, tenants=12, seed=7, **options):
+        return DatasetBuilder(tenants, seed=seed, months=3, as_of=date(2026, 1, 1),
+                              **options).build()
+
+    def clear(self):
+        Payment.objects.all().delete()
+        Tenant.objects.all().delete()
+        Unit.objects.all().delete()
+        Building.objects.all().delete()
+
+    def test_same_seed_same_rows(self):
+        self.build()
+        first = snapshot()
+        self.clear()
+        self.build()
+
+        self.assertEqual(snapshot(), first)
+        self.clear()
+        self.build(seed=8)
+        self.assertNotEqual(snapshot(), first)
+
+    def test_counts_and_occupancy(self):
+        run = self.build()
+
+        self.assertEqual(run.counts['tenants'], Tenant.objects.count())
+        self.assertEqual(run.counts['payments'], Payment.objects.count())
+        self.assertEqual(run.counts['units'], Unit.objects.count())
+        active = Tenant.objects.filter(move_out_date__isnull=True)
+        self.assertEqual(active.count(), 12)
+        self.assertEqual(active.values('unit').distinct().count(), 12)
+        self.assertEqual(Unit.objects.filter(status='OCCUPIED').count(), 12)
+        self.assertFalse(Payment.objects.filter(transaction_date__gte=date(2026, 1, 1)).exists())
+
+    def test_ledgers_match_payments(self):
+        self.build(full_history=True)
+
+        self.assertEqual(TenantBalance.objects.count(), Tenant.objects.count())
+        totals = TenantBalance.compute_totals(Tenant.objects.values('id'))
+        for ledger in TenantBalance.objects.all():
+            expected = totals.get(ledger.tenant_id) or TenantBalance()
+            self.assertEqual(
+                (ledger.total_charges, ledger.total_payments, ledger.balance),
+                (expected.total_charges, expected.total_payments, expected.balance))
+
+    def test_bulk_inserts(self):
+        with CaptureQueriesContext(connection) as captured:
+            run = self.build(40, full_history=True)
+
+        inserts = [query['sql'] for query in captured if query['sql'].startswith('INSERT')]
+        tenant_inserts = [sql for sql in inserts if 'INTO "properties_tenant" ' in sql]
+        self.assertEqual(len(tenant_inserts), 1)
+        self.assertLess(len(captured), sum(run.counts.values()) / 20)
+
+
+class SeedDataCommandTests(TestCase):
+
+    def seed(self, **options):
+        out = io.StringIO()
+        call_command('seed_data', **{'scale': '15', 'years': 1, 'as_of': '2026-01',
+                                     **options}, stdout=out)
+        return out.getvalue()
+
+    def test_reseeding_replaces_data(self):
+        output = self.seed()
+        first = snapshot()
+        self.seed()
+
+        self.assertIn('Tenants: ', output)
+        self.assertEqual(snapshot(), first)
+        self.assertEqual(Tenant.objects.filter(move_out_date__isnull=True).count(), 15)
+
+    def test_invalid_options(self):
+        for options in ({'scale': 'lots'}, {'years': 0}, {'as_of': 'January'}):
+            with self.subTest(options=options), self.assertRaises(CommandError):
+                self.seed(**options)
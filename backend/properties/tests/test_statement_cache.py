@@ -0,0 +1,94 @@
+"""
+The on-disk cache of rendered statement PDFs
+"""
+import tempfile
+from datetime import date
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from properties.models import Payment
+from properties.statement_cache import StatementCache
+from properties.tests import create_tenant
+from properties.tests.test_pdf_generator import pdf_text
+
+
+class StatementCacheTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant()
+        Payment.objects.create(
+            tenant=cls.tenant, payment_type='CHARGE', amount=25000,
+            transaction_date=date(2025, 1, 1), billing_period=date(2025, 1, 1),
+            description='Rent for January 2025')
+        cls.user = User.objects.create_superuser('staff', 'staff@example.com', 'pw')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(STATEMENT_CACHE_DIR=directory.name,
+                                     METRICS_ENABLED=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client.force_authenticate(self.user)
+
+    def open_statement(self):
+        etag = StatementCache.fingerprint(self.tenant)
+        return StatementCache.open(self.tenant, etag)
+
+    def test_render_then_serve_from_disk(self):
+        with self.open_statement() as rendered:
+            pdf = rendered.read()
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertEqual(len(list(StatementCache.directory().glob('*.pdf'))), 1)
+
+        with self.open_statement() as cached:
+            self.assertTrue(hasattr(cached, 'name'))
+            self.assertEqual(cached.read(), pdf)
+
+    def test_rendered_again_the_next_day(self):
+        renders = {}
+        for day in (date(2026, 3, 1), date(2026, 3, 1), date(2026, 3, 2)):
+            with mock.patch.object(timezone, 'localdate', return_value=day):
+                etag = StatementCache.fingerprint(self.tenant)
+                with StatementCache.open(self.tenant, etag) as statement:
+                    renders.setdefault(etag, statement.read())
+
+        self.assertEqual(len(renders), 2)
+        first, second = renders.values()
+        self.assertIn(b'Generated on 2026-03-01)', pdf_text(first))
+        self.assertIn(b'Generated on 2026-03-02)', pdf_text(second))
+        self.assertEqual(len(list(StatementCache.directory().glob('*.pdf'))), 1)
+
+    def test_download_revalidates(self):
+        url = f'/api/tenants/{self.tenant.pk}/statement_pdf/'
+        response = self.client.get(url)
+        response.close()
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+        self.tenant.payments.all().delete()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        changed.close()
+        self.assertEqual(changed.status_code, 200)
+
+    def test_cached_file_evicted_after_opening_is_still_served(self):
+        self.open_statement().close()
+
+        with self.open_statement() as cached:
+            self.assertEqual(StatementCache.evict(max_bytes=0), 1)
+            self.assertTrue(cached.read().startswith(b'%PDF'))
+
+    def test_download_after_eviction(self):
+        url = f'/api/tenants/{self.tenant.pk}/statement_pdf/'
+        for _ in range(2):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+            response.close()
+            StatementCache.evict(max_bytes=0)
@@ -0,0 +1,78 @@
+"""
+Cursor-paged tenant statements
+"""
+from datetime import date
+from decimal import Decimal
+from urllib.parse import parse_qs, urlsplit
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from properties.models import Payment
+from properties.tests import create_building, create_tenant, create_unit
+
+
+@override_settings(METRICS_ENABLED=False)
+class StatementCursorTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        building = create_building(total_units=2)
+        cls.tenants = []
+        for number in (1, 2):
+            tenant = create_tenant(
+                create_unit(building, unit_number=f'G-{number}'), number=number)
+            for month in range(1, 7):
+                Payment.objects.create(
+                    tenant=tenant, payment_type='CHARGE', amount=25000,
+                    transaction_date=date(2025, month, 1),
+                    billing_period=date(2025, month, 1),
+                    description=f'Rent for {date(2025, month, 1):%B %Y}')
+                Payment.objects.create(
+                    tenant=tenant, payment_type='PAYMENT', amount=20000,
+                    payment_method='MPESA', transaction_date=date(2025, month, 5),
+                    description='Rent Payment')
+            cls.tenants.append(tenant)
+        cls.user = User.objects.create_superuser('staff', 'staff@example.com', 'pw')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def statement(self, tenant, **params):
+        return self.client.get(f'/api/tenants/{tenant.pk}/statement/',
+                               {'page_size': 2, **params})
+
+    def first_cursor(self, tenant, **params):
+        response = self.statement(tenant, **params)
+        self.assertEqual(response.status_code, 200)
+        return parse_qs(urlsplit(response.data['next']).query)['cursor'][0]
+
+    def test_pages_cover_the_period(self):
+        tenant = self.tenants[0]
+        params = {'start_date': '2025-02-01', 'end_date': '2025-05-31'}
+        rows = []
+        response = self.statement(tenant, **params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            rows.extend(response.data['transactions'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(Decimal(rows[-1]['running_balance']),
+                         Decimal(response.data['closing_balance']))
+
+    def test_cursor_rejected_for_another_end_date(self):
+        tenant = self.tenants[0]
+        cursor = self.first_cursor(tenant, end_date='2025-03-31')
+
+        response = self.statement(tenant, end_date='2025-05-31', cursor=cursor)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'Cursor belongs to a different period')
+
+    def test_cursor_rejected_for_another_tenant(self):
+        cursor = self.first_cursor(self.tenants[0])
+
+        response = self.statement(self.tenants[1], cursor=cursor)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'Cursor belongs to a different tenant')
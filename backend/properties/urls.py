@@ -4,7 +4,8 @@ from .views import (
     BuildingViewSet, UnitViewSet, TenantViewSet, PaymentViewSet,
     ExpenseViewSet, MaintenanceRequestViewSet, DocumentViewSet,
     LeaseViewSet, ActivityLogViewSet, UserViewSet, UserProfileViewSet,
-    UtilityViewSet, PropertyPhotoViewSet
+    UtilityViewSet, PropertyPhotoViewSet, DashboardViewSet, ReportViewSet,
+    SearchViewSet, ReconciliationRunViewSet, metrics_view
 )
 from .auth_views import login_view, logout_view, current_user, signup_view, csrf_token_view
 
@@ -21,10 +22,15 @@ router.register(r'documents', DocumentViewSet)
 router.register(r'leases', LeaseViewSet)
 router.register(r'activity-logs', ActivityLogViewSet)
 router.register(r'utilities', UtilityViewSet)
+router.register(r'reconciliations', ReconciliationRunViewSet)
 router.register(r'photos', PropertyPhotoViewSet)
+router.register(r'dashboard', DashboardViewSet, basename='dashboard')
+router.register(r'reports', ReportViewSet, basename='reports')
+router.register(r'search', SearchViewSet, basename='search')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('_metrics', metrics_view, name='metrics'),
     path('auth/csrf/', csrf_token_view, name='csrf'),
     path('auth/login/', login_view, name='login'),
     path('auth/signup/', signup_view, name='signup'),
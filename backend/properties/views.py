@@ -1,34 +1,181 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from rest_framework.renderers import BaseRenderer
-from django.db.models import Sum, Q
+from rest_framework.utils.urls import replace_query_param
+from django.db import transaction
+from django.db.models import Sum, Min, Q
 from django.contrib.auth.models import User
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from datetime import datetime
-from .models import Building, Unit, Tenant, Payment, Expense, MaintenanceRequest, Document, Lease, ActivityLog, UserProfile, Utility, PropertyPhoto
+from decimal import Decimal
+from .models import Building, Unit, Tenant, TenantBalance, TenantAging, Payment, Expense, MaintenanceRequest, Document, Lease, ActivityLog, UserProfile, Utility, PropertyPhoto, ReconciliationRun
+from .audit import log_activity
+from .billing import RentBilling, parse_billing_period
+from .dashboard import get_dashboard_summary
+from .metrics import get_store
+from .mixins import RelatedLoadingMixin, ConditionalGetMixin, ExportMixin
+from .notifications import NotificationService
+from .pagination import OptionalKeysetPagination
+from .payment_import import PaymentImporter, ImportFormatError
+from .reconciliation import Reconciler, read_records
+from .renderers import PassthroughRenderer
+from .search import SearchIndex, search_terms
 from .serializers import (
     BuildingSerializer, UnitSerializer, TenantSerializer,
     PaymentSerializer, TenantStatementSerializer, BuildingReportSerializer,
     ExpenseSerializer, MaintenanceRequestSerializer, DocumentSerializer,
     LeaseSerializer, ActivityLogSerializer, UserSerializer, UserProfileSerializer,
-    UtilitySerializer, PropertyPhotoSerializer
+    UtilitySerializer, PropertyPhotoSerializer, TenantAgingSerializer,
+    ReconciliationRunSerializer, ReconciliationItemSerializer
+)
+from .statement_cache import StatementCache
+from .statements import (
+    TenantStatement, InvalidCursor, parse_statement_period, MAX_PAGE_SIZE
 )
 
 
-class PassthroughRenderer(BaseRenderer):
+class DashboardViewSet(viewsets.ViewSet):
     """
-    Return data as-is. Used for binary responses like PDFs.
+    API endpoint for dashboard aggregates.
     """
-    media_type = '*/*'
-    format = None
 
-    def render(self, data, accepted_media_type=None, renderer_context=None):
-        return data
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """
+        Occupancy, income, pending balances, per-building unit counts and
+        recent transactions in a single cached response.
+        """
+        return Response(get_dashboard_summary())
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class ReportViewSet(RelatedLoadingMixin, viewsets.GenericViewSet):
+    """
+    API endpoint for portfolio-wide reports.
+    """
+    queryset = TenantAging.objects.all()
+    serializer_class = TenantAgingSerializer
+
+    @action(detail=False, methods=['get'])
+    def aging(self, request):
+        """
+        Accounts-receivable aging of active tenants who owe rent, oldest debt
+        first, with portfolio bucket totals. Reads the precomputed
+        TenantAging rows; optional `building` filter.
+        """
+        queryset = self.get_queryset().filter(
+            tenant__move_out_date__isnull=True,
+            total_due__gt=0
+        )
+        building_id = request.query_params.get('building')
+        if building_id:
+            queryset = queryset.filter(tenant__unit__building_id=building_id)
+
+        totals = queryset.aggregate(
+            **{bucket: Sum(bucket) for bucket in TenantAging.BUCKETS},
+            total_due=Sum('total_due'),
+            as_of=Min('as_of')
+        )
+        summary = {
+            key: value if key == 'as_of' else value or Decimal('0.00')
+            for key, value in totals.items()
+        }
+
+        queryset = queryset.order_by('oldest_unpaid_date', 'tenant_id')
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(
+                self.get_serializer(page, many=True).data)
+            response.data['totals'] = summary
+            return response
+
+        return Response({
+            'totals': summary,
+            'results': self.get_serializer(queryset, many=True).data
+        })
+
+
+class SearchViewSet(viewsets.ViewSet):
+    """
+    API endpoint for searching buildings, units, tenants and payments.
+    """
+    MAX_LIMIT = 50
+
+    def get_kinds(self):
+        """kind -> (queryset, serializer class) for building the results."""
+        return {
+            'buildings': (Building.objects.with_stats(), BuildingSerializer),
+            'units': (Unit.objects.select_related('building').with_current_tenant(),
+                      UnitSerializer),
+            'tenants': (Tenant.objects.select_related('unit__building', 'ledger'),
+                        TenantSerializer),
+            'payments': (Payment.objects.select_related('tenant__unit__building'),
+                         PaymentSerializer),
+        }
+
+    def list(self, request):
+        """
+        Ranked matches for `q` (or `search`) grouped by type. Every word must
+        match the start of a word in a name, email, phone, ID number, unit
+        number, address, payment reference or description. Optional `type`
+        (comma-separated, e.g. `tenants,payments`) and `limit` per type.
+        """
+        query = request.query_params.get('q') or request.query_params.get('search', '')
+        terms = search_terms(query)
+        if not terms:
+            return Response(
+                {'error': 'q must contain at least one word'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        kinds = self.get_kinds()
+        requested = request.query_params.get('type')
+        if requested:
+            requested = [kind.strip() for kind in requested.split(',')]
+            unknown = [kind for kind in requested if kind not in kinds]
+            if unknown:
+                return Response(
+                    {'error': f'Unknown type: {", ".join(unknown)}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            requested = list(kinds)
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), self.MAX_LIMIT)
+        except ValueError:
+            return Response(
+                {'error': 'limit must be a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = {}
+        for kind in requested:
+            queryset, serializer_class = kinds[kind]
+            matches = SearchIndex.search(kind, terms, limit)
+            objects = queryset.in_bulk([pk for pk, _ in matches])
+
+            rows = []
+            for pk, score in matches:
+                if pk not in objects:
+                    continue
+                data = serializer_class(objects[pk], context={'request': request}).data
+                data['type'] = kind[:-1]
+                data['score'] = round(score, 4)
+                rows.append(data)
+            results[kind] = rows
+
+        return Response({
+            'query': query,
+            'count': sum(len(rows) for rows in results.values()),
+            'results': results,
+        })
+
+
+class UserViewSet(RelatedLoadingMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing users and profiles.
     """
@@ -43,7 +190,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class UserProfileViewSet(viewsets.ModelViewSet):
+class UserProfileViewSet(RelatedLoadingMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing user profiles.
     """
@@ -53,12 +200,14 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     filterset_fields = ['role']
 
 
-class BuildingViewSet(viewsets.ModelViewSet):
+class BuildingViewSet(RelatedLoadingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing buildings.
     """
-    queryset = Building.objects.all()
+    queryset = Building.objects.with_stats().order_by('name')
     serializer_class = BuildingSerializer
+    # Occupancy and income stats come from the units
+    conditional_related = ['units']
 
     @action(detail=True, methods=['get'])
     def report(self, request, pk=None):
@@ -66,26 +215,17 @@ class BuildingViewSet(viewsets.ModelViewSet):
         Generate a comprehensive financial report for a building.
         """
         building = self.get_object()
-        units = building.units.all()
-
-        # Calculate actual income collected (payments received)
-        actual_income = Payment.objects.filter(
-            tenant__unit__building=building,
-            payment_type='PAYMENT'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        # Calculate outstanding balance
-        total_charges = Payment.objects.filter(
-            tenant__unit__building=building,
-            payment_type='CHARGE'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        total_payments = Payment.objects.filter(
-            tenant__unit__building=building,
-            payment_type='PAYMENT'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        outstanding_balance = total_charges - total_payments
+        units = building.units.with_current_tenant()
+
+        # Income collected and outstanding balance from the tenant ledgers
+        totals = TenantBalance.objects.filter(
+            tenant__unit__building=building
+        ).aggregate(
+            total_charges=Sum('total_charges'),
+            total_payments=Sum('total_payments')
+        )
+        actual_income = totals['total_payments'] or 0
+        outstanding_balance = (totals['total_charges'] or 0) - actual_income
 
         report_data = {
             'building': building,
@@ -103,15 +243,16 @@ class BuildingViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class UnitViewSet(viewsets.ModelViewSet):
+class UnitViewSet(RelatedLoadingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing units.
     """
     queryset = Unit.objects.all()
     serializer_class = UnitSerializer
+    conditional_related = ['building', 'tenants']
 
     def get_queryset(self):
-        queryset = Unit.objects.all()
+        queryset = super().get_queryset().with_current_tenant()
 
         # Filter by building if provided
         building_id = self.request.query_params.get('building', None)
@@ -126,15 +267,32 @@ class UnitViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class TenantViewSet(viewsets.ModelViewSet):
+class TenantViewSet(RelatedLoadingMixin, ConditionalGetMixin, ExportMixin,
+                    viewsets.ModelViewSet):
     """
     API endpoint for managing tenants.
     """
     queryset = Tenant.objects.all()
     serializer_class = TenantSerializer
+    select_related_fields = ['ledger']
+    conditional_related = ['unit', 'unit__building', 'ledger']
+    export_columns = (
+        ('ID', 'id'),
+        ('Name', 'full_name'),
+        ('Email', 'email'),
+        ('Phone', 'phone'),
+        ('ID Number', 'id_number'),
+        ('Building', 'unit.building.name'),
+        ('Unit', 'unit.unit_number'),
+        ('Monthly Rent', 'unit.monthly_rent'),
+        ('Deposit', 'deposit_amount'),
+        ('Move In', 'move_in_date'),
+        ('Move Out', 'move_out_date'),
+        ('Balance', 'total_balance'),
+    )
 
     def get_queryset(self):
-        queryset = Tenant.objects.all()
+        queryset = super().get_queryset()
 
         # Filter active tenants only if requested
         active_only = self.request.query_params.get('active', None)
@@ -151,25 +309,44 @@ class TenantViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def statement(self, request, pk=None):
         """
-        Generate a statement for a tenant showing all charges and payments.
+        A tenant's statement with a running balance on every transaction,
+        optionally limited to `start_date` / `end_date` (YYYY-MM-DD).
+        Transactions are served oldest first, `page_size` at a time; follow
+        `next` (a cursor link) for the following page.
         """
         tenant = self.get_object()
-        transactions = tenant.payments.all().order_by('transaction_date', 'created_at')
+        try:
+            start_date, end_date = parse_statement_period(request.query_params)
+            page_size = min(int(request.query_params.get(
+                'page_size', self.paginator.page_size)), MAX_PAGE_SIZE)
+        except ValueError:
+            return Response(
+                {'error': 'start_date/end_date must be YYYY-MM-DD and page_size a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        total_charges = tenant.payments.filter(
-            payment_type='CHARGE'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        statement = TenantStatement(tenant, start_date, end_date)
+        try:
+            transactions, cursor = statement.page(
+                request.query_params.get('cursor'), max(page_size, 1))
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        total_payments = tenant.payments.filter(
-            payment_type='PAYMENT'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        opening_balance = statement.opening_balance
+        total_charges, total_payments = statement.totals()
 
         statement_data = {
             'tenant': tenant,
-            'transactions': transactions,
+            'start_date': start_date,
+            'end_date': end_date,
+            'opening_balance': opening_balance,
             'total_charges': total_charges,
             'total_payments': total_payments,
-            'current_balance': total_charges - total_payments
+            'closing_balance': opening_balance + total_charges - total_payments,
+            'current_balance': tenant.total_balance,
+            'next': replace_query_param(
+                request.build_absolute_uri(), 'cursor', cursor) if cursor else None,
+            'transactions': transactions,
         }
 
         serializer = TenantStatementSerializer(statement_data)
@@ -178,49 +355,77 @@ class TenantViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'], renderer_classes=[PassthroughRenderer])
     def statement_pdf(self, request, pk=None):
         """
-        Generate and download a PDF statement for a tenant
+        Download a PDF statement for a tenant, optionally limited to a
+        period with `start_date` / `end_date` (YYYY-MM-DD). The rendered file
+        is cached until the tenant's ledger changes, and repeat downloads are
+        answered with 304 Not Modified via the ETag.
         """
-        from .pdf_generator import PDFGenerator
-
         tenant = self.get_object()
-        transactions = tenant.payments.all().order_by('transaction_date', 'created_at')
+        try:
+            start_date, end_date = parse_statement_period(request.query_params)
+        except ValueError:
+            # The PDF renderer can't encode an error body, so answer in JSON
+            return JsonResponse(
+                {'error': 'start_date and end_date must be YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Generate PDF
-        pdf = PDFGenerator.generate_tenant_statement(tenant, transactions)
+        etag = StatementCache.fingerprint(tenant, start_date, end_date)
 
-        # Create response
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response[
-            'Content-Disposition'] = f'attachment; filename="statement_{tenant.full_name.replace(" ", "_")}_{datetime.now().strftime("%Y%m%d")}.pdf"'
+        not_modified = get_conditional_response(request, etag=quote_etag(etag))
+        if not_modified is not None:
+            not_modified['ETag'] = quote_etag(etag)
+            return not_modified
 
+        statement = StatementCache.open(tenant, etag, start_date, end_date)
+        response = FileResponse(
+            statement,
+            as_attachment=True,
+            filename=f'statement_{tenant.full_name.replace(" ", "_")}_{datetime.now().strftime("%Y%m%d")}.pdf',
+            content_type='application/pdf'
+        )
+        response['ETag'] = quote_etag(etag)
         return response
 
     @action(detail=True, methods=['post'])
     def charge_rent(self, request, pk=None):
         """
-        Create a rent charge for this tenant.
+        Create a rent charge for this tenant for `month` (e.g. "January
+        2026", default: the current month). A tenant is charged once per
+        month, here or by the bulk charge.
         """
         tenant = self.get_object()
 
         # Get the amount (default to unit's monthly rent)
-        amount = request.data.get('amount', tenant.unit.monthly_rent)
-        description = request.data.get(
-            'description', f'Rent for {datetime.now().strftime("%B %Y")}')
+        amount = Decimal(str(request.data.get('amount', tenant.unit.monthly_rent)))
+        month_str = request.data.get('month', datetime.now().strftime('%B %Y'))
         transaction_date = request.data.get(
             'transaction_date', datetime.now().date())
 
-        payment = Payment.objects.create(
-            tenant=tenant,
-            payment_type='CHARGE',
-            amount=amount,
-            transaction_date=transaction_date,
-            description=description
-        )
+        try:
+            parse_billing_period(month_str)
+        except ValueError:
+            return Response(
+                {'error': f'Invalid month "{month_str}". Use e.g. "January 2026".'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            payment = RentBilling.charge_tenant(
+                tenant, month_str,
+                amount=amount,
+                description=request.data.get('description'),
+                transaction_date=transaction_date
+            )
+            if payment is None:
+                return Response(
+                    {'error': f'{tenant.full_name} has already been charged rent for {month_str}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-        # Send notification
-        from .notifications import NotificationService
-        month_str = datetime.now().strftime("%B %Y")
-        NotificationService.notify_rent_charged(tenant, amount, month_str)
+            # Queue notification
+            NotificationService.notify_rent_charged(
+                tenant, amount, payment.billing_period.strftime('%B %Y'))
 
         serializer = PaymentSerializer(payment)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -253,9 +458,10 @@ class TenantViewSet(viewsets.ModelViewSet):
             lease.save()
 
         # Log the activity
-        ActivityLog.objects.create(
-            action='Tenant moved out',
-            description=f'{tenant.full_name} moved out from {tenant.unit}'
+        log_activity(
+            'UPDATE', 'Tenant',
+            f'{tenant.full_name} moved out from {tenant.unit}',
+            object_id=tenant.pk, request=request,
         )
 
         serializer = self.get_serializer(tenant)
@@ -265,28 +471,43 @@ class TenantViewSet(viewsets.ModelViewSet):
         })
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(RelatedLoadingMixin, ExportMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing payments and charges.
     """
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
+    pagination_class = OptionalKeysetPagination
+    keyset_ordering = ('-transaction_date', '-created_at', '-id')
+    export_columns = (
+        ('ID', 'id'),
+        ('Date', 'transaction_date'),
+        ('Type', 'get_payment_type_display'),
+        ('Tenant', 'tenant.full_name'),
+        ('Building', 'tenant.unit.building.name'),
+        ('Unit', 'tenant.unit.unit_number'),
+        ('Amount', 'amount'),
+        ('Method', 'get_payment_method_display'),
+        ('Reference', 'reference_number'),
+        ('Billing Period', 'billing_period'),
+        ('Description', 'description'),
+    )
 
     def perform_create(self, serializer):
-        """Override to send notifications when payments are created"""
-        payment = serializer.save()
-
-        # Send notification for payment receipts
-        if payment.payment_type == 'PAYMENT':
-            from .notifications import NotificationService
-            NotificationService.notify_payment_received(
-                tenant=payment.tenant,
-                amount=payment.amount,
-                payment_date=payment.transaction_date
-            )
+        """Override to queue notifications when payments are created"""
+        with transaction.atomic():
+            payment = serializer.save()
+
+            # Queue notification for payment receipts
+            if payment.payment_type == 'PAYMENT':
+                NotificationService.notify_payment_received(
+                    tenant=payment.tenant,
+                    amount=payment.amount,
+                    payment_date=payment.transaction_date
+                )
 
     def get_queryset(self):
-        queryset = Payment.objects.all()
+        queryset = super().get_queryset()
 
         # Filter by tenant if provided
         tenant_id = self.request.query_params.get('tenant', None)
@@ -315,7 +536,6 @@ class PaymentViewSet(viewsets.ModelViewSet):
         Charge rent to all active tenants for the current month.
         """
         from django.utils import timezone
-        from .notifications import NotificationService
 
         month_str = request.data.get('month', timezone.now().strftime('%B %Y'))
         send_notifications = request.data.get('send_notifications', True)
@@ -329,64 +549,169 @@ class PaymentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        charged_count = 0
-        skipped_count = 0
-        total_amount = 0
-        errors = []
-
-        for tenant in active_tenants:
-            # Check if already charged for this month
-            existing_charge = Payment.objects.filter(
-                tenant=tenant,
-                payment_type='CHARGE',
-                description__icontains=month_str
-            ).exists()
-
-            if existing_charge:
-                skipped_count += 1
-                continue
-
-            try:
-                rent_amount = tenant.unit.monthly_rent
-                Payment.objects.create(
-                    tenant=tenant,
-                    payment_type='CHARGE',
-                    amount=rent_amount,
-                    transaction_date=timezone.now().date(),
-                    description=f'Rent for {month_str}',
-                    notes=f'Auto-generated rent charge'
-                )
-                charged_count += 1
-                total_amount += rent_amount
+        try:
+            parse_billing_period(month_str)
+        except ValueError:
+            return Response(
+                {'error': f'Invalid month "{month_str}". Use e.g. "January 2026".'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-                # Send notification
-                if send_notifications:
-                    NotificationService.notify_rent_charged(
-                        tenant, rent_amount, month_str)
+        with transaction.atomic():
+            run = RentBilling.charge_month(month_str, tenants=active_tenants)
 
-            except Exception as e:
-                errors.append(f'{tenant.full_name}: {str(e)}')
+            # Queue notifications alongside the charges
+            if send_notifications:
+                NotificationService.enqueue(
+                    NotificationService.rent_charged_bulk(run.charges, run.month))
 
         return Response({
             'success': True,
-            'month': month_str,
-            'charged': charged_count,
-            'skipped': skipped_count,
-            'total_amount': float(total_amount),
+            'month': run.month,
+            'charged': len(run.charges),
+            'skipped': len(run.skipped),
+            'total_amount': float(run.total_amount),
             'notifications_sent': send_notifications,
-            'errors': errors
+            'errors': []
         }, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'], url_path='import',
+            parser_classes=[MultiPartParser])
+    def import_statement(self, request):
+        """
+        Import payments from an uploaded M-Pesa or bank statement CSV
+        (`file`). Optional `payment_method` (detected from the header
+        otherwise), `dry_run` and `send_notifications`. Returns totals and
+        the outcome of every line.
+        """
+        statement = request.FILES.get('file')
+        if statement is None:
+            return Response(
+                {'error': 'Upload the statement CSV as "file"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        payment_method = request.data.get('payment_method') or None
+        methods = [code for code, _ in Payment.PAYMENT_METHOD_CHOICES]
+        if payment_method and payment_method not in methods:
+            return Response(
+                {'error': f'payment_method must be one of {", ".join(methods)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        importer = PaymentImporter(
+            payment_method=payment_method,
+            dry_run=request.data.get('dry_run') in ('true', 'True', '1'),
+            send_notifications=request.data.get('send_notifications') in ('true', 'True', '1'),
+        )
+        try:
+            run = importer.import_file(statement, filename=statement.name)
+        except ImportFormatError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'dry_run': run.dry_run,
+            'payment_method': run.payment_method,
+            'counts': run.counts,
+            'total_amount': float(run.total_amount),
+            'rows': [row.as_dict() for row in run.rows],
+        }, status=status.HTTP_200_OK if run.dry_run else status.HTTP_201_CREATED)
+
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ReconciliationRunViewSet(RelatedLoadingMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for payment reconciliation runs.
+    """
+    queryset = ReconciliationRun.objects.all()
+    serializer_class = ReconciliationRunSerializer
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def reconcile(self, request):
+        """
+        Reconcile an uploaded M-Pesa or bank statement CSV (`file`) against
+        recorded payments. Optional `payment_method`, `date_from` /
+        `date_to` (YYYY-MM-DD, default: the statement's span) and
+        `date_tolerance` in days.
+        """
+        statement = request.FILES.get('file')
+        if statement is None:
+            return Response(
+                {'error': 'Upload the statement CSV as "file"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        payment_method = request.data.get('payment_method', '')
+        methods = [code for code, _ in Payment.PAYMENT_METHOD_CHOICES]
+        if payment_method and payment_method not in methods:
+            return Response(
+                {'error': f'payment_method must be one of {", ".join(methods)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            date_from, date_to = (
+                datetime.strptime(value, '%Y-%m-%d').date() if value else None
+                for value in (request.data.get('date_from'), request.data.get('date_to'))
+            )
+            date_tolerance = int(request.data.get('date_tolerance', 0))
+        except ValueError:
+            return Response(
+                {'error': 'date_from/date_to must be YYYY-MM-DD and date_tolerance a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        reconciler = Reconciler(date_from, date_to, payment_method, max(date_tolerance, 0))
+        try:
+            records, errors = read_records(statement)
+            run = reconciler.reconcile(
+                records, source_name=statement.name,
+                created_by=request.user.username or 'System')
+        except (ImportFormatError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = self.get_serializer(run).data
+        data['errors'] = [{'line': line, 'message': message} for line, message in errors]
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'])
+    def items(self, request, pk=None):
+        """The run's items, optionally filtered by `status`."""
+        run = self.get_object()
+        queryset = run.items.select_related('payment__tenant')
+        item_status = request.query_params.get('status')
+        if item_status:
+            queryset = queryset.filter(status=item_status)
+
+        page = self.paginate_queryset(queryset)
+        serializer = ReconciliationItemSerializer(page if page is not None else queryset, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+
+class ExpenseViewSet(RelatedLoadingMixin, ExportMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing expenses
     """
     queryset = Expense.objects.all()
     serializer_class = ExpenseSerializer
+    select_related_fields = ['building', 'unit']
+    export_columns = (
+        ('ID', 'id'),
+        ('Date', 'expense_date'),
+        ('Building', 'building.name'),
+        ('Unit', 'unit.unit_number'),
+        ('Category', 'get_category_display'),
+        ('Description', 'description'),
+        ('Amount', 'amount'),
+        ('Vendor', 'vendor'),
+        ('Receipt Number', 'receipt_number'),
+        ('Paid', 'paid'),
+    )
 
     def get_queryset(self):
-        queryset = Expense.objects.all()
+        queryset = super().get_queryset()
 
         # Filter by building
         building_id = self.request.query_params.get('building', None)
@@ -427,7 +752,7 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         })
 
 
-class MaintenanceRequestViewSet(viewsets.ModelViewSet):
+class MaintenanceRequestViewSet(RelatedLoadingMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing maintenance requests
     """
@@ -435,7 +760,7 @@ class MaintenanceRequestViewSet(viewsets.ModelViewSet):
     serializer_class = MaintenanceRequestSerializer
 
     def get_queryset(self):
-        queryset = MaintenanceRequest.objects.all()
+        queryset = super().get_queryset()
 
         # Filter by status
         status = self.request.query_params.get('status', None)
@@ -481,7 +806,7 @@ class MaintenanceRequestViewSet(viewsets.ModelViewSet):
         return Response({'error': 'Status is required'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class DocumentViewSet(viewsets.ModelViewSet):
+class DocumentViewSet(RelatedLoadingMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing documents
     """
@@ -489,7 +814,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
     serializer_class = DocumentSerializer
 
     def get_queryset(self):
-        queryset = Document.objects.all()
+        queryset = super().get_queryset()
 
         # Filter by tenant
         tenant_id = self.request.query_params.get('tenant', None)
@@ -509,7 +834,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class LeaseViewSet(viewsets.ModelViewSet):
+class LeaseViewSet(RelatedLoadingMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing leases
     """
@@ -517,7 +842,7 @@ class LeaseViewSet(viewsets.ModelViewSet):
     serializer_class = LeaseSerializer
 
     def get_queryset(self):
-        queryset = Lease.objects.all()
+        queryset = super().get_queryset()
 
         # Filter by status
         status = self.request.query_params.get('status', None)
@@ -540,7 +865,7 @@ class LeaseViewSet(viewsets.ModelViewSet):
         today = timezone.now().date()
         sixty_days = today + timedelta(days=60)
 
-        expiring_leases = Lease.objects.filter(
+        expiring_leases = self.load_related(Lease.objects).filter(
             end_date__gte=today,
             end_date__lte=sixty_days,
             status='ACTIVE'
@@ -550,15 +875,17 @@ class LeaseViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
+class ActivityLogViewSet(RelatedLoadingMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for viewing activity logs (read-only)
     """
     queryset = ActivityLog.objects.all()
     serializer_class = ActivityLogSerializer
+    pagination_class = OptionalKeysetPagination
+    keyset_ordering = ('-timestamp', '-id')
 
     def get_queryset(self):
-        queryset = ActivityLog.objects.all()
+        queryset = super().get_queryset()
 
         # Filter by action
         action = self.request.query_params.get('action', None)
@@ -578,24 +905,41 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
-class UtilityViewSet(viewsets.ModelViewSet):
+class UtilityViewSet(RelatedLoadingMixin, ExportMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing utility bills
     """
     queryset = Utility.objects.all()
     serializer_class = UtilitySerializer
+    pagination_class = OptionalKeysetPagination
+    keyset_ordering = ('-billing_period_start', '-id')
+    select_related_fields = ['building', 'unit']
+    export_columns = (
+        ('ID', 'id'),
+        ('Type', 'get_utility_type_display'),
+        ('Building', 'building.name'),
+        ('Unit', 'unit.unit_number'),
+        ('Period Start', 'billing_period_start'),
+        ('Period End', 'billing_period_end'),
+        ('Due Date', 'due_date'),
+        ('Amount', 'amount'),
+        ('Paid', 'paid'),
+        ('Payment Date', 'payment_date'),
+        ('Provider', 'provider'),
+        ('Account Number', 'account_number'),
+    )
     filterset_fields = ['building', 'unit', 'utility_type', 'status']
 
     def get_queryset(self):
-        queryset = Utility.objects.all()
+        queryset = super().get_queryset()
 
         # Filter by date range
         start_date = self.request.query_params.get('start_date', None)
         end_date = self.request.query_params.get('end_date', None)
         if start_date:
-            queryset = queryset.filter(billing_date__gte=start_date)
+            queryset = queryset.filter(billing_period_start__gte=start_date)
         if end_date:
-            queryset = queryset.filter(billing_date__lte=end_date)
+            queryset = queryset.filter(billing_period_start__lte=end_date)
 
         return queryset
 
@@ -614,7 +958,7 @@ class UtilityViewSet(viewsets.ModelViewSet):
         return Response(summary)
 
 
-class PropertyPhotoViewSet(viewsets.ModelViewSet):
+class PropertyPhotoViewSet(RelatedLoadingMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing property photos
     """
@@ -623,7 +967,7 @@ class PropertyPhotoViewSet(viewsets.ModelViewSet):
     filterset_fields = ['building', 'unit', 'photo_type', 'is_primary']
 
     def get_queryset(self):
-        queryset = PropertyPhoto.objects.all()
+        queryset = super().get_queryset()
 
         # Filter by building
         building = self.request.query_params.get('building', None)
@@ -636,3 +980,17 @@ class PropertyPhotoViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(unit=unit)
 
         return queryset
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """
+    Request and notification metrics from every worker on this host, in
+    the Prometheus text exposition format.
+    """
+    store = get_store()
+    if store is None:
+        return Response({'error': 'Metrics are disabled'}, status=status.HTTP_404_NOT_FOUND)
+    return HttpResponse(
+        store.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'properties.middleware.MetricsMiddleware',  # First, so timings cover everything
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Add WhiteNoise for static files
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -133,6 +134,52 @@ MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Cache configuration. The cache must be shared by every worker process
+# so that invalidating the dashboard summary after a write reaches all of
+# them: Redis when REDIS_URL is set, otherwise a table in the main
+# database, created by migrations
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'properties_cache',
+        }
+    }
+
+# Seconds the dashboard summary is served from cache before recomputing
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=30, cast=int)
+
+# Rendered tenant statement PDFs, evicted by total size and idle age
+STATEMENT_CACHE_DIR = config(
+    'STATEMENT_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'statements'))
+STATEMENT_CACHE_MAX_BYTES = config(
+    'STATEMENT_CACHE_MAX_BYTES', default=256 * 1024 * 1024, cast=int)
+STATEMENT_CACHE_MAX_AGE = config(
+    'STATEMENT_CACHE_MAX_AGE', default=30 * 24 * 3600, cast=int)
+
+# Request and notification metrics, shared by all workers on the host
+# through one SQLite file and served at /api/_metrics
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DB = config('METRICS_DB', default=str(BASE_DIR / 'cache' / 'metrics.sqlite3'))
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5, cast=int)
+
+# Activity log entries are queued per process and written in batches of
+# up to this many, at least every AUDIT_FLUSH_INTERVAL seconds and at the
+# end of each request (see properties.audit)
+AUDIT_BUFFER_SIZE = config('AUDIT_BUFFER_SIZE', default=100, cast=int)
+AUDIT_FLUSH_INTERVAL = config('AUDIT_FLUSH_INTERVAL', default=5, cast=int)
+# Entries kept while writes fail; the oldest are dropped beyond this
+AUDIT_BUFFER_LIMIT = config('AUDIT_BUFFER_LIMIT', default=10000, cast=int)
+
+
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -232,6 +279,13 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config(
     'DEFAULT_FROM_EMAIL', default='noreply@rentalmanagement.com')
 
+# Notification outbox (drained by `manage.py process_notifications`)
+NOTIFICATION_WORKERS = config('NOTIFICATION_WORKERS', default=4, cast=int)
+NOTIFICATION_MAX_ATTEMPTS = config(
+    'NOTIFICATION_MAX_ATTEMPTS', default=5, cast=int)
+NOTIFICATION_RETRY_BASE_SECONDS = config(
+    'NOTIFICATION_RETRY_BASE_SECONDS', default=60, cast=int)
+
 # Media files (uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { buildingsAPI, unitsAPI, tenantsAPI, paymentsAPI, expensesAPI, maintenanceAPI, documentsAPI } from '../services/api';
+import { dashboardAPI, buildingsAPI, unitsAPI, tenantsAPI, paymentsAPI, expensesAPI, maintenanceAPI, documentsAPI } from '../services/api';
 import { useNavigate } from 'react-router-dom';
 import ChargeRentModal from '../components/ChargeRentModal';
 import { useToast } from '../components/Toast';
@@ -38,45 +38,22 @@ function Dashboard() {
 
   const fetchDashboardData = async () => {
     try {
-      const [buildingsRes, unitsRes, tenantsRes, paymentsRes] = await Promise.all([
-        buildingsAPI.getAll(),
-        unitsAPI.getAll(),
-        tenantsAPI.getAll({ active: 'true' }),
-        paymentsAPI.getAll(),
-      ]);
-
-      const allUnits = unitsRes.data.results || unitsRes.data;
-      const occupiedUnits = allUnits.filter(u => u.status === 'OCCUPIED').length;
-      const vacantUnits = allUnits.filter(u => u.status === 'VACANT').length;
-
-      const buildings = buildingsRes.data.results || buildingsRes.data;
-      const tenants = tenantsRes.data.results || tenantsRes.data;
-      const payments = paymentsRes.data.results || paymentsRes.data;
-
-      // Calculate total income and pending
-      const totalCharges = payments
-        .filter(p => p.payment_type === 'CHARGE')
-        .reduce((sum, p) => sum + parseFloat(p.amount), 0);
-      
-      const totalPayments = payments
-        .filter(p => p.payment_type === 'PAYMENT')
-        .reduce((sum, p) => sum + parseFloat(p.amount), 0);
-
-      const pendingPayments = totalCharges - totalPayments;
+      // All totals are aggregated server-side across every page of data
+      const { data: summary } = await dashboardAPI.getSummary();
 
       setStats({
-        totalBuildings: buildings.length,
-        totalUnits: allUnits.length,
-        occupiedUnits,
-        vacantUnits,
-        totalTenants: tenants.length,
-        occupancyRate: allUnits.length > 0 ? ((occupiedUnits / allUnits.length) * 100).toFixed(1) : 0,
-        totalIncome: totalPayments,
-        pendingPayments: pendingPayments > 0 ? pendingPayments : 0,
+        totalBuildings: summary.total_buildings,
+        totalUnits: summary.total_units,
+        occupiedUnits: summary.occupied_units,
+        vacantUnits: summary.vacant_units,
+        totalTenants: summary.total_tenants,
+        occupancyRate: summary.occupancy_rate.toFixed(1),
+        totalIncome: summary.total_income,
+        pendingPayments: summary.pending_payments,
       });
 
-      setBuildings(buildings);
-      setRecentPayments(payments.slice(0, 5));
+      setBuildings(summary.buildings);
+      setRecentPayments(summary.recent_transactions);
       setLoading(false);
       
       toast.success('Dashboard data loaded successfully!');
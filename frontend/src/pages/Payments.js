@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { paymentsAPI } from '../services/api';
 import AddPaymentModal from '../components/AddPaymentModal';
 import { useToast } from '../components/Toast';
-import { exportToCSV } from '../utils/exportUtils';
+import { downloadServerExport } from '../utils/exportUtils';
 import DateRangePicker from '../components/DateRangePicker';
 import { BarChart, Bar, PieChart, Pie, Cell, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 
@@ -54,20 +54,15 @@ function Payments() {
   };
 
   const exportPayments = () => {
-    const exportData = payments.map(payment => ({
-      'Date': new Date(payment.transaction_date).toLocaleDateString(),
-      'Tenant': payment.tenant_name,
-      'Building': payment.building_name,
-      'Unit': payment.unit_number,
-      'Type': payment.payment_type,
-      'Description': payment.description,
-      'Method': payment.payment_method || 'N/A',
-      'Amount': payment.amount,
-      'Reference': payment.reference_number || 'N/A'
-    }));
-    
-    exportToCSV(exportData, 'payments-export');
-    addToast('Payments exported successfully', 'success');
+    const params = {};
+    if (filter !== 'all') params.payment_type = filter;
+    if (dateRange) {
+      params.start_date = dateRange.startDate;
+      params.end_date = dateRange.endDate;
+    }
+
+    downloadServerExport('payments', params);
+    addToast('Payments export started', 'success');
   };
 
   // Calculate analytics
@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { buildingsAPI, unitsAPI, tenantsAPI, paymentsAPI } from '../services/api';
+import { searchAPI } from '../services/api';
 import { useNavigate } from 'react-router-dom';
 
 function Search() {
@@ -15,19 +15,8 @@ function Search() {
 
     setLoading(true);
     try {
-      const [buildingsRes, unitsRes, tenantsRes, paymentsRes] = await Promise.all([
-        buildingsAPI.getAll({ search: query }),
-        unitsAPI.getAll({ search: query }),
-        tenantsAPI.getAll({ search: query }),
-        paymentsAPI.getAll({ search: query })
-      ]);
-
-      setResults({
-        buildings: buildingsRes.data.results || buildingsRes.data,
-        units: unitsRes.data.results || unitsRes.data,
-        tenants: tenantsRes.data.results || tenantsRes.data,
-        payments: paymentsRes.data.results || paymentsRes.data
-      });
+      const response = await searchAPI.search({ q: query, limit: 25 });
+      setResults(response.data.results);
     } catch (error) {
       console.error('Search error:', error);
     } finally {
@@ -184,7 +173,7 @@ function Search() {
                         <tr key={unit.id}>
                           <td>{unit.unit_number}</td>
                           <td>{unit.building_name}</td>
-                          <td>KES {unit.monthly_rent.toLocaleString()}</td>
+                          <td>KES {Number(unit.monthly_rent).toLocaleString()}</td>
                           <td>
                             <span style={{
                               padding: '0.25rem 0.75rem',
@@ -229,9 +218,9 @@ function Search() {
                     <tbody>
                       {filteredResults.tenants.map(tenant => (
                         <tr key={tenant.id}>
-                          <td>{tenant.name}</td>
+                          <td>{tenant.full_name}</td>
                           <td>{tenant.email}</td>
-                          <td>{tenant.phone_number}</td>
+                          <td>{tenant.phone}</td>
                           <td>{tenant.unit_number || '-'}</td>
                           <td>
                             <button
@@ -267,7 +256,7 @@ function Search() {
                         <tr key={payment.id}>
                           <td>{new Date(payment.transaction_date).toLocaleDateString()}</td>
                           <td>{payment.tenant_name}</td>
-                          <td>KES {payment.amount.toLocaleString()}</td>
+                          <td>KES {Number(payment.amount).toLocaleString()}</td>
                           <td>
                             <span style={{
                               padding: '0.25rem 0.75rem',
@@ -36,6 +36,16 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Dashboard API
+export const dashboardAPI = {
+  getSummary: () => api.get('/dashboard/summary/'),
+};
+
+// Search API
+export const searchAPI = {
+  search: (params) => api.get('/search/', { params }),
+};
+
 // Buildings API
 export const buildingsAPI = {
   getAll: () => api.get('/buildings/'),
@@ -80,6 +90,9 @@ export const paymentsAPI = {
   update: (id, data) => api.put(`/payments/${id}/`, data),
   delete: (id) => api.delete(`/payments/${id}/`),
   chargeAllRent: (data) => api.post('/payments/charge_all_rent/', data),
+  importStatement: (formData) => api.post('/payments/import/', formData, {
+    headers: { 'Content-Type': 'multipart/form-data' },
+  }),
 };
 
 // Expenses API
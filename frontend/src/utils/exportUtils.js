@@ -1,4 +1,5 @@
 // Export utilities for Excel, CSV, and PDF
+import { API_URL } from '../config';
 
 export const exportToCSV = (data, filename = 'export.csv') => {
   if (!data || data.length === 0) {
@@ -87,6 +88,20 @@ export const exportTableToCSV = (tableId, filename = 'table-export.csv') => {
   document.body.removeChild(link);
 };
 
+// Download a server-side export of a whole filtered list. The browser
+// streams the file straight to disk, so large exports are never truncated
+// to the current page or held in memory.
+export const downloadServerExport = (resource, params = {}, fileFormat = 'csv') => {
+  const query = new URLSearchParams({ ...params, file_format: fileFormat });
+  const link = document.createElement('a');
+
+  link.setAttribute('href', `${API_URL}/${resource}/export/?${query.toString()}`);
+  link.style.visibility = 'hidden';
+  document.body.appendChild(link);
+  link.click();
+  document.body.removeChild(link);
+};
+
 export const printPage = () => {
   window.print();
 };